@@ -0,0 +1,116 @@
+"""
+Columnar tick archive for the Future Trading Bot
+Old market_data rows are compacted into per-symbol, per-day .npy columns that are read back memory-mapped
+"""
+
+import os
+from datetime import datetime, date, timezone
+from typing import List, Dict, Optional, Sequence
+
+import numpy as np
+
+# Stored columns, all float64; timestamps are UTC epoch seconds, so days are UTC days
+ARCHIVE_COLUMNS = ('timestamp', 'price', 'volume', 'change_24h', 'high_24h', 'low_24h')
+SECONDS_PER_DAY = 86400
+TICK_KEY = ('timestamp', 'price', 'volume')  # Identifies a tick when merging into a day
+
+
+def day_of(timestamp: float) -> date:
+    """UTC calendar day of an epoch timestamp"""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).date()
+
+
+class TickArchive:
+    """Per-symbol, per-day columnar tick files under one root directory
+
+    Layout: <root>/<symbol with '/' replaced by '_'>/<YYYY-MM-DD>/<column>.npy.
+    Reads memory-map the files, so a single day is returned zero-copy and a
+    multi-day range costs one concatenation instead of a Python float per row.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol.replace('/', '_'))
+
+    def _day_dir(self, symbol: str, day: date) -> str:
+        return os.path.join(self._symbol_dir(symbol), day.isoformat())
+
+    def days(self, symbol: str) -> List[date]:
+        """Archived days for a symbol, oldest first"""
+        directory = self._symbol_dir(symbol)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(date.fromisoformat(name) for name in os.listdir(directory)
+                      if os.path.exists(os.path.join(directory, name, 'timestamp.npy')))
+
+    def read_day(self, symbol: str, day: date, columns: Sequence[str] = ARCHIVE_COLUMNS) -> Dict[str, np.ndarray]:
+        """Read-only memory maps of one day's columns"""
+        directory = self._day_dir(symbol, day)
+        return {column: np.load(os.path.join(directory, f"{column}.npy"), mmap_mode='r') for column in columns}
+
+    def read(self, symbol: str, start: Optional[float] = None, end: Optional[float] = None,
+             columns: Sequence[str] = ('timestamp', 'price', 'volume')) -> Dict[str, np.ndarray]:
+        """Archived ticks with start <= timestamp < end (epoch seconds), oldest first"""
+        columns = list(dict.fromkeys(['timestamp', *columns]))
+        parts = []
+        for day in self.days(symbol):
+            day_start = (day - date(1970, 1, 1)).days * SECONDS_PER_DAY
+            if (start is not None and day_start + SECONDS_PER_DAY <= start) or (end is not None and day_start >= end):
+                continue
+            data = self.read_day(symbol, day, columns)
+            lo = np.searchsorted(data['timestamp'], start, side='left') if start is not None else 0
+            hi = np.searchsorted(data['timestamp'], end, side='left') if end is not None else len(data['timestamp'])
+            parts.append({column: values[lo:hi] for column, values in data.items()})
+
+        if not parts:
+            return {column: np.empty(0) for column in columns}
+        if len(parts) == 1:
+            return parts[0]
+        return {column: np.concatenate([part[column] for part in parts]) for column in columns}
+
+    def append(self, symbol: str, columns: Dict[str, np.ndarray]) -> int:
+        """Add ticks (every ARCHIVE_COLUMNS entry, any order) to their day files; returns rows written
+
+        Ticks already archived for that day, with the same timestamp, price
+        and volume, are skipped, so re-running an interrupted compaction does
+        not duplicate rows. Distinct ticks sharing a timestamp are all kept.
+        """
+        timestamps = np.asarray(columns['timestamp'], dtype=float)
+        order = np.argsort(timestamps, kind='stable')
+        days = timestamps[order] // SECONDS_PER_DAY
+        boundaries = np.flatnonzero(np.diff(days)) + 1
+        written = 0
+        for rows in np.split(order, boundaries):
+            if len(rows):
+                day = day_of(timestamps[rows[0]])
+                written += self._merge_day(symbol, day, {column: np.asarray(columns[column], dtype=float)[rows]
+                                                         for column in ARCHIVE_COLUMNS})
+        return written
+
+    def _merge_day(self, symbol: str, day: date, new: Dict[str, np.ndarray]) -> int:
+        directory = self._day_dir(symbol, day)
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(os.path.join(directory, 'timestamp.npy')):
+            existing = {column: np.array(values) for column, values in self.read_day(symbol, day).items()}
+            archived = set(zip(*(existing[column].tolist() for column in TICK_KEY)))
+            fresh = np.fromiter((key not in archived for key in zip(*(new[column].tolist() for column in TICK_KEY))),
+                                dtype=bool, count=len(new['timestamp']))
+            if not fresh.any():
+                return 0
+            merged = {column: np.concatenate([existing[column], new[column][fresh]]) for column in ARCHIVE_COLUMNS}
+            order = np.argsort(merged['timestamp'], kind='stable')
+            new_rows = int(fresh.sum())
+            new = {column: values[order] for column, values in merged.items()}
+        else:
+            new_rows = len(new['timestamp'])
+
+        # Write beside the old file, then rename, so a crash never leaves a truncated column.
+        # timestamp goes last: days() only lists a day once its timestamp column exists
+        for column in sorted(ARCHIVE_COLUMNS, key=lambda name: name == 'timestamp'):
+            path = os.path.join(directory, f"{column}.npy")
+            temporary = os.path.join(directory, f".{column}.tmp.npy")
+            np.save(temporary, new[column])
+            os.replace(temporary, path)
+        return new_rows
@@ -0,0 +1,254 @@
+"""
+Backtesting engine for the Future Trading Bot
+Replays stored market_data through the indicator and prediction logic and scores every signal
+
+Usage: python backtest.py USD/CAD [--start 2025-01-01] [--end 2025-02-01] [--db trading_bot.db]
+"""
+
+import argparse
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from bot import (DatabaseManager, HIGH_VOLATILITY, LOW_VOLATILITY, DURATION_HIGH_VOLATILITY,
+                 DURATION_LOW_VOLATILITY, DURATION_NORMAL_VOLATILITY)
+from indicators import compute_series
+
+# Signal outcomes
+TAKE_PROFIT = 1
+STOP_LOSS = -1
+EXPIRED = 0
+
+
+@dataclass
+class BacktestConfig:
+    """Indicator and signal settings for one backtest run"""
+    sma_fast: int = 5
+    sma_mid: int = 10
+    sma_slow: int = 20
+    rsi_period: int = 14
+    macd_fast: int = 12
+    macd_slow: int = 26
+    macd_signal: int = 9
+    signal_interval_seconds: float = 60.0  # One evaluation per interval, like a live cycle
+    min_confidence: float = 0.0  # Skip directional signals below this confidence
+    stop_loss_percent: float = 1.5
+    chunk_size: int = 4096  # Signals scored per vectorized block
+
+
+@dataclass
+class BacktestResult:
+    """Per-signal arrays plus summary statistics"""
+    config: BacktestConfig
+    index: np.ndarray  # Tick index of each signal
+    direction: np.ndarray  # 1 = UP (BUY), -1 = DOWN (SELL)
+    confidence: np.ndarray
+    entry_price: np.ndarray
+    take_profit: np.ndarray
+    stop_loss: np.ndarray
+    exit_price: np.ndarray
+    outcome: np.ndarray  # TAKE_PROFIT, STOP_LOSS or EXPIRED
+    pnl_percent: np.ndarray
+
+    def select(self, mask: np.ndarray) -> 'BacktestResult':
+        """Subset of the signals, e.g. `result.select(result.confidence >= 0.7)`"""
+        return BacktestResult(config=self.config, index=self.index[mask], direction=self.direction[mask],
+                              confidence=self.confidence[mask], entry_price=self.entry_price[mask],
+                              take_profit=self.take_profit[mask], stop_loss=self.stop_loss[mask],
+                              exit_price=self.exit_price[mask], outcome=self.outcome[mask],
+                              pnl_percent=self.pnl_percent[mask])
+
+    def summary(self) -> Dict[str, Any]:
+        count = len(self.index)
+        if not count:
+            return {'signals': 0}
+        expired = self.outcome == EXPIRED
+        hits = (self.outcome == TAKE_PROFIT) | (expired & (self.pnl_percent > 0))
+        return {
+            'signals': count,
+            'up_signals': int(np.sum(self.direction == 1)),
+            'down_signals': int(np.sum(self.direction == -1)),
+            'hit_rate': float(np.mean(hits)),
+            'take_profit_rate': float(np.mean(self.outcome == TAKE_PROFIT)),
+            'stop_loss_rate': float(np.mean(self.outcome == STOP_LOSS)),
+            'expired_rate': float(np.mean(expired)),
+            'total_pnl_percent': float(np.sum(self.pnl_percent)),
+            'avg_pnl_percent': float(np.mean(self.pnl_percent)),
+            'avg_confidence': float(np.mean(self.confidence))
+        }
+
+
+def _rolling(values: np.ndarray, window: int, func) -> np.ndarray:
+    """Apply `func` over trailing windows; NaN until the window is full"""
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = func(sliding_window_view(values, window), axis=1)
+    return out
+
+
+def _rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Population std over trailing windows in O(n) memory; NaN until the window is full"""
+    return pd.Series(values).rolling(window).std(ddof=0).to_numpy()
+
+
+def predict_direction_series(prices: np.ndarray, config: BacktestConfig = BacktestConfig()) -> Dict[str, np.ndarray]:
+    """TechnicalAnalyzer.predict_price_direction evaluated at every tick in one vectorized pass
+
+    Indicators are computed over the full history, matching the live
+    IndicatorEngine. Entries before the first 20 prices are SIDEWAYS.
+    """
+    prices = np.asarray(prices, dtype=float)
+    series = compute_series(prices, sma_periods=(config.sma_fast, config.sma_mid, config.sma_slow),
+                            ema_periods=(), rsi_period=config.rsi_period, macd_fast=config.macd_fast,
+                            macd_slow=config.macd_slow, macd_signal=config.macd_signal)
+    sma_fast, sma_mid, sma_slow = (series['sma'][p] for p in (config.sma_fast, config.sma_mid, config.sma_slow))
+    rsi = series['rsi']
+    macd, signal = series['macd']['macd'], series['macd']['signal']
+
+    score = np.zeros(prices.shape)
+    with np.errstate(invalid='ignore'):
+        # Moving average trend
+        score += np.where((sma_fast > sma_mid) & (sma_mid > sma_slow), 2, 0)
+        score -= np.where((sma_fast < sma_mid) & (sma_mid < sma_slow), 2, 0)
+
+        # RSI signals
+        rsi_valid = ~np.isnan(rsi) & (rsi != 0)
+        score += np.where(rsi_valid & (rsi < 30), 1, 0)
+        score -= np.where(rsi_valid & (rsi > 70), 1, 0)
+
+        # MACD signals
+        macd_valid = ~np.isnan(signal)
+        score += np.where(macd_valid, np.where(macd > signal, 1, -1), 0)
+
+        # Momentum factor
+        momentum = np.zeros(prices.shape)
+        momentum[1:] = (prices[1:] - prices[:-1]) / prices[:-1] * 100
+        score += np.where(momentum > 0.1, 1, 0)
+        score -= np.where(momentum < -0.1, 1, 0)
+
+    # Recent price pattern
+    midpoint = (_rolling(prices, 5, np.max) + _rolling(prices, 5, np.min)) / 2
+    score += np.where(prices > midpoint, 0.5, -0.5)
+
+    direction = np.where(score > 1, 1, np.where(score < -1, -1, 0))
+    confidence = np.where(direction != 0, np.minimum(0.95, 0.6 + np.abs(score) * 0.1), 0.5)
+
+    volatility = _rolling_std(prices, 10)
+    duration = np.select([volatility > HIGH_VOLATILITY, volatility < LOW_VOLATILITY],
+                         [DURATION_HIGH_VOLATILITY, DURATION_LOW_VOLATILITY], DURATION_NORMAL_VOLATILITY)
+    target_price = prices * (1 + direction * volatility * 2)
+
+    warming_up = np.arange(len(prices)) < 19
+    direction[warming_up] = 0
+    confidence[warming_up] = 0.5
+    return {
+        'direction': direction,
+        'confidence': confidence,
+        'duration': duration,
+        'target_price': target_price,
+        'momentum': momentum,
+        'volatility': volatility
+    }
+
+
+def run_backtest(timestamps: np.ndarray, prices: np.ndarray,
+                 config: BacktestConfig = BacktestConfig()) -> BacktestResult:
+    """Score one signal per `signal_interval_seconds` against the prices that followed it
+
+    A BUY takes profit at the predicted target and stops out `stop_loss_percent`
+    below entry (mirrored for SELL), exactly as live signals do. Whichever level
+    is touched first before `expiry_time` decides the outcome; otherwise the
+    signal is settled at the last price before expiry.
+    """
+    timestamps = np.asarray(timestamps, dtype=float)
+    prices = np.asarray(prices, dtype=float)
+    predictions = predict_direction_series(prices, config)
+
+    # One evaluation per interval: the first tick of every interval bucket
+    buckets = np.floor(timestamps / config.signal_interval_seconds)
+    candidates = np.flatnonzero(np.diff(buckets, prepend=-np.inf) > 0)
+    direction = predictions['direction'][candidates]
+    confidence = predictions['confidence'][candidates]
+    keep = (direction != 0) & (confidence >= config.min_confidence)
+
+    # Only signals whose expiry falls inside the data can be settled
+    expiry_time = timestamps[candidates] + predictions['duration'][candidates] * 60
+    expiry_index = np.searchsorted(timestamps, expiry_time, side='right') - 1
+    keep &= expiry_time <= timestamps[-1] if len(timestamps) else keep
+
+    index = candidates[keep]
+    direction = direction[keep]
+    expiry_index = expiry_index[keep]
+    entry = prices[index]
+    take_profit = predictions['target_price'][index]
+    stop_loss = entry * (1 - direction * config.stop_loss_percent / 100)
+
+    outcome = np.full(len(index), EXPIRED)
+    exit_price = prices[expiry_index]
+
+    horizon = int(np.max(expiry_index - index)) if len(index) else 0
+    if horizon > 0:
+        # Pad so every window of `horizon` ticks after a signal exists
+        padded = np.concatenate([prices, np.full(horizon, np.nan)])
+        windows = sliding_window_view(padded, horizon)
+        for start in range(0, len(index), config.chunk_size):
+            block = slice(start, start + config.chunk_size)
+            path = windows[index[block] + 1]  # Prices after entry, one row per signal
+            alive = np.arange(horizon) < (expiry_index[block] - index[block])[:, None]
+            side = direction[block][:, None]
+            with np.errstate(invalid='ignore'):
+                hit_tp = alive & (side * (path - take_profit[block][:, None]) >= 0)
+                hit_sl = alive & (side * (path - stop_loss[block][:, None]) <= 0)
+            first_tp = np.where(hit_tp.any(axis=1), hit_tp.argmax(axis=1), horizon)
+            first_sl = np.where(hit_sl.any(axis=1), hit_sl.argmax(axis=1), horizon)
+
+            block_outcome = np.where(first_tp < first_sl, TAKE_PROFIT,
+                                     np.where(first_sl < first_tp, STOP_LOSS, EXPIRED))
+            outcome[block] = block_outcome
+            exit_price[block] = np.where(block_outcome == TAKE_PROFIT, take_profit[block],
+                                         np.where(block_outcome == STOP_LOSS, stop_loss[block], exit_price[block]))
+
+    pnl_percent = direction * (exit_price - entry) / entry * 100
+    return BacktestResult(config=config, index=index, direction=direction, confidence=confidence[keep],
+                          entry_price=entry, take_profit=take_profit, stop_loss=stop_loss,
+                          exit_price=exit_price, outcome=outcome, pnl_percent=pnl_percent)
+
+
+class Backtester:
+    """Runs backtests over the bot's stored market_data"""
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+
+    def run(self, symbol: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+            config: BacktestConfig = BacktestConfig()) -> BacktestResult:
+        history = self.db_manager.get_price_history(symbol, start, end)
+        return run_backtest(history['timestamp'], history['price'], config)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest predict_price_direction over stored market data")
+    parser.add_argument('symbol')
+    parser.add_argument('--start', type=datetime.fromisoformat)
+    parser.add_argument('--end', type=datetime.fromisoformat)
+    parser.add_argument('--db', default='trading_bot.db')
+    parser.add_argument('--interval', type=float, default=60.0, help="Seconds between evaluated signals")
+    parser.add_argument('--min-confidence', type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = BacktestConfig(signal_interval_seconds=args.interval, min_confidence=args.min_confidence)
+    db_manager = DatabaseManager(args.db)
+    result = Backtester(db_manager).run(args.symbol, args.start, args.end, config)
+    db_manager.close()
+
+    print(f"Backtest {args.symbol} ({asdict(config)})")
+    for key, value in result.summary().items():
+        print(f"  {key}: {value:.4f}" if isinstance(value, float) else f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+OHLCV bar aggregation for the Future Trading Bot
+Rolls ticks into 1m/5m/15m/1h bars per symbol so analysis can run on any timeframe
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Bar length in seconds for each supported timeframe
+TIMEFRAMES = {
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+    '1h': 3600
+}
+TICK_TIMEFRAME = 'tick'  # Analysis on raw ticks rather than bars
+
+
+@dataclass
+class Bar:
+    """One OHLCV bar; `start` is the opening time of its interval"""
+    symbol: str
+    timeframe: str
+    start: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    ticks: int = 1
+
+    def update(self, price: float, volume: float):
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+        self.close = price
+        self.volume += volume
+        self.ticks += 1
+
+
+def bar_start(timestamp: datetime, timeframe: str) -> datetime:
+    """Opening time of the `timeframe` bar containing `timestamp`"""
+    seconds = TIMEFRAMES[timeframe]
+    epoch = timestamp.timestamp()
+    return datetime.fromtimestamp(epoch - epoch % seconds, tz=timestamp.tzinfo)
+
+
+class BarAggregator:
+    """Incrementally builds OHLCV bars for every symbol and timeframe
+
+    Each tick updates the open bar in O(1) per timeframe. A bar closes when
+    the first tick of a later interval arrives; intervals without ticks
+    produce no bar. The last `history` closed bars are kept per symbol and
+    timeframe. Ticks older than the open bar are counted in `late_ticks`
+    and dropped.
+    """
+
+    def __init__(self, timeframes: Sequence[str] = tuple(TIMEFRAMES), history: int = 500):
+        unknown = set(timeframes) - set(TIMEFRAMES)
+        if unknown:
+            raise ValueError(f"Unsupported timeframes: {sorted(unknown)}")
+        self.timeframes = list(timeframes)
+        self.history = history
+        self.current: Dict[Tuple[str, str], Bar] = {}
+        self.closed: Dict[Tuple[str, str], deque] = {}
+        self.late_ticks = 0
+
+    def _closed(self, symbol: str, timeframe: str) -> deque:
+        key = (symbol, timeframe)
+        if key not in self.closed:
+            self.closed[key] = deque(maxlen=self.history)
+        return self.closed[key]
+
+    def update(self, symbol: str, price: float, volume: float, timestamp: datetime) -> List[Bar]:
+        """Fold one tick into every timeframe; returns the bars it closed"""
+        closed_bars = []
+        for timeframe in self.timeframes:
+            key = (symbol, timeframe)
+            start = bar_start(timestamp, timeframe)
+            bar = self.current.get(key)
+            if bar is not None and start == bar.start:
+                bar.update(price, volume)
+                continue
+            if bar is not None and start < bar.start:
+                self.late_ticks += 1
+                continue
+            if bar is not None:
+                self._closed(symbol, timeframe).append(bar)
+                closed_bars.append(bar)
+            self.current[key] = Bar(symbol, timeframe, start, price, price, price, price, volume)
+        return closed_bars
+
+    def warm(self, symbol: str, timeframe: str, bars: Sequence[Bar]):
+        """Seed closed-bar history, e.g. from the database at startup"""
+        closed = self._closed(symbol, timeframe)
+        closed.clear()
+        closed.extend(bars)
+
+    def bars(self, symbol: str, timeframe: str, n: Optional[int] = None, include_current: bool = True) -> List[Bar]:
+        """Most recent `n` bars, oldest first; the still-open bar is last when `include_current`"""
+        bars = list(self._closed(symbol, timeframe))
+        current = self.current.get((symbol, timeframe))
+        if include_current and current is not None:
+            bars.append(current)
+        return bars[-n:] if n else bars
+
+    def closes(self, symbol: str, timeframe: str, n: Optional[int] = None, include_current: bool = True) -> np.ndarray:
+        """Close prices of the most recent `n` bars, oldest first"""
+        return np.array([bar.close for bar in self.bars(symbol, timeframe, n, include_current)], dtype=float)
+
+    def volumes(self, symbol: str, timeframe: str, n: Optional[int] = None, include_current: bool = True) -> np.ndarray:
+        """Volumes of the most recent `n` bars, oldest first"""
+        return np.array([bar.volume for bar in self.bars(symbol, timeframe, n, include_current)], dtype=float)
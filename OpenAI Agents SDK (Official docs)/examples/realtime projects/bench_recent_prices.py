@@ -0,0 +1,74 @@
+"""
+Benchmark for DatabaseManager.get_recent_prices
+Shows lookup latency as market_data grows, with and without the covering index
+
+Usage: python bench_recent_prices.py [row_count ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from bot import DatabaseManager
+
+SYMBOLS = ['USD/BRL', 'USD/CAD', 'NZD/CAD', 'USD/BDT', 'USD/DZD']
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def populate(db: DatabaseManager, rows: int):
+    """Insert `rows` ticks spread round-robin across SYMBOLS"""
+    start = datetime(2025, 1, 1)
+    batch = []
+    for i in range(rows):
+        batch.append((SYMBOLS[i % len(SYMBOLS)], 1.0 + i * 1e-7, 1000000.0, 0.0, 1.05, 0.95,
+                      start + timedelta(seconds=i // len(SYMBOLS))))
+        if len(batch) == 50_000:
+            db.pending_market_data.extend(batch)
+            db.flush()
+            batch = []
+    db.pending_market_data.extend(batch)
+    db.flush()
+
+
+def time_lookups(db: DatabaseManager, repeats: int = 50) -> float:
+    """Median latency of get_recent_prices(symbol, 50) in milliseconds"""
+    timings = []
+    for i in range(repeats):
+        symbol = SYMBOLS[i % len(SYMBOLS)]
+        started = time.perf_counter()
+        db.get_recent_prices(symbol, 50)
+        timings.append((time.perf_counter() - started) * 1000)
+    return float(np.median(timings))
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    print("get_recent_prices(symbol, 50) median latency")
+    print(f"{'rows':>12} | {'no index (ms)':>14} | {'indexed (ms)':>13}")
+    print("-" * 46)
+
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+            populate(db, rows)
+
+            db.conn.execute('DROP INDEX idx_market_data_symbol_timestamp')
+            unindexed = time_lookups(db, repeats=10)
+
+            db.conn.execute('''
+                CREATE INDEX idx_market_data_symbol_timestamp
+                ON market_data (symbol, timestamp DESC, price)
+            ''')
+            indexed = time_lookups(db)
+            db.close()
+
+        print(f"{rows:>12,} | {unindexed:>14.3f} | {indexed:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,35 +5,51 @@ Target Platform: https://market-qx.pro/en/trade/
 """
 
 import asyncio
+import hashlib
+import itertools
 import json
 import logging
 import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 import websockets
 import requests
 from dataclasses import dataclass
 import pandas as pd
 import numpy as np
-from openai import OpenAI
+from openai import AsyncOpenAI
 import os
 from bs4 import BeautifulSoup
 import aiohttp
 import sqlite3
-from threading import Thread
+from threading import Thread, RLock
 import schedule
+from dateutil import tz
+
+from indicators import IndicatorEngine, ema_series, rsi_series, macd_series
+from price_buffer import MarketDataBuffers
+from archive import TickArchive, ARCHIVE_COLUMNS
+from bars import Bar, BarAggregator, TIMEFRAMES, TICK_TIMEFRAME
+from market_stream import MarketStream
+from scheduler import SignalScheduler
+from dashboard import DashboardRenderer
+from signal_store import SignalStore
+from settlement import SettlementWorker, SignalOutcome
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('trading_bot.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+
+def setup_logging(log_file: str = 'trading_bot.log'):
+    """Log to the console and `log_file`; called by entry points, so importing bot has no side effects"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file),
+            logging.StreamHandler()
+        ]
+    )
+
 @dataclass
 class TradingSignal:
     """Data class for trading signals"""
@@ -49,6 +65,11 @@ class TradingSignal:
     timeframe: str
     duration_minutes: int  # Predicted duration for the move
     target_price: float  # Predicted target price
+    id: Optional[int] = None  # Row id once stored
+    
+    @property
+    def expiry_time(self) -> datetime:
+        return self.timestamp + timedelta(minutes=self.duration_minutes)
 
 @dataclass
 class PricePrediction:
@@ -74,20 +95,92 @@ class MarketData:
     high_24h: float
     low_24h: float
 
+@dataclass
+class SymbolSnapshot:
+    """One fetched tick plus the analysis inputs derived from it, shared by a whole cycle"""
+    symbol: str
+    market_data: MarketData
+    prices: np.ndarray  # Recent price window, oldest first
+    volumes: np.ndarray
+    indicators: Optional[Dict[str, Any]]  # IndicatorEngine snapshot after this tick (tick timeframe only)
+    timestamp: datetime
+    timeframe: str = TICK_TIMEFRAME  # 'tick', or the bar timeframe `prices` are closes of
+
+# Returned whenever sentiment cannot be computed
+NEUTRAL_SENTIMENT = {
+    'sentiment_score': 0,
+    'confidence': 0.5,
+    'key_factors': [],
+    'recommendation': 'HOLD',
+    'reasoning': 'Analysis unavailable due to error'
+}
+
+# Structured-output schema for one batched sentiment request
+SENTIMENT_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'results': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'symbol': {'type': 'string'},
+                    'sentiment_score': {'type': 'number'},
+                    'confidence': {'type': 'number'},
+                    'key_factors': {'type': 'array', 'items': {'type': 'string'}},
+                    'recommendation': {'type': 'string', 'enum': ['BUY', 'SELL', 'HOLD']},
+                    'reasoning': {'type': 'string'}
+                },
+                'required': ['symbol', 'sentiment_score', 'confidence', 'key_factors', 'recommendation', 'reasoning'],
+                'additionalProperties': False
+            }
+        }
+    },
+    'required': ['results'],
+    'additionalProperties': False
+}
+
 class WebSearchAgent:
-    """Agent for web search and market analysis"""
+    """Agent for web search and market analysis
     
-    def __init__(self, openai_api_key: str):
-        self.client = OpenAI(api_key=openai_api_key)
+    Meant to be long-lived: it holds one AsyncOpenAI client and one aiohttp
+    session. Sentiment is cached per symbol until the news content changes or
+    `cache_ttl` expires. Concurrent requests arriving within `batch_window`
+    seconds are sent as a single structured-output request.
+    """
+    
+    def __init__(self, openai_api_key: str, model: str = "gpt-4o", cache_ttl: float = 600.0,
+                 batch_window: float = 0.05, max_batch_size: int = 10):
+        self.client = AsyncOpenAI(api_key=openai_api_key)
         self.session = None
+        self.model = model
+        self.cache_ttl = cache_ttl
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.cache: Dict[str, tuple] = {}  # symbol -> (news_hash, expires_at, analysis)
+        self.in_flight: Dict[tuple, asyncio.Future] = {}  # (symbol, news_hash) -> pending result
+        self.queue: List[tuple] = []  # (symbol, news_hash, news_text) waiting for the next batch
+        self.flush_task: Optional[asyncio.Task] = None
+        self.batch_tasks: set = set()  # Keeps running batch requests referenced
     
-    async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+    async def start(self):
+        """Open the shared HTTP session"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
         return self
     
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
+    async def close(self):
+        """Close the shared HTTP session and the OpenAI client"""
         if self.session:
             await self.session.close()
+            self.session = None
+        await self.client.close()
+    
+    async def __aenter__(self):
+        return await self.start()
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
     
     async def search_market_news(self, symbol: str) -> List[Dict[str, Any]]:
         """Search for market news and analysis for a specific symbol"""
@@ -116,45 +209,92 @@ class WebSearchAgent:
             return []
     
     async def analyze_market_sentiment(self, symbol: str, news_data: List[Dict]) -> Dict[str, Any]:
-        """Use OpenAI to analyze market sentiment from news data"""
+        """Use OpenAI to analyze market sentiment from news data (cached and batched)"""
+        news_text = "\n".join([f"{item['title']}: {item['content']}" for item in news_data])
+        news_hash = hashlib.sha256(news_text.encode()).hexdigest()
+        
+        cached = self.cache.get(symbol)
+        if cached and cached[0] == news_hash and cached[1] > time.monotonic():
+            return cached[2]
+        
+        key = (symbol, news_hash)
+        future = self.in_flight.get(key)
+        if future is None:
+            future = self.in_flight[key] = asyncio.get_running_loop().create_future()
+            self.queue.append((symbol, news_hash, news_text))
+            if len(self.queue) >= self.max_batch_size:
+                self._flush()
+            elif self.flush_task is None:
+                self.flush_task = asyncio.create_task(self._flush_after_window())
+        return await asyncio.shield(future)
+    
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.batch_window)
+        self.flush_task = None
+        self._flush()
+    
+    def _flush(self):
+        """Send everything queued so far as one request"""
+        batch, self.queue = self.queue, []
+        if batch:
+            task = asyncio.create_task(self._run_batch(batch))
+            self.batch_tasks.add(task)
+            task.add_done_callback(self.batch_tasks.discard)
+    
+    async def _run_batch(self, batch: List[tuple]):
         try:
-            news_text = "\n".join([f"{item['title']}: {item['content']}" for item in news_data])
-            
-            prompt = f"""
-            Analyze the market sentiment for {symbol} based on the following news and information:
-            
-            {news_text}
-            
-            Provide analysis in JSON format with:
-            - sentiment_score: float between -1 (very bearish) and 1 (very bullish)
-            - confidence: float between 0 and 1
-            - key_factors: list of important factors affecting the sentiment
-            - recommendation: BUY, SELL, or HOLD
-            - reasoning: detailed explanation
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert financial analyst and trading advisor."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
-            )
-            
-            # Parse the response (assuming it returns valid JSON)
-            analysis = json.loads(response.choices[0].message.content)
-            return analysis
-            
+            results = await self._request_sentiment(batch)
         except Exception as e:
             logger.error(f"Error analyzing market sentiment: {e}")
-            return {
-                'sentiment_score': 0,
-                'confidence': 0.5,
-                'key_factors': [],
-                'recommendation': 'HOLD',
-                'reasoning': 'Analysis unavailable due to error'
+            results = {}
+        
+        expires_at = time.monotonic() + self.cache_ttl
+        for symbol, news_hash, _ in batch:
+            analysis = results.get(symbol)
+            if analysis is not None:
+                self.cache[symbol] = (news_hash, expires_at, analysis)
+            future = self.in_flight.pop((symbol, news_hash))
+            if not future.done():
+                future.set_result(analysis if analysis is not None else dict(NEUTRAL_SENTIMENT))
+    
+    async def _request_sentiment(self, batch: List[tuple]) -> Dict[str, Dict[str, Any]]:
+        """One structured-output request covering every symbol in the batch"""
+        sections = "\n\n".join(f"### {symbol}\n{news_text}" for symbol, _, news_text in batch)
+        prompt = f"""
+        Analyze the market sentiment for each symbol below based on its news and information:
+        
+        {sections}
+        
+        Return one result per symbol with:
+        - sentiment_score: float between -1 (very bearish) and 1 (very bullish)
+        - confidence: float between 0 and 1
+        - key_factors: list of important factors affecting the sentiment
+        - recommendation: BUY, SELL, or HOLD
+        - reasoning: detailed explanation
+        """
+        
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are an expert financial analyst and trading advisor."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            response_format={
+                'type': 'json_schema',
+                'json_schema': {'name': 'market_sentiment', 'strict': True, 'schema': SENTIMENT_SCHEMA}
             }
+        )
+        
+        results = json.loads(response.choices[0].message.content)['results']
+        return {item.pop('symbol'): item for item in results}
+
+# Volatility bands (std of the last 10 prices) and the move duration predicted for each
+HIGH_VOLATILITY = 0.002
+LOW_VOLATILITY = 0.0005
+DURATION_HIGH_VOLATILITY = 3  # minutes
+DURATION_LOW_VOLATILITY = 10
+DURATION_NORMAL_VOLATILITY = 6
 
 class TechnicalAnalyzer:
     """Technical analysis tools with price prediction capabilities"""
@@ -164,31 +304,39 @@ class TechnicalAnalyzer:
         """Calculate Simple Moving Average"""
         if len(prices) < period:
             return None
-        return sum(prices[-period:]) / period
+        return float(np.mean(prices[-period:]))
     
     @staticmethod
     def calculate_ema(prices: List[float], period: int) -> float:
-        """Calculate Exponential Moving Average"""
+        """Calculate Exponential Moving Average (seeded with the SMA of the first period)"""
         if len(prices) < period:
             return None
-        multiplier = 2 / (period + 1)
-        ema = prices[0]
-        for price in prices[1:]:
-            ema = (price * multiplier) + (ema * (1 - multiplier))
-        return ema
+        return float(ema_series(prices, period)[-1])
     
     @staticmethod
-    def predict_price_direction(prices: List[float], volumes: List[float] = None) -> Dict[str, Any]:
-        """Predict price direction using multiple indicators"""
+    def predict_price_direction(prices: List[float], volumes: List[float] = None,
+                                indicators: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Predict price direction using multiple indicators
+        
+        `indicators` is an IndicatorEngine snapshot; when given, the rolling
+        values are used instead of recomputing them from the price window.
+        """
         if len(prices) < 20:
             return {'direction': 'SIDEWAYS', 'confidence': 0.5, 'duration': 5}
         
         # Calculate indicators
-        sma_5 = TechnicalAnalyzer.calculate_sma(prices, 5)
-        sma_10 = TechnicalAnalyzer.calculate_sma(prices, 10)
-        sma_20 = TechnicalAnalyzer.calculate_sma(prices, 20)
-        rsi = TechnicalAnalyzer.calculate_rsi(prices)
-        macd = TechnicalAnalyzer.calculate_macd(prices)
+        if indicators:
+            sma_5 = indicators['sma'].get(5)
+            sma_10 = indicators['sma'].get(10)
+            sma_20 = indicators['sma'].get(20)
+            rsi = indicators['rsi']
+            macd = indicators['macd']
+        else:
+            sma_5 = TechnicalAnalyzer.calculate_sma(prices, 5)
+            sma_10 = TechnicalAnalyzer.calculate_sma(prices, 10)
+            sma_20 = TechnicalAnalyzer.calculate_sma(prices, 20)
+            rsi = TechnicalAnalyzer.calculate_rsi(prices)
+            macd = TechnicalAnalyzer.calculate_macd(prices)
         
         # Price momentum
         current_price = prices[-1]
@@ -254,14 +402,9 @@ class TechnicalAnalyzer:
             prediction = 'SIDEWAYS'
             confidence = 0.5
         
-        # Predict duration based on volatility and momentum
+        # Predict duration based on volatility
         volatility = np.std(prices[-10:]) if len(prices) >= 10 else 0.001
-        if volatility > 0.002:  # High volatility - shorter duration
-            duration = np.random.randint(1, 5)
-        elif volatility < 0.0005:  # Low volatility - longer duration
-            duration = np.random.randint(5, 15)
-        else:
-            duration = np.random.randint(3, 10)
+        duration = TechnicalAnalyzer.predict_duration(volatility)
         
         # Predict target price
         if prediction == 'UP':
@@ -281,157 +424,497 @@ class TechnicalAnalyzer:
             'volatility': volatility
         }
     
+    @staticmethod
+    def predict_duration(volatility: float) -> int:
+        """Predicted move duration in minutes; deterministic so backtests are reproducible"""
+        if volatility > HIGH_VOLATILITY:  # High volatility - shorter duration
+            return DURATION_HIGH_VOLATILITY
+        elif volatility < LOW_VOLATILITY:  # Low volatility - longer duration
+            return DURATION_LOW_VOLATILITY
+        return DURATION_NORMAL_VOLATILITY
+    
     @staticmethod
     def calculate_rsi(prices: List[float], period: int = 14) -> float:
-        """Calculate Relative Strength Index"""
+        """Calculate Relative Strength Index (Wilder's smoothing)"""
         if len(prices) < period + 1:
             return None
-        
-        deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        gains = [d if d > 0 else 0 for d in deltas]
-        losses = [-d if d < 0 else 0 for d in deltas]
-        
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        
-        if avg_loss == 0:
-            return 100
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        return float(rsi_series(prices, period)[-1])
     
     @staticmethod
     def calculate_macd(prices: List[float], fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> Dict[str, float]:
-        """Calculate MACD"""
-        if len(prices) < slow_period:
+        """Calculate MACD with a signal line that is the EMA of the MACD line"""
+        if len(prices) < slow_period + signal_period - 1:
             return None
         
-        ema_fast = TechnicalAnalyzer.calculate_ema(prices, fast_period)
-        ema_slow = TechnicalAnalyzer.calculate_ema(prices, slow_period)
-        
-        if ema_fast is None or ema_slow is None:
-            return None
-        
-        macd_line = ema_fast - ema_slow
-        # Simplified signal line calculation
-        signal_line = macd_line * 0.9  # Simplified
-        histogram = macd_line - signal_line
-        
+        series = macd_series(prices, fast_period, slow_period, signal_period)
         return {
-            'macd': macd_line,
-            'signal': signal_line,
-            'histogram': histogram
+            'macd': float(series['macd'][-1]),
+            'signal': float(series['signal'][-1]),
+            'histogram': float(series['histogram'][-1])
         }
 
+def to_epoch_seconds(timestamps) -> np.ndarray:
+    """Vectorized conversion of stored timestamps to UTC epoch seconds
+    
+    Naive timestamps are local time (ticks are stamped with datetime.now()),
+    matching datetime.timestamp(); ambiguous DST times take the earlier offset.
+    """
+    parsed = pd.to_datetime(pd.Series(timestamps), format='ISO8601')
+    if parsed.dt.tz is None:
+        parsed = parsed.dt.tz_localize(tz.tzlocal(), ambiguous=np.ones(len(parsed), dtype=bool),
+                                       nonexistent='shift_forward')
+    return ((parsed - pd.Timestamp(0, tz='UTC')) / pd.Timedelta(seconds=1)).to_numpy(dtype=float)
+
+# Ordered schema migrations: (version, description, statements).
+# Version 1 is the original schema, so databases created before versioning
+# existed pass through it unchanged and pick up everything after it.
+SCHEMA_MIGRATIONS = [
+    (1, 'Create signals and market_data tables', [
+        '''
+        CREATE TABLE IF NOT EXISTS signals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            signal_type TEXT NOT NULL,
+            prediction TEXT NOT NULL,
+            confidence REAL NOT NULL,
+            entry_price REAL NOT NULL,
+            stop_loss REAL NOT NULL,
+            take_profit REAL NOT NULL,
+            timestamp DATETIME NOT NULL,
+            reasoning TEXT,
+            timeframe TEXT,
+            duration_minutes INTEGER,
+            target_price REAL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS market_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            price REAL NOT NULL,
+            volume REAL NOT NULL,
+            change_24h REAL NOT NULL,
+            high_24h REAL NOT NULL,
+            low_24h REAL NOT NULL,
+            timestamp DATETIME NOT NULL
+        )
+        '''
+    ]),
+    (2, 'Covering index for recent-price lookups', [
+        # Includes price so get_recent_prices never touches the table rows
+        '''
+        CREATE INDEX IF NOT EXISTS idx_market_data_symbol_timestamp
+        ON market_data (symbol, timestamp DESC, price)
+        '''
+    ]),
+    (3, 'OHLCV bars table', [
+        '''
+        CREATE TABLE IF NOT EXISTS ohlcv_bars (
+            symbol TEXT NOT NULL,
+            timeframe TEXT NOT NULL,
+            start DATETIME NOT NULL,
+            open REAL NOT NULL,
+            high REAL NOT NULL,
+            low REAL NOT NULL,
+            close REAL NOT NULL,
+            volume REAL NOT NULL,
+            ticks INTEGER NOT NULL,
+            PRIMARY KEY (symbol, timeframe, start)
+        ) WITHOUT ROWID
+        '''
+    ]),
+    (4, 'Signal outcomes table', [
+        '''
+        CREATE TABLE IF NOT EXISTS signal_outcomes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            signal_id INTEGER REFERENCES signals (id),
+            symbol TEXT NOT NULL,
+            signal_type TEXT NOT NULL,
+            outcome TEXT NOT NULL,
+            entry_price REAL NOT NULL,
+            exit_price REAL NOT NULL,
+            pnl_percent REAL NOT NULL,
+            correct INTEGER NOT NULL,
+            opened_at DATETIME NOT NULL,
+            settled_at DATETIME NOT NULL
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_signal_outcomes_symbol_settled
+        ON signal_outcomes (symbol, settled_at DESC, correct)
+        '''
+    ]),
+]
+
+# Field order of a queued market_data row
+QUEUED_MARKET_DATA_FIELDS = ('symbol', 'price', 'volume', 'change_24h', 'high_24h', 'low_24h', 'timestamp')
+
 class DatabaseManager:
-    """Manage SQLite database for storing signals and market data"""
+    """Manage SQLite database for storing signals and market data
+    
+    Uses one long-lived WAL-mode connection for writes and a second one for
+    the recent-data reads, so those never wait for a batch commit (an
+    in-memory database has a single connection). Market data rows go into
+    a write-behind queue that is flushed in batches with executemany. With
+    an `archive`, `compact()` moves old rows into columnar files so SQLite
+    only holds a hot window.
     
-    def __init__(self, db_path: str = "trading_bot.db"):
+    `lock` guards the queues and is only held to append or swap them, so
+    queueing never waits for a commit; `db_lock` serializes writes. Rows a
+    flush has taken stay readable from `flushing_*` until they commit, and
+    reads only take market data rows up to `committed_id` from SQLite, so
+    every row is seen exactly once wherever it is.
+    """
+    
+    def __init__(self, db_path: str = "trading_bot.db", batch_size: int = 200, flush_interval: float = 1.0,
+                 archive: Optional[TickArchive] = None):
         self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.archive = archive
+        self.lock = RLock()
+        self.db_lock = RLock()
+        self.flush_task: Optional[asyncio.Task] = None
+        self.pending_market_data: List[tuple] = []
+        self.pending_bars: List[tuple] = []  # Closed OHLCV bars, written with the next flush
+        self.pending_outcomes: List[tuple] = []  # Settled signal outcomes, written with the next flush
+        self.flushing_market_data: List[tuple] = []  # Taken by a running flush, not yet committed
+        self.flushing_bars: List[tuple] = []
+        self.last_flush = time.monotonic()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
         self.init_database()
+        with self.db_lock:
+            self.committed_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM market_data').fetchone()[0]
+        if db_path == ':memory:':
+            self.read_conn, self.read_lock = self.conn, self.db_lock
+        else:
+            self.read_conn, self.read_lock = sqlite3.connect(db_path, check_same_thread=False), RLock()
     
     def init_database(self):
-        """Initialize database tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS signals (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol TEXT NOT NULL,
-                signal_type TEXT NOT NULL,
-                prediction TEXT NOT NULL,
-                confidence REAL NOT NULL,
-                entry_price REAL NOT NULL,
-                stop_loss REAL NOT NULL,
-                take_profit REAL NOT NULL,
-                timestamp DATETIME NOT NULL,
-                reasoning TEXT,
-                timeframe TEXT,
-                duration_minutes INTEGER,
-                target_price REAL
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS market_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol TEXT NOT NULL,
-                price REAL NOT NULL,
-                volume REAL NOT NULL,
-                change_24h REAL NOT NULL,
-                high_24h REAL NOT NULL,
-                low_24h REAL NOT NULL,
-                timestamp DATETIME NOT NULL
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        """Create the schema or migrate an existing database to the latest version"""
+        with self.db_lock:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at DATETIME NOT NULL
+                )
+            ''')
+            current = self.schema_version()
+            
+            for version, description, statements in SCHEMA_MIGRATIONS:
+                if version <= current:
+                    continue
+                logger.info(f"Applying database migration {version}: {description}")
+                try:
+                    self.conn.execute('BEGIN')
+                    for statement in statements:
+                        self.conn.execute(statement)
+                    self.conn.execute(
+                        'INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)',
+                        (version, description, datetime.now())
+                    )
+                    self.conn.commit()
+                except sqlite3.Error:
+                    self.conn.rollback()
+                    raise
+    
+    def schema_version(self) -> int:
+        """Latest applied schema migration (0 for a database that predates versioning)"""
+        with self.db_lock:
+            row = self.conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+        return row[0] or 0
     
     def store_signal(self, signal: TradingSignal):
-        """Store trading signal in database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO signals 
-            (symbol, signal_type, prediction, confidence, entry_price, stop_loss, take_profit, timestamp, reasoning, timeframe, duration_minutes, target_price)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            signal.symbol, signal.signal_type, signal.prediction, signal.confidence,
-            signal.entry_price, signal.stop_loss, signal.take_profit,
-            signal.timestamp, signal.reasoning, signal.timeframe,
-            signal.duration_minutes, signal.target_price
-        ))
-        
-        conn.commit()
-        conn.close()
+        """Store trading signal in database and record its row id on the signal"""
+        with self.db_lock:
+            cursor = self.conn.execute('''
+                INSERT INTO signals 
+                (symbol, signal_type, prediction, confidence, entry_price, stop_loss, take_profit, timestamp, reasoning, timeframe, duration_minutes, target_price)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                signal.symbol, signal.signal_type, signal.prediction, signal.confidence,
+                signal.entry_price, signal.stop_loss, signal.take_profit,
+                signal.timestamp, signal.reasoning, signal.timeframe,
+                signal.duration_minutes, signal.target_price
+            ))
+            self.conn.commit()
+            signal.id = cursor.lastrowid
+    
+    async def store_signal_async(self, signal: TradingSignal):
+        """Store a signal on a worker thread so the event loop keeps running"""
+        await asyncio.to_thread(self.store_signal, signal)
+    
+    def store_outcomes(self, outcomes: List[SignalOutcome]):
+        """Queue settled signal outcomes for the next flush"""
+        with self.lock:
+            self.pending_outcomes.extend(
+                (outcome.signal_id, outcome.symbol, outcome.signal_type, outcome.outcome, outcome.entry_price,
+                 outcome.exit_price, outcome.pnl_percent, outcome.correct, outcome.opened_at, outcome.settled_at)
+                for outcome in outcomes
+            )
+    
+    def get_recent_outcomes(self, symbol: str, limit: int = 50) -> List[bool]:
+        """`correct` flags of the latest settled signals for a symbol, oldest first"""
+        self.flush()
+        with self.db_lock:
+            rows = self.conn.execute('''
+                SELECT correct FROM signal_outcomes
+                WHERE symbol = ?
+                ORDER BY settled_at DESC
+                LIMIT ?
+            ''', (symbol, limit)).fetchall()
+        return [bool(row[0]) for row in reversed(rows)]
     
     def store_market_data(self, data: MarketData):
-        """Store market data in database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        """Queue market data for the next batched write"""
+        with self.lock:
+            self.pending_market_data.append((
+                data.symbol, data.price, data.volume, data.change_24h,
+                data.high_24h, data.low_24h, data.timestamp
+            ))
+            full = len(self.pending_market_data) >= self.batch_size
+        if full:
+            self._flush_soon()
+    
+    def _flush_soon(self):
+        """Write a full batch on a worker thread; inline only when no event loop is running"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = loop.create_task(self.flush_async())
+    
+    def store_bars(self, bars: List[Bar]):
+        """Queue closed OHLCV bars for the next flush"""
+        with self.lock:
+            self.pending_bars.extend(
+                (bar.symbol, bar.timeframe, bar.start, bar.open, bar.high, bar.low, bar.close, bar.volume, bar.ticks)
+                for bar in bars
+            )
+    
+    def flush(self):
+        """Write all queued market data rows, bars and outcomes in a single transaction"""
+        with self.db_lock:
+            with self.lock:
+                self.last_flush = time.monotonic()
+                if not self.pending_market_data and not self.pending_bars and not self.pending_outcomes:
+                    return
+                rows = self.flushing_market_data = self.pending_market_data
+                bars = self.flushing_bars = self.pending_bars
+                outcomes = self.pending_outcomes
+                self.pending_market_data, self.pending_bars, self.pending_outcomes = [], [], []
+            committed_id = None
+            try:
+                self._write(rows, bars, outcomes)
+                last_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM market_data').fetchone()[0]
+                self.conn.commit()
+                committed_id = last_id
+            finally:
+                with self.lock:
+                    if committed_id is not None:
+                        self.committed_id = committed_id
+                    self.flushing_market_data, self.flushing_bars = [], []
+    
+    def _write(self, rows: List[tuple], bars: List[tuple], outcomes: List[tuple]):
+        """Insert one flush's rows on the write connection (the caller commits)"""
+        self.conn.executemany('''
             INSERT INTO market_data 
             (symbol, price, volume, change_24h, high_24h, low_24h, timestamp)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data.symbol, data.price, data.volume, data.change_24h,
-            data.high_24h, data.low_24h, data.timestamp
-        ))
-        
-        conn.commit()
-        conn.close()
+        ''', rows)
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO ohlcv_bars
+            (symbol, timeframe, start, open, high, low, close, volume, ticks)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', bars)
+        self.conn.executemany('''
+            INSERT INTO signal_outcomes
+            (signal_id, symbol, signal_type, outcome, entry_price, exit_price, pnl_percent, correct, opened_at, settled_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', outcomes)
+    
+    async def flush_async(self):
+        """Flush queued rows on a worker thread so the event loop keeps running"""
+        await asyncio.to_thread(self.flush)
     
     def get_recent_prices(self, symbol: str, limit: int = 100) -> List[float]:
-        """Get recent prices for technical analysis"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT price FROM market_data 
-            WHERE symbol = ? 
-            ORDER BY timestamp DESC 
-            LIMIT ?
-        ''', (symbol, limit))
-        
-        prices = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return list(reversed(prices))  # Return in chronological order
+        """Get recent prices for technical analysis (includes rows not yet flushed)"""
+        return [row[0] for row in self._recent_market_data(symbol, ('price',), limit)]
+    
+    def get_recent_ticks(self, symbol: str, limit: int = 100) -> List[tuple]:
+        """Get recent (price, volume, timestamp) rows in chronological order (includes rows not yet flushed)"""
+        return self._recent_market_data(symbol, ('price', 'volume', 'timestamp'), limit)
+    
+    def _recent_market_data(self, symbol: str, columns: Sequence[str], limit: int) -> List[tuple]:
+        """Latest `columns` rows for a symbol, oldest first: committed rows, then those in flight or queued"""
+        # Snapshot the queues first: rows committed after this point are past committed_id and come from here
+        with self.lock:
+            committed_id = self.committed_id
+            queued = [row for row in itertools.chain(self.flushing_market_data, self.pending_market_data)
+                      if row[0] == symbol]
+        with self.read_lock:
+            rows = self.read_conn.execute(f'''
+                SELECT {', '.join(columns)} FROM market_data 
+                WHERE symbol = ? AND id <= ?
+                ORDER BY timestamp DESC 
+                LIMIT ?
+            ''', (symbol, committed_id, limit)).fetchall()
+        rows.reverse()  # Chronological order
+        
+        if queued:
+            indexes = [QUEUED_MARKET_DATA_FIELDS.index(column) for column in columns]
+            rows = (rows + [tuple(row[index] for index in indexes) for row in queued])[-limit:]
+        return rows
+    
+    def get_recent_bars(self, symbol: str, timeframe: str, limit: int = 100) -> List[Bar]:
+        """Most recent closed bars for a symbol and timeframe, oldest first (includes bars not yet flushed)"""
+        with self.lock:
+            queued = [row for row in itertools.chain(self.flushing_bars, self.pending_bars)
+                      if row[0] == symbol and row[1] == timeframe]
+        with self.read_lock:
+            rows = self.read_conn.execute('''
+                SELECT symbol, timeframe, start, open, high, low, close, volume, ticks FROM ohlcv_bars
+                WHERE symbol = ? AND timeframe = ?
+                ORDER BY start DESC
+                LIMIT ?
+            ''', (symbol, timeframe, limit)).fetchall()
+        
+        # A bar committed while this ran can be both stored and queued; keyed by start it counts once
+        bars = {bar.start: bar for bar in (Bar(*row[:2], datetime.fromisoformat(row[2]), *row[3:]) for row in rows)}
+        bars.update((bar.start, bar) for bar in (Bar(*row) for row in queued))
+        return [bars[start] for start in sorted(bars)][-limit:]
+    
+    def get_price_history(self, symbol: str, start: Optional[datetime] = None,
+                          end: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """Stored ticks for a symbol in [start, end) as NumPy arrays, oldest first
+        
+        Returns {'timestamp': seconds, 'price': ..., 'volume': ...}; stored
+        (naive, local) timestamps are converted to UTC epoch seconds. Archived ticks
+        come first, followed by the hot rows still in SQLite.
+        """
+        archived = None
+        if self.archive:
+            bounds = [to_epoch_seconds([bound])[0] if bound is not None else None for bound in (start, end)]
+            archived = self.archive.read(symbol, *bounds)
+        self.flush()
+        query = 'SELECT timestamp, price, volume FROM market_data WHERE symbol = ?'
+        params: List[Any] = [symbol]
+        if start is not None:
+            query += ' AND timestamp >= ?'
+            params.append(start)
+        if end is not None:
+            query += ' AND timestamp < ?'
+            params.append(end)
+        query += ' ORDER BY timestamp'
+        
+        with self.db_lock:
+            rows = self.conn.execute(query, params).fetchall()
+        if not rows:
+            hot = {'timestamp': np.empty(0), 'price': np.empty(0), 'volume': np.empty(0)}
+        else:
+            timestamps, prices, volumes = zip(*rows)
+            hot = {
+                'timestamp': to_epoch_seconds(timestamps),
+                'price': np.asarray(prices, dtype=float),
+                'volume': np.asarray(volumes, dtype=float)
+            }
+        
+        if archived is None or not len(archived['timestamp']):
+            return hot
+        if not rows:
+            return archived
+        return {column: np.concatenate([archived[column], hot[column]]) for column in hot}
+    
+    def compact(self, older_than: datetime) -> int:
+        """Move market data rows older than `older_than` into the archive; returns rows moved"""
+        if not self.archive:
+            return 0
+        self.flush()
+        with self.db_lock:
+            symbols = [row[0] for row in self.conn.execute(
+                'SELECT DISTINCT symbol FROM market_data WHERE timestamp < ?', (older_than,)
+            )]
+        
+        moved = 0
+        for symbol in symbols:
+            with self.db_lock:
+                rows = self.conn.execute('''
+                    SELECT timestamp, price, volume, change_24h, high_24h, low_24h FROM market_data
+                    WHERE symbol = ? AND timestamp < ?
+                    ORDER BY timestamp
+                ''', (symbol, older_than)).fetchall()
+            if not rows:
+                continue
+            values = list(zip(*rows))
+            columns = {'timestamp': to_epoch_seconds(values[0])}
+            columns.update({column: np.asarray(values[i], dtype=float) for i, column in enumerate(ARCHIVE_COLUMNS) if i})
+            
+            # Files first: a crash before the delete only leaves rows the next run skips as duplicates
+            self.archive.append(symbol, columns)
+            with self.db_lock:
+                self.conn.execute('DELETE FROM market_data WHERE symbol = ? AND timestamp < ?', (symbol, older_than))
+                self.conn.commit()
+            moved += len(rows)
+        
+        if moved:
+            logger.info(f"Archived {moved} market data rows older than {older_than}")
+        return moved
+    
+    async def compact_async(self, older_than: datetime) -> int:
+        """Compact on a worker thread so the event loop keeps running"""
+        return await asyncio.to_thread(self.compact, older_than)
+    
+    def close(self):
+        """Flush queued rows and close the connections"""
+        with self.db_lock:
+            self.flush()
+            if self.read_conn is not self.conn:
+                with self.read_lock:
+                    self.read_conn.close()
+            self.conn.close()
 
 class FutureTradingBot:
     """Main trading bot class"""
     
-    def __init__(self, openai_api_key: str, target_symbols: Optional[List[str]] = None):
+    def __init__(self, openai_api_key: str, target_symbols: Optional[List[str]] = None,
+                 buffer_capacity: int = 512, max_concurrency: int = 5,
+                 symbol_timeout: float = 20.0, cycle_deadline: float = 45.0,
+                 db_path: str = "trading_bot.db", market_stream: Optional[MarketStream] = None,
+                 archive_dir: Optional[str] = None, hot_window_hours: float = 24,
+                 archive_interval: float = 3600, timeframe: str = TICK_TIMEFRAME,
+                 dashboard_refresh: float = 0.5, max_signals_per_symbol: int = 5,
+                 accuracy_feedback_weight: float = 0.0):
+        if timeframe != TICK_TIMEFRAME and timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unsupported timeframe: {timeframe}")
         self.openai_api_key = openai_api_key
         self.target_symbols = target_symbols or ['USD/BRL', 'USD/CAD', 'NZD/CAD', 'USD/BDT', 'USD/DZD']
-        self.db_manager = DatabaseManager()
+        self.max_concurrency = max_concurrency
+        self.symbol_timeout = symbol_timeout  # Seconds one symbol may take
+        self.cycle_deadline = cycle_deadline  # Seconds a whole cycle may take
+        self.db_manager = DatabaseManager(db_path, archive=TickArchive(archive_dir) if archive_dir else None)
+        self.hot_window = timedelta(hours=hot_window_hours)  # Market data kept in SQLite; older ticks are archived
+        self.archive_interval = archive_interval  # Seconds between compactions
         self.technical_analyzer = TechnicalAnalyzer()
+        self.indicator_engine = IndicatorEngine()
+        # Hot per-symbol tick history; the database is only the persistence tier
+        self.price_buffers = MarketDataBuffers(max(buffer_capacity, self.indicator_engine.warmup_length))
+        self.bar_aggregator = BarAggregator()  # OHLCV bars for every timeframe, built from the same ticks
+        self.timeframe = timeframe  # What analysis runs on: raw ticks or bar closes
         self.is_running = False
-        self.signals: List[TradingSignal] = []
+        # Active signals only, capped per symbol; expired ones go to handle_expired_signal
+        self.signals = SignalStore(max_signals_per_symbol, on_expire=self.handle_expired_signal)
+        # Settles BUY/SELL signals against live prices; realised accuracy can feed back into confidence
+        self.settlement = SettlementWorker(self.db_manager)
+        self.accuracy_feedback_weight = accuracy_feedback_weight
+        self.snapshots: Dict[str, SymbolSnapshot] = {}  # Latest snapshot per symbol
+        self.search_agent: Optional[WebSearchAgent] = None  # Shared, created on first use
+        self.dashboard = DashboardRenderer(self.target_symbols, refresh_interval=dashboard_refresh)
+        self.market_stream = market_stream  # Live websocket feed; simulated prices when None
         
         # Market data simulation (replace with real API)
         self.market_data = {}
@@ -443,10 +926,65 @@ class FutureTradingBot:
                 'high_24h': 1.05,
                 'low_24h': 0.95
             }
+            # Warm the tick buffer and rolling indicator state from stored history
+            if self.price_buffers.warm(symbol, self.db_manager):
+                self.market_data[symbol]['price'] = self.price_buffers.get(symbol).last_price
+            self.indicator_engine.warm(
+                symbol, self.price_buffers.prices(symbol, self.indicator_engine.warmup_length)
+            )
+            self.settlement.warm(symbol, self.db_manager.get_recent_outcomes(symbol, self.settlement.accuracy_window))
+            for bar_timeframe in self.bar_aggregator.timeframes:
+                self.bar_aggregator.warm(symbol, bar_timeframe, self.db_manager.get_recent_bars(
+                    symbol, bar_timeframe, self.bar_aggregator.history
+                ))
+    
+    def ingest_tick(self, market_data: MarketData):
+        """Feed one tick into the buffers, indicators and persistence queue"""
+        # Buffer for analysis, queue for persistence
+        self.price_buffers.append(market_data.symbol, market_data.price, market_data.volume, market_data.timestamp)
+        self.db_manager.store_market_data(market_data)
+        
+        # Fold the tick into the rolling indicators, bars and open-signal settlement
+        self.indicator_engine.update(market_data.symbol, market_data.price)
+        self.settlement.observe(market_data.symbol, market_data.price)
+        closed_bars = self.bar_aggregator.update(market_data.symbol, market_data.price, market_data.volume,
+                                                 market_data.timestamp)
+        if closed_bars:
+            self.db_manager.store_bars(closed_bars)
+    
+    def _stream_tick_to_market_data(self, tick: Dict[str, Any]) -> MarketData:
+        current_data = self.market_data[tick['symbol']]
+        previous_price = current_data['price']
+        current_data['price'] = tick['price']
+        current_data['volume'] = tick['volume']
+        current_data['change_24h'] = (tick['price'] - previous_price) / previous_price * 100
+        current_data['high_24h'] = max(current_data['high_24h'], tick['price'])
+        current_data['low_24h'] = min(current_data['low_24h'], tick['price'])
+        return MarketData(
+            symbol=tick['symbol'],
+            price=tick['price'],
+            volume=tick['volume'],
+            change_24h=current_data['change_24h'],
+            timestamp=tick['timestamp'],
+            high_24h=current_data['high_24h'],
+            low_24h=current_data['low_24h']
+        )
     
     async def fetch_real_time_data(self, symbol: str) -> Optional[MarketData]:
-        """Fetch real-time market data (simulated - replace with real API)"""
+        """Fetch real-time market data
+        
+        With a market stream, every tick queued since the last call is
+        ingested and the latest one returned (None if nothing new arrived).
+        Without one, a price move is simulated.
+        """
         try:
+            if self.market_stream:
+                latest = None
+                for tick in self.market_stream.drain(symbol):
+                    latest = self._stream_tick_to_market_data(tick)
+                    self.ingest_tick(latest)
+                return latest
+            
             # Simulate price movement
             current_data = self.market_data[symbol]
             price_change = np.random.normal(0, 0.001)  # Small random changes
@@ -466,37 +1004,78 @@ class FutureTradingBot:
                 low_24h=current_data['low_24h']
             )
             
-            # Store in database
-            self.db_manager.store_market_data(market_data)
-            
+            self.ingest_tick(market_data)
             return market_data
             
         except Exception as e:
             logger.error(f"Error fetching real-time data for {symbol}: {e}")
             return None
     
-    async def generate_prediction(self, symbol: str) -> Optional[PricePrediction]:
-        """Generate UP/DOWN prediction with duration and live system time"""
+    async def get_search_agent(self) -> WebSearchAgent:
+        """Shared WebSearchAgent, so its client, session and sentiment cache persist across cycles"""
+        if self.search_agent is None:
+            self.search_agent = WebSearchAgent(self.openai_api_key)
+        return await self.search_agent.start()
+    
+    async def take_snapshot(self, symbol: str, window: int = 50,
+                            timeframe: Optional[str] = None) -> Optional[SymbolSnapshot]:
+        """Fetch one tick for a symbol and capture everything analysis needs from it
+        
+        On a bar timeframe the window holds the latest bar closes (the open bar
+        last, so its close is the current price) instead of raw ticks.
+        """
+        timeframe = timeframe or self.timeframe
+        market_data = await self.fetch_real_time_data(symbol)
+        if not market_data:
+            return None
+        
+        if timeframe == TICK_TIMEFRAME:
+            prices = self.price_buffers.prices(symbol, window).copy()
+            volumes = self.price_buffers.volumes(symbol, window).copy()
+            indicators = self.indicator_engine.snapshot(symbol)
+        else:
+            prices = self.bar_aggregator.closes(symbol, timeframe, window)
+            volumes = self.bar_aggregator.volumes(symbol, timeframe, window)
+            indicators = None  # Rolling indicators are tick-based; recomputed from the closes
+        
+        snapshot = SymbolSnapshot(
+            symbol=symbol,
+            market_data=market_data,
+            prices=prices,
+            volumes=volumes,
+            indicators=indicators,
+            timestamp=datetime.now(),
+            timeframe=timeframe
+        )
+        self.snapshots[symbol] = snapshot
+        return snapshot
+    
+    async def generate_prediction(self, symbol: str, snapshot: Optional[SymbolSnapshot] = None) -> Optional[PricePrediction]:
+        """Generate UP/DOWN prediction with duration and live system time
+        
+        Takes a fresh snapshot (one new tick) unless one is passed in.
+        """
         try:
             # Get current system time
             current_time = datetime.now()
             
             # Get recent market data
-            market_data = await self.fetch_real_time_data(symbol)
-            if not market_data:
+            if snapshot is None:
+                snapshot = await self.take_snapshot(symbol)
+            if not snapshot:
                 return None
+            market_data = snapshot.market_data
             
             # Get historical prices for analysis
-            recent_prices = self.db_manager.get_recent_prices(symbol, 50)
+            recent_prices = snapshot.prices
             if len(recent_prices) < 10:
                 logger.warning(f"Insufficient price data for prediction: {symbol}")
                 return None
             
-            # Get volumes (simulated for now)
-            recent_volumes = [float(1000000 + np.random.randint(-100000, 100000)) for _ in range(len(recent_prices))]
-            
             # Use technical analysis for prediction
-            prediction_data = self.technical_analyzer.predict_price_direction(recent_prices, recent_volumes)
+            prediction_data = self.technical_analyzer.predict_price_direction(
+                recent_prices, snapshot.volumes, indicators=snapshot.indicators
+            )
             
             # Create expiry time based on predicted duration
             expiry_time = current_time + timedelta(minutes=prediction_data['duration'])
@@ -525,38 +1104,38 @@ class FutureTradingBot:
             logger.error(f"Error generating prediction for {symbol}: {e}")
             return None
 
-    async def generate_trading_signal(self, symbol: str) -> Optional[TradingSignal]:
-        """Generate enhanced trading signal with UP/DOWN prediction"""
+    async def generate_trading_signal(self, symbol: str, snapshot: Optional[SymbolSnapshot] = None,
+                                      prediction: Optional[PricePrediction] = None) -> Optional[TradingSignal]:
+        """Generate enhanced trading signal with UP/DOWN prediction
+        
+        Reuses the given snapshot and prediction; only what is missing is computed.
+        """
         try:
-            # Get prediction first
-            prediction = await self.generate_prediction(symbol)
-            if not prediction:
+            # Get recent market data
+            if snapshot is None:
+                snapshot = await self.take_snapshot(symbol)
+            if not snapshot:
                 return None
+            market_data = snapshot.market_data
             
-            # Get recent market data
-            market_data = await self.fetch_real_time_data(symbol)
-            if not market_data:
+            # Get prediction first
+            if prediction is None:
+                prediction = await self.generate_prediction(symbol, snapshot)
+            if not prediction:
                 return None
             
-            # Get historical prices for technical analysis
-            recent_prices = self.db_manager.get_recent_prices(symbol, 50)
-            if len(recent_prices) < 20:
+            # Technical analysis needs a full window
+            if len(snapshot.prices) < 20:
                 logger.warning(f"Insufficient price data for {symbol}")
                 return None
             
-            # Perform technical analysis
-            sma_20 = self.technical_analyzer.calculate_sma(recent_prices, 20)
-            sma_50 = self.technical_analyzer.calculate_sma(recent_prices, 50)
-            rsi = self.technical_analyzer.calculate_rsi(recent_prices)
-            macd = self.technical_analyzer.calculate_macd(recent_prices)
-            
             # Use AI agent for sentiment analysis (if API key available)
             sentiment_analysis = {'sentiment_score': 0, 'confidence': 0.5}
             if self.openai_api_key and self.openai_api_key != 'demo-key-not-set':
                 try:
-                    async with WebSearchAgent(self.openai_api_key) as search_agent:
-                        news_data = await search_agent.search_market_news(symbol)
-                        sentiment_analysis = await search_agent.analyze_market_sentiment(symbol, news_data)
+                    search_agent = await self.get_search_agent()
+                    news_data = await search_agent.search_market_news(symbol)
+                    sentiment_analysis = await search_agent.analyze_market_sentiment(symbol, news_data)
                 except:
                     pass  # Continue without sentiment if API fails
             
@@ -591,19 +1170,21 @@ class FutureTradingBot:
                 symbol=symbol,
                 signal_type=signal_type,
                 prediction=prediction.predicted_direction,
-                confidence=prediction.confidence,
+                confidence=self.settlement.adjust_confidence(symbol, prediction.confidence,
+                                                             self.accuracy_feedback_weight),
                 entry_price=current_price,
                 stop_loss=stop_loss,
                 take_profit=take_profit,
                 timestamp=current_time,
                 reasoning=reasoning,
-                timeframe="5m",
+                timeframe=snapshot.timeframe,
                 duration_minutes=prediction.duration_minutes,
                 target_price=prediction.predicted_price
             )
             
-            # Store signal in database
-            self.db_manager.store_signal(signal)
+            # Store signal in database and watch it until it settles
+            await self.db_manager.store_signal_async(signal)
+            self.settlement.track(signal)
             
             return signal
             
@@ -611,20 +1192,76 @@ class FutureTradingBot:
             logger.error(f"Error generating trading signal for {symbol}: {e}")
             return None
     
+    async def evaluate_symbol(self, symbol: str) -> tuple:
+        """Take one snapshot and derive (prediction, signal) from it"""
+        snapshot = await self.take_snapshot(symbol)
+        if not snapshot:
+            return None, None
+        prediction = await self.generate_prediction(symbol, snapshot)
+        signal = await self.generate_trading_signal(symbol, snapshot, prediction)
+        return prediction, signal
+    
+    async def run_for_symbols(self, worker, symbols: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Run `worker(symbol)` for every symbol concurrently
+        
+        At most `max_concurrency` symbols run at once, each one is cancelled
+        after `symbol_timeout` seconds, and whatever is still running at
+        `cycle_deadline` is cancelled so the cycle returns a partial result.
+        Returns {symbol: result} for symbols that finished, in symbol order.
+        """
+        symbols = symbols if symbols is not None else self.target_symbols
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def run_one(symbol: str):
+            async with semaphore:
+                return await asyncio.wait_for(worker(symbol), timeout=self.symbol_timeout)
+        
+        tasks = {symbol: asyncio.create_task(run_one(symbol)) for symbol in symbols}
+        if not tasks:
+            return {}
+        done, pending = await asyncio.wait(tasks.values(), timeout=self.cycle_deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        results = {}
+        for symbol, task in tasks.items():
+            if task in pending:
+                logger.warning(f"{symbol}: cycle deadline of {self.cycle_deadline}s reached, skipping")
+            elif task.exception() is not None:
+                if isinstance(task.exception(), asyncio.TimeoutError):
+                    logger.warning(f"{symbol}: timed out after {self.symbol_timeout}s")
+                else:
+                    logger.error(f"{symbol}: analysis failed: {task.exception()}")
+            else:
+                results[symbol] = task.result()
+        return results
+    
     async def run_analysis_cycle(self):
         """Run one complete analysis cycle for all symbols"""
         logger.info("Starting analysis cycle...")
         
+        results = await self.run_for_symbols(self.generate_trading_signal)
+        
         new_signals = []
-        for symbol in self.target_symbols:
-            signal = await self.generate_trading_signal(symbol)
+        for symbol, signal in results.items():
             if signal:
                 new_signals.append(signal)
                 logger.info(f"Generated signal for {symbol}: {signal.signal_type} (confidence: {signal.confidence:.2f})")
+                self.dashboard.publish(signal)
         
         self.signals.extend(new_signals)
         return new_signals
     
+    def handle_expired_signal(self, signal: TradingSignal, reason: str):
+        """Hook for signals leaving the store (expired, or evicted by a newer one)
+        
+        Outcomes are settled separately by `self.settlement`, which keeps
+        watching evicted signals until they expire.
+        """
+        logger.debug(f"{signal.symbol}: {signal.prediction} signal from {signal.timestamp.strftime('%H:%M:%S')} {reason}")
+    
     def display_signals(self, signals: List[TradingSignal]):
         """Display trading signals with UP/DOWN predictions and live time"""
         if not signals:
@@ -641,7 +1278,7 @@ class FutureTradingBot:
         
         for i, signal in enumerate(signals, 1):
             # Calculate time remaining
-            expiry_time = signal.timestamp + timedelta(minutes=signal.duration_minutes)
+            expiry_time = signal.expiry_time
             time_remaining = expiry_time - current_time
             
             # Direction emoji and color coding
@@ -677,71 +1314,58 @@ class FutureTradingBot:
         current_time = datetime.now()
         logger.info(f"Starting prediction cycle at {current_time.strftime('%H:%M:%S')}")
         
+        results = await self.run_for_symbols(self.evaluate_symbol)
+        
         predictions = []
         signals = []
         
-        for symbol in self.target_symbols:
-            # Generate prediction
-            prediction = await self.generate_prediction(symbol)
+        for symbol, (prediction, signal) in results.items():
             if prediction:
                 predictions.append(prediction)
             
-            # Generate trading signal
-            signal = await self.generate_trading_signal(symbol)
             if signal:
                 signals.append(signal)
                 logger.info(f"[{current_time.strftime('%H:%M:%S')}] {symbol}: {signal.prediction} for {signal.duration_minutes}min (confidence: {signal.confidence:.1%})")
+                self.dashboard.publish(signal)
         
         self.signals.extend(signals)
         return signals
 
     def display_live_dashboard(self):
-        """Display live trading dashboard"""
-        current_time = datetime.now()
-        print("\n" + "🔴"*30 + " LIVE DASHBOARD " + "🔴"*30)
-        print(f"⏰ System Time: {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"🌐 Platform: https://market-qx.pro/en/trade/")
-        print(f"📊 Monitoring: {len(self.target_symbols)} symbols")
-        print(f"📈 Active Signals: {len([s for s in self.signals[-10:] if s.prediction in ['UP', 'DOWN']])}")
-        print("="*75)
-        
-        # Show recent signals summary
-        recent_signals = self.signals[-5:] if self.signals else []
-        for signal in recent_signals:
-            time_ago = (current_time - signal.timestamp).total_seconds() / 60
-            status = "🟢 ACTIVE" if time_ago < signal.duration_minutes else "⏳ EXPIRED"
-            print(f"{signal.symbol}: {signal.prediction} | {status} | {time_ago:.1f}min ago")
-        
-        print("="*75)
-    
-    async def start_live_trading(self, interval_seconds: int = 60):
-        """Start live UP/DOWN predictions with system time integration"""
+        """Print the dashboard once (latest signal per symbol); live mode redraws it in place"""
+        print("\n" + "\n".join(self.dashboard.rows()))
+    
+    async def start_live_trading(self, interval_seconds: int = 60, min_symbol_interval: float = 5.0):
+        """Start live UP/DOWN predictions with system time integration
+        
+        With a market stream, each symbol is re-evaluated as its ticks arrive
+        (at most once per `min_symbol_interval` seconds). Every symbol also
+        gets a full cycle every `interval_seconds`.
+        """
         logger.info("Starting live UP/DOWN prediction bot...")
         self.is_running = True
+        scheduler = SignalScheduler(self, min_interval=min_symbol_interval, full_cycle_seconds=interval_seconds)
         
         try:
-            # Show initial dashboard
-            self.display_live_dashboard()
+            if self.market_stream:
+                await self.market_stream.start()
             
+            # Render the dashboard on its own thread
+            self.dashboard.start()
+            await self.settlement.start()
+            
+            await scheduler.start()
+            last_compaction = time.monotonic()
             while self.is_running:
-                # Show current time
-                current_time = datetime.now()
-                print(f"\n⏰ [{current_time.strftime('%H:%M:%S')}] Analyzing market conditions...")
-                
-                # Run prediction cycle
-                signals = await self.run_prediction_cycle()
+                # Persist queued market data off the event loop
+                await asyncio.sleep(self.db_manager.flush_interval)
+                await self.db_manager.flush_async()
+                self.signals.sweep()
                 
-                # Display predictions
-                self.display_signals(signals)
-                
-                # Show countdown to next update
-                for remaining in range(interval_seconds, 0, -1):
-                    print(f"\r⏳ Next update in: {remaining} seconds...", end="", flush=True)
-                    await asyncio.sleep(1)
-                    if not self.is_running:
-                        break
-                
-                print()  # New line after countdown
+                # Keep only the hot window in SQLite
+                if self.db_manager.archive and time.monotonic() - last_compaction >= self.archive_interval:
+                    last_compaction = time.monotonic()
+                    await self.db_manager.compact_async(datetime.now() - self.hot_window)
                 
         except KeyboardInterrupt:
             logger.info("Bot stopped by user")
@@ -749,14 +1373,43 @@ class FutureTradingBot:
             logger.error(f"Error in live trading loop: {e}")
         finally:
             self.is_running = False
+            await scheduler.stop()
+            await self.settlement.stop()
+            self.dashboard.stop()
+            if self.market_stream:
+                await self.market_stream.stop()
+            await self.db_manager.flush_async()
+            if self.search_agent:
+                await self.search_agent.close()
+                self.search_agent = None
     
     def stop(self):
         """Stop the trading bot"""
         self.is_running = False
         logger.info("Trading bot stopped")
 
+def bot_settings_from_config(config) -> Dict[str, Any]:
+    """FutureTradingBot keyword arguments from the settings in a config module"""
+    bot_settings = {
+        'max_concurrency': getattr(config, 'MAX_CONCURRENT_SYMBOLS', 5),
+        'symbol_timeout': getattr(config, 'SYMBOL_TIMEOUT_SECONDS', 20.0),
+        'cycle_deadline': getattr(config, 'CYCLE_DEADLINE_SECONDS', 45.0),
+        'timeframe': getattr(config, 'ANALYSIS_TIMEFRAME', TICK_TIMEFRAME),
+        'max_signals_per_symbol': getattr(config, 'MAX_SIGNALS_PER_SYMBOL', 5),
+        'accuracy_feedback_weight': getattr(config, 'ACCURACY_FEEDBACK_WEIGHT', 0.0)
+    }
+    # Compact old ticks into the columnar archive when configured
+    if getattr(config, 'ARCHIVE_DIR', None):
+        bot_settings.update({
+            'archive_dir': config.ARCHIVE_DIR,
+            'hot_window_hours': getattr(config, 'HOT_WINDOW_HOURS', 24),
+            'archive_interval': getattr(config, 'ARCHIVE_INTERVAL_SECONDS', 3600)
+        })
+    return bot_settings
+
 async def main():
     """Main function to run the trading bot"""
+    setup_logging()
     
     # Configuration
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
@@ -773,10 +1426,23 @@ async def main():
         'USD/DZD'
     ]
     
+    # Stream live ticks when enabled in config.py (simulated prices otherwise)
+    market_stream = None
+    bot_settings = {}
+    try:
+        import config
+        if getattr(config, 'USE_WEBSOCKET_FEED', False):
+            market_stream = MarketStream(config.WEBSOCKET_ENDPOINTS, TARGET_SYMBOLS)
+        bot_settings = bot_settings_from_config(config)
+    except ImportError:
+        pass
+    
     # Initialize and start the bot
     bot = FutureTradingBot(
         openai_api_key=OPENAI_API_KEY,
-        target_symbols=TARGET_SYMBOLS
+        target_symbols=TARGET_SYMBOLS,
+        market_stream=market_stream,
+        **bot_settings
     )
     
     print("🚀 Future Trading Bot - Live UP/DOWN Predictions")
@@ -17,10 +17,18 @@ TARGET_SYMBOLS = [
 ANALYSIS_INTERVAL_SECONDS = 300  # 5 minutes
 MAX_SIGNALS_PER_SYMBOL = 5
 CONFIDENCE_THRESHOLD = 0.6
+ACCURACY_FEEDBACK_WEIGHT = 0.0  # 0-1: blend each symbol's realised signal accuracy into new signals' confidence
+ANALYSIS_TIMEFRAME = "tick"  # "tick" for raw ticks, or a bar timeframe: "1m", "5m", "15m", "1h"
+MAX_CONCURRENT_SYMBOLS = 5  # Symbols analyzed in parallel per cycle
+SYMBOL_TIMEOUT_SECONDS = 20  # Give up on one symbol after this long
+CYCLE_DEADLINE_SECONDS = 45  # Return a partial cycle after this long
 
 # Database Configuration
 DATABASE_PATH = "trading_bot.db"
 LOG_FILE = "trading_bot.log"
+ARCHIVE_DIR = "tick_archive"  # Columnar archive for old market data (None keeps everything in SQLite)
+HOT_WINDOW_HOURS = 24  # Market data kept in SQLite; older ticks are compacted into ARCHIVE_DIR
+ARCHIVE_INTERVAL_SECONDS = 3600  # How often to compact
 
 # Risk Management
 DEFAULT_STOP_LOSS_PERCENT = 2.0  # 2%
@@ -37,6 +45,7 @@ WEBSOCKET_ENDPOINTS = {
     'quotex': 'wss://market-qx.pro/ws/',  # Replace with actual endpoint
     'backup': 'wss://backup-feed.com/ws/'
 }
+USE_WEBSOCKET_FEED = False  # Stream ticks from WEBSOCKET_ENDPOINTS (in priority order) instead of simulating
 
 # Notification Settings
 NOTIFICATIONS = {
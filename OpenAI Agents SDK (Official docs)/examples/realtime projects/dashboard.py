@@ -0,0 +1,158 @@
+"""
+Console dashboard for the Future Trading Bot
+Renders the latest signal per symbol at a bounded refresh rate, redrawing only rows that changed
+"""
+
+import logging
+import sys
+from datetime import datetime
+from threading import Thread, Event, Lock
+from typing import List, Dict, Any, Optional, Callable, TextIO
+
+DIRECTION_EMOJI = {'UP': '📈', 'DOWN': '📉'}
+ACTION_LABEL = {'BUY': '🟢 BUY ', 'SELL': '🔴 SELL'}
+
+
+class DashboardRenderer:
+    """Draws one row per symbol from the latest published signal
+
+    Analysis only calls `publish()`, which stores the signal and returns.
+    Rendering runs on its own thread at most once per `refresh_interval`.
+    On a terminal, each frame is diffed against the previous one and only
+    changed rows are rewritten in place. When the stream is not a TTY
+    (a log file, a pipe), every newly published signal is written as one
+    plain line instead. State is one signal per symbol, so memory stays
+    flat no matter how long the bot runs.
+
+    Row diffs assume nothing else writes to the terminal. While the live
+    dashboard runs, console handlers of `logger` (the root logger by
+    default) are detached, so logs go only to their file handlers.
+    """
+
+    def __init__(self, symbols: List[str], stream: Optional[TextIO] = None, refresh_interval: float = 0.5,
+                 clock: Callable[[], datetime] = datetime.now, logger: Optional[logging.Logger] = None):
+        self.symbols = list(symbols)
+        self.stream = stream or sys.stdout
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self.interactive = self.stream.isatty()
+        self.lock = Lock()
+        self.latest: Dict[str, Any] = {}  # symbol -> latest signal
+        self.logged: Dict[str, Any] = {}  # symbol -> last signal written in plain mode
+        self.previous_rows: List[str] = []
+        self.rows_written = 0
+        self.stopping = Event()
+        self.thread: Optional[Thread] = None
+        self.logger = logger or logging.getLogger()
+        self.muted_handlers: List[logging.Handler] = []
+
+    def publish(self, signal):
+        """Record a new signal for its symbol; O(1), never touches the terminal"""
+        with self.lock:
+            if signal.symbol not in self.latest and signal.symbol not in self.symbols:
+                self.symbols.append(signal.symbol)
+            self.latest[signal.symbol] = signal
+
+    def active_count(self, now: Optional[datetime] = None) -> int:
+        """Symbols whose latest signal is directional and not yet expired"""
+        now = now or self.clock()
+        with self.lock:
+            signals = list(self.latest.values())
+        return sum(1 for signal in signals if signal.prediction in DIRECTION_EMOJI and
+                   now < signal.expiry_time)
+
+    @staticmethod
+    def format_signal(signal, now: Optional[datetime] = None) -> str:
+        """One line for a signal; with `now`, includes the time left before expiry"""
+        expiry_time = signal.expiry_time
+        line = (f"{signal.symbol:<10} {DIRECTION_EMOJI.get(signal.prediction, '➡️')} {signal.prediction:<8} "
+                f"{ACTION_LABEL.get(signal.signal_type, '🟡 HOLD')} {signal.confidence:>6.1%}  "
+                f"entry {signal.entry_price:.6f}  target {signal.target_price:.6f}  "
+                f"expires {expiry_time.strftime('%H:%M:%S')}")
+        if now is not None:
+            remaining = (expiry_time - now).total_seconds() / 60
+            line += f"  {remaining:.1f}min left" if remaining > 0 else "  ⏳ EXPIRED"
+        return line
+
+    def rows(self, now: Optional[datetime] = None) -> List[str]:
+        """The full dashboard as a list of lines"""
+        now = now or self.clock()
+        with self.lock:
+            symbols = list(self.symbols)
+            latest = dict(self.latest)
+        rows = [
+            f"🔴 LIVE DASHBOARD  ⏰ {now.strftime('%Y-%m-%d %H:%M:%S')}  "
+            f"📊 {len(symbols)} symbols  📈 {self.active_count(now)} active signals",
+            "=" * 75
+        ]
+        for symbol in symbols:
+            signal = latest.get(symbol)
+            rows.append(self.format_signal(signal, now) if signal else f"{symbol:<10} waiting for first signal")
+        return rows
+
+    def render(self) -> str:
+        """Output that brings the screen up to date ('' when nothing changed)"""
+        if not self.interactive:
+            with self.lock:
+                changed = [signal for symbol, signal in self.latest.items() if self.logged.get(symbol) is not signal]
+                self.logged.update({signal.symbol: signal for signal in changed})
+            self.rows_written += len(changed)
+            return ''.join(f"[{signal.timestamp.strftime('%H:%M:%S')}] {self.format_signal(signal)}\n"
+                           for signal in changed)
+
+        rows = self.rows()
+        output = [] if self.previous_rows else ['\x1b[2J']  # Clear the screen on the first frame
+        for i, row in enumerate(rows):
+            if i >= len(self.previous_rows) or self.previous_rows[i] != row:
+                output.append(f"\x1b[{i + 1};1H\x1b[2K{row}")
+                self.rows_written += 1
+        for i in range(len(rows), len(self.previous_rows)):
+            output.append(f"\x1b[{i + 1};1H\x1b[2K")
+        if output:
+            output.append(f"\x1b[{len(rows) + 1};1H")  # Park the cursor below the dashboard
+        self.previous_rows = rows
+        return ''.join(output)
+
+    def _run(self):
+        while not self.stopping.wait(self.refresh_interval):
+            self.refresh()
+
+    def refresh(self):
+        """Render one frame now"""
+        output = self.render()
+        if output:
+            self.stream.write(output)
+            self.stream.flush()
+
+    def mute_console_logging(self):
+        """Detach handlers writing to a terminal; a scrolled screen would misplace the row diffs"""
+        for handler in list(self.logger.handlers):
+            stream = getattr(handler, 'stream', None)
+            if (isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler) and
+                    stream is not None and (stream is self.stream or getattr(stream, 'isatty', lambda: False)())):
+                self.logger.removeHandler(handler)
+                self.muted_handlers.append(handler)
+
+    def restore_console_logging(self):
+        for handler in self.muted_handlers:
+            self.logger.addHandler(handler)
+        self.muted_handlers = []
+
+    def start(self):
+        """Start the render thread"""
+        if self.thread is None:
+            if self.interactive:
+                self.mute_console_logging()
+            self.stopping.clear()
+            self.refresh()
+            self.thread = Thread(target=self._run, name='dashboard', daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """Stop the render thread after drawing a final frame"""
+        if self.thread is not None:
+            self.stopping.set()
+            self.thread.join()
+            self.thread = None
+            self.refresh()
+            self.restore_console_logging()
@@ -6,7 +6,7 @@ This script demonstrates the bot's capabilities with sample data
 import asyncio
 import os
 from datetime import datetime
-from bot import FutureTradingBot, TradingSignal
+from bot import FutureTradingBot, TradingSignal, setup_logging
 
 async def demo_bot():
     """Demo function to show bot capabilities"""
@@ -58,4 +58,5 @@ async def demo_bot():
     print("2. Run: python bot.py")
 
 if __name__ == "__main__":
+    setup_logging()
     asyncio.run(demo_bot())
@@ -0,0 +1,290 @@
+"""
+Indicator Engine for the Future Trading Bot
+Stateful O(1)-per-tick indicators per symbol, plus vectorized batch series
+"""
+
+import logging
+from collections import deque
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Batch mode: full indicator series over an array in one vectorized pass.
+# Every series has the same length as the input and is NaN during warm-up.
+# ---------------------------------------------------------------------------
+
+def _recursive_ema(values: np.ndarray, alpha: float) -> np.ndarray:
+    """Run y[t] = alpha * x[t] + (1 - alpha) * y[t-1] with y[0] = x[0]"""
+    return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def sma_series(prices: Sequence[float], period: int) -> np.ndarray:
+    """Simple Moving Average series"""
+    prices = np.asarray(prices, dtype=float)
+    out = np.full(prices.shape, np.nan)
+    if len(prices) < period:
+        return out
+    cumsum = np.cumsum(np.insert(prices, 0, 0.0))
+    out[period - 1:] = (cumsum[period:] - cumsum[:-period]) / period
+    return out
+
+
+def ema_series(prices: Sequence[float], period: int) -> np.ndarray:
+    """Exponential Moving Average series, seeded with the SMA of the first period"""
+    prices = np.asarray(prices, dtype=float)
+    out = np.full(prices.shape, np.nan)
+    if len(prices) < period:
+        return out
+    seeded = prices[period - 1:].copy()
+    seeded[0] = prices[:period].mean()
+    out[period - 1:] = _recursive_ema(seeded, 2 / (period + 1))
+    return out
+
+
+def rsi_series(prices: Sequence[float], period: int = 14) -> np.ndarray:
+    """Relative Strength Index series using Wilder's smoothing"""
+    prices = np.asarray(prices, dtype=float)
+    out = np.full(prices.shape, np.nan)
+    if len(prices) < period + 1:
+        return out
+    deltas = np.diff(prices)
+    gains = np.clip(deltas, 0, None)
+    losses = np.clip(-deltas, 0, None)
+
+    gains_seeded = gains[period - 1:].copy()
+    losses_seeded = losses[period - 1:].copy()
+    gains_seeded[0] = gains[:period].mean()
+    losses_seeded[0] = losses[:period].mean()
+    avg_gain = _recursive_ema(gains_seeded, 1 / period)
+    avg_loss = _recursive_ema(losses_seeded, 1 / period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    out[period:] = np.where(avg_loss == 0, 100.0, rsi)
+    return out
+
+
+def macd_series(prices: Sequence[float], fast_period: int = 12, slow_period: int = 26,
+                signal_period: int = 9) -> Dict[str, np.ndarray]:
+    """MACD line, signal line (EMA of the MACD line) and histogram series"""
+    prices = np.asarray(prices, dtype=float)
+    macd_line = ema_series(prices, fast_period) - ema_series(prices, slow_period)
+    signal_line = np.full(prices.shape, np.nan)
+    if len(prices) >= slow_period:
+        signal_line[slow_period - 1:] = ema_series(macd_line[slow_period - 1:], signal_period)
+    return {
+        'macd': macd_line,
+        'signal': signal_line,
+        'histogram': macd_line - signal_line
+    }
+
+
+def compute_series(prices: Sequence[float], sma_periods: Sequence[int] = (5, 10, 20, 50),
+                   ema_periods: Sequence[int] = (12, 26), rsi_period: int = 14,
+                   macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9) -> Dict[str, Any]:
+    """Compute every configured indicator series over a price array"""
+    prices = np.asarray(prices, dtype=float)
+    return {
+        'sma': {period: sma_series(prices, period) for period in sma_periods},
+        'ema': {period: ema_series(prices, period) for period in ema_periods},
+        'rsi': rsi_series(prices, rsi_period),
+        'macd': macd_series(prices, macd_fast, macd_slow, macd_signal)
+    }
+
+
+# ---------------------------------------------------------------------------
+# Incremental mode: rolling state updated in O(1) per new tick.
+# ---------------------------------------------------------------------------
+
+class RollingSMA:
+    """Simple Moving Average over a fixed window with a running sum"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+
+    def update(self, price: float) -> Optional[float]:
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(price)
+        self.total += price
+        return self.value
+
+    @property
+    def value(self) -> Optional[float]:
+        if len(self.window) < self.period:
+            return None
+        return self.total / self.period
+
+
+class RollingEMA:
+    """Exponential Moving Average seeded with the SMA of the first period values"""
+
+    def __init__(self, period: int, alpha: Optional[float] = None):
+        self.period = period
+        self.alpha = alpha if alpha is not None else 2 / (period + 1)
+        self.count = 0
+        self.seed_total = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> Optional[float]:
+        if self.value is not None:
+            self.value += self.alpha * (x - self.value)
+            return self.value
+        self.count += 1
+        self.seed_total += x
+        if self.count == self.period:
+            self.value = self.seed_total / self.period
+        return self.value
+
+
+class WilderRSI:
+    """Relative Strength Index with Wilder-smoothed average gain and loss"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_price: Optional[float] = None
+        self.avg_gain = RollingEMA(period, alpha=1 / period)
+        self.avg_loss = RollingEMA(period, alpha=1 / period)
+
+    def update(self, price: float) -> Optional[float]:
+        if self.prev_price is not None:
+            delta = price - self.prev_price
+            self.avg_gain.update(delta if delta > 0 else 0.0)
+            self.avg_loss.update(-delta if delta < 0 else 0.0)
+        self.prev_price = price
+        return self.value
+
+    @property
+    def value(self) -> Optional[float]:
+        avg_gain, avg_loss = self.avg_gain.value, self.avg_loss.value
+        if avg_gain is None or avg_loss is None:
+            return None
+        if avg_loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+class RollingMACD:
+    """MACD with a true signal line (EMA of the MACD line)"""
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        self.fast = RollingEMA(fast_period)
+        self.slow = RollingEMA(slow_period)
+        self.signal = RollingEMA(signal_period)
+        self.macd: Optional[float] = None
+
+    def update(self, price: float) -> Optional[Dict[str, float]]:
+        fast = self.fast.update(price)
+        slow = self.slow.update(price)
+        if fast is not None and slow is not None:
+            self.macd = fast - slow
+            self.signal.update(self.macd)
+        return self.value
+
+    @property
+    def value(self) -> Optional[Dict[str, float]]:
+        if self.macd is None or self.signal.value is None:
+            return None
+        return {
+            'macd': self.macd,
+            'signal': self.signal.value,
+            'histogram': self.macd - self.signal.value
+        }
+
+
+class SymbolIndicators:
+    """Rolling indicator state for a single symbol"""
+
+    def __init__(self, sma_periods: Sequence[int] = (5, 10, 20, 50), ema_periods: Sequence[int] = (12, 26),
+                 rsi_period: int = 14, macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9):
+        self.sma = {period: RollingSMA(period) for period in sma_periods}
+        self.ema = {period: RollingEMA(period) for period in ema_periods}
+        self.rsi = WilderRSI(rsi_period)
+        self.macd = RollingMACD(macd_fast, macd_slow, macd_signal)
+        self.last_price: Optional[float] = None
+        self.ticks = 0
+
+    def update(self, price: float):
+        """Fold one new price into every indicator"""
+        price = float(price)
+        for sma in self.sma.values():
+            sma.update(price)
+        for ema in self.ema.values():
+            ema.update(price)
+        self.rsi.update(price)
+        self.macd.update(price)
+        self.last_price = price
+        self.ticks += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current indicator values (None where still warming up)"""
+        return {
+            'sma': {period: sma.value for period, sma in self.sma.items()},
+            'ema': {period: ema.value for period, ema in self.ema.items()},
+            'rsi': self.rsi.value,
+            'macd': self.macd.value,
+            'price': self.last_price,
+            'ticks': self.ticks
+        }
+
+
+class IndicatorEngine:
+    """Per-symbol incremental indicators with a vectorized batch mode"""
+
+    def __init__(self, sma_periods: Sequence[int] = (5, 10, 20, 50), ema_periods: Sequence[int] = (12, 26),
+                 rsi_period: int = 14, macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9):
+        self.settings = {
+            'sma_periods': tuple(sma_periods),
+            'ema_periods': tuple(ema_periods),
+            'rsi_period': rsi_period,
+            'macd_fast': macd_fast,
+            'macd_slow': macd_slow,
+            'macd_signal': macd_signal
+        }
+        self.symbols: Dict[str, SymbolIndicators] = {}
+
+    @property
+    def warmup_length(self) -> int:
+        """Number of prices needed before every indicator has a value"""
+        s = self.settings
+        return max(max(s['sma_periods'], default=0), max(s['ema_periods'], default=0),
+                   s['rsi_period'] + 1, s['macd_slow'] + s['macd_signal'] - 1)
+
+    def _state(self, symbol: str) -> SymbolIndicators:
+        state = self.symbols.get(symbol)
+        if state is None:
+            state = self.symbols[symbol] = SymbolIndicators(**self.settings)
+        return state
+
+    def update(self, symbol: str, price: float) -> Dict[str, Any]:
+        """Fold a new tick into the symbol's state and return the latest values"""
+        state = self._state(symbol)
+        state.update(price)
+        return state.snapshot()
+
+    def warm(self, symbol: str, prices: Sequence[float]):
+        """Replay historical prices (oldest first) to build up the symbol's state"""
+        state = self._state(symbol)
+        for price in prices:
+            state.update(price)
+        logger.debug(f"Warmed indicators for {symbol} with {len(prices)} prices")
+
+    def reset(self, symbol: str):
+        """Drop the rolling state for a symbol"""
+        self.symbols.pop(symbol, None)
+
+    def snapshot(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Latest indicator values for a symbol, or None if it has never ticked"""
+        state = self.symbols.get(symbol)
+        return state.snapshot() if state else None
+
+    def batch(self, prices: Sequence[float]) -> Dict[str, Any]:
+        """Full indicator series over a price array using the engine's settings"""
+        return compute_series(prices, **self.settings)
@@ -0,0 +1,150 @@
+"""
+Streaming market data ingestion for the Future Trading Bot
+Persistent websocket per endpoint, reconnect with backoff, failover between feeds
+"""
+
+import asyncio
+import json
+import logging
+import random
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+
+def subscribe_message(symbols: List[str]) -> str:
+    """Single multiplexed subscription for every symbol on one connection"""
+    return json.dumps({'action': 'subscribe', 'symbols': symbols})
+
+
+def parse_tick(message: str) -> Optional[Dict[str, Any]]:
+    """Turn a feed message into a tick dict, or None for non-tick messages
+
+    Expects JSON like {"symbol": "USD/CAD", "price": 1.3542, "volume": 1200,
+    "timestamp": 1735689600.0}; volume and timestamp are optional. Malformed
+    values (a non-numeric price, an out-of-range timestamp) also give None,
+    so one bad frame never drops the connection.
+    """
+    try:
+        data = json.loads(message)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict) or 'symbol' not in data or 'price' not in data:
+        return None
+    timestamp = data.get('timestamp')
+    try:
+        return {
+            'symbol': data['symbol'],
+            'price': float(data['price']),
+            'volume': float(data.get('volume', 0.0)),
+            'timestamp': datetime.fromtimestamp(timestamp) if timestamp else datetime.now()
+        }
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+class MarketStream:
+    """Streams ticks from websocket endpoints into per-symbol queues
+
+    Every endpoint keeps its own persistent connection with exponential
+    backoff on reconnect. Endpoints are listed in priority order; only
+    ticks from the highest-priority connected endpoint are delivered, so
+    the backup feed is a hot standby that takes over the moment the
+    primary drops and hands back when it returns.
+    """
+
+    def __init__(self, endpoints: Dict[str, str], symbols: List[str], queue_size: int = 1000,
+                 initial_backoff: float = 0.5, max_backoff: float = 30.0,
+                 parse: Callable[[str], Optional[Dict[str, Any]]] = parse_tick,
+                 subscribe: Callable[[List[str]], str] = subscribe_message):
+        self.endpoints = dict(endpoints)  # name -> url, in priority order
+        self.symbols = list(symbols)
+        self.queue_size = queue_size
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.parse = parse
+        self.subscribe = subscribe
+        self.queues: Dict[str, asyncio.Queue] = {symbol: asyncio.Queue(maxsize=queue_size) for symbol in self.symbols}
+        self.tick_events: Dict[str, asyncio.Event] = {symbol: asyncio.Event() for symbol in self.symbols}  # Set on arrival
+        self.connected: Dict[str, bool] = {name: False for name in self.endpoints}
+        self.tasks: List[asyncio.Task] = []
+        self.dropped_ticks = 0
+
+    @property
+    def active_endpoint(self) -> Optional[str]:
+        """Highest-priority endpoint that is currently connected"""
+        return next((name for name in self.endpoints if self.connected[name]), None)
+
+    async def start(self):
+        """Open one connection loop per endpoint"""
+        if not self.tasks:
+            self.tasks = [asyncio.create_task(self._run_endpoint(name, url)) for name, url in self.endpoints.items()]
+
+    async def stop(self):
+        """Close every connection"""
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.connected = {name: False for name in self.endpoints}
+
+    async def _run_endpoint(self, name: str, url: str):
+        backoff = self.initial_backoff
+        while True:
+            try:
+                async with websockets.connect(url) as ws:
+                    await ws.send(self.subscribe(self.symbols))
+                    self.connected[name] = True
+                    logger.info(f"Market stream connected: {name} ({url})")
+                    healthy = False
+                    async for message in ws:
+                        if self.active_endpoint == name:
+                            good = self._dispatch(message)
+                        else:
+                            good = healthy or self.parse(message) is not None
+                        # Back off afresh only once the feed delivers; a feed that accepts and drops keeps backing off
+                        if good and not healthy:
+                            healthy = True
+                            backoff = self.initial_backoff
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Market stream {name} error: {e}")
+            finally:
+                self.connected[name] = False
+
+            delay = backoff + random.uniform(0, backoff / 10)
+            logger.info(f"Market stream {name} reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _dispatch(self, message: str) -> bool:
+        """Queue the message's tick; False when it is not a valid tick"""
+        tick = self.parse(message)
+        if tick is None:
+            return False
+        queue = self.queues.get(tick['symbol'])
+        if queue is None:
+            return True
+        if queue.full():
+            # Keep the freshest ticks when a consumer falls behind
+            queue.get_nowait()
+            self.dropped_ticks += 1
+        queue.put_nowait(tick)
+        self.tick_events[tick['symbol']].set()
+        return True
+
+    def drain(self, symbol: str) -> List[Dict[str, Any]]:
+        """All ticks queued for a symbol, oldest first, without waiting"""
+        queue = self.queues[symbol]
+        ticks = []
+        while not queue.empty():
+            ticks.append(queue.get_nowait())
+        return ticks
+
+    async def next_tick(self, symbol: str) -> Dict[str, Any]:
+        """Wait for the next tick for a symbol"""
+        return await self.queues[symbol].get()
@@ -0,0 +1,104 @@
+"""
+In-memory tick buffers for the Future Trading Bot
+Fixed-capacity, array-backed ring buffers that serve recent prices without SQLite
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class PriceRingBuffer:
+    """Fixed-capacity ring buffer of (price, volume, timestamp) ticks
+
+    Every value is written twice, at `i` and `i + capacity`, so the latest
+    `n <= capacity` ticks are always one contiguous slice. Reads return
+    zero-copy NumPy views and appends stay O(1).
+    """
+
+    def __init__(self, capacity: int = 512):
+        self.capacity = capacity
+        self._prices = np.zeros(2 * capacity)
+        self._volumes = np.zeros(2 * capacity)
+        self._timestamps = np.zeros(2 * capacity)  # POSIX seconds
+        self._next = 0  # Slot the next tick is written to (0..capacity-1)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, price: float, volume: float, timestamp: float):
+        """Add one tick, overwriting the oldest when full"""
+        i = self._next
+        for column, value in ((self._prices, price), (self._volumes, volume), (self._timestamps, timestamp)):
+            column[i] = value
+            column[i + self.capacity] = value
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def extend(self, prices: Sequence[float], volumes: Sequence[float], timestamps: Sequence[float]):
+        """Add ticks in chronological order"""
+        for price, volume, timestamp in zip(prices, volumes, timestamps):
+            self.append(price, volume, timestamp)
+
+    def _window(self, column: np.ndarray, n: Optional[int]) -> np.ndarray:
+        n = self._size if n is None else min(n, self._size)
+        end = self._next + self.capacity
+        return column[end - n:end]
+
+    def prices(self, n: Optional[int] = None) -> np.ndarray:
+        """Latest `n` prices (all buffered prices by default), oldest first"""
+        return self._window(self._prices, n)
+
+    def volumes(self, n: Optional[int] = None) -> np.ndarray:
+        """Latest `n` volumes, oldest first"""
+        return self._window(self._volumes, n)
+
+    def timestamps(self, n: Optional[int] = None) -> np.ndarray:
+        """Latest `n` tick times as POSIX seconds, oldest first"""
+        return self._window(self._timestamps, n)
+
+    @property
+    def last_price(self) -> Optional[float]:
+        if not self._size:
+            return None
+        return float(self._prices[self._next + self.capacity - 1])
+
+
+class MarketDataBuffers:
+    """One PriceRingBuffer per symbol; the hot source for analysis"""
+
+    def __init__(self, capacity: int = 512):
+        self.capacity = capacity
+        self.buffers: Dict[str, PriceRingBuffer] = {}
+
+    def get(self, symbol: str) -> PriceRingBuffer:
+        buffer = self.buffers.get(symbol)
+        if buffer is None:
+            buffer = self.buffers[symbol] = PriceRingBuffer(self.capacity)
+        return buffer
+
+    def append(self, symbol: str, price: float, volume: float, timestamp: datetime):
+        """Record a tick for a symbol"""
+        self.get(symbol).append(price, volume, timestamp.timestamp())
+
+    def warm(self, symbol: str, db_manager) -> int:
+        """Load the most recent stored ticks for a symbol; returns how many were loaded"""
+        rows = db_manager.get_recent_ticks(symbol, self.capacity)
+        buffer = self.get(symbol)
+        for price, volume, timestamp in rows:
+            if isinstance(timestamp, str):
+                timestamp = datetime.fromisoformat(timestamp)
+            buffer.append(price, volume, timestamp.timestamp())
+        logger.info(f"Warmed {symbol} buffer with {len(rows)} ticks")
+        return len(rows)
+
+    def prices(self, symbol: str, n: Optional[int] = None) -> np.ndarray:
+        return self.get(symbol).prices(n)
+
+    def volumes(self, symbol: str, n: Optional[int] = None) -> np.ndarray:
+        return self.get(symbol).volumes(n)
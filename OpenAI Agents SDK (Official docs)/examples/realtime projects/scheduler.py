@@ -0,0 +1,101 @@
+"""
+Event-driven signal scheduling for the Future Trading Bot
+Re-evaluates symbols as ticks arrive, with cron-style full cycles
+"""
+
+import asyncio
+import logging
+import time
+from typing import List, Dict, Optional
+
+import schedule
+
+logger = logging.getLogger(__name__)
+
+
+class SignalScheduler:
+    """Drives FutureTradingBot evaluations from tick arrivals instead of a fixed countdown
+
+    - With a market stream, each symbol is re-evaluated when new ticks arrive,
+      at most once per `min_interval` seconds (ticks arriving in between are
+      coalesced into the next evaluation). Idle symbols cost nothing.
+    - `jobs` is a `schedule.Scheduler` for cron-style full cycles over every
+      symbol, e.g. `scheduler.jobs.every().hour.at(":00").do(scheduler.request_full_cycle)`.
+      `full_cycle_seconds` adds a simple periodic one.
+    - New signals are published to `bot.dashboard`, which renders on its own
+      thread, so terminal output never delays analysis.
+    """
+
+    def __init__(self, bot, min_interval: float = 5.0, full_cycle_seconds: Optional[int] = 60):
+        self.bot = bot
+        self.min_interval = min_interval
+        self.jobs = schedule.Scheduler()
+        if full_cycle_seconds:
+            self.jobs.every(full_cycle_seconds).seconds.do(self.request_full_cycle)
+
+        self.last_evaluated: Dict[str, float] = {}
+        self.locks: Dict[str, asyncio.Lock] = {symbol: asyncio.Lock() for symbol in bot.target_symbols}
+        self.full_cycle_requested = asyncio.Event()
+        self.evaluations = 0
+        self.tasks: List[asyncio.Task] = []
+
+    def request_full_cycle(self):
+        """Ask for every symbol to be re-evaluated (safe to call from schedule jobs)"""
+        self.full_cycle_requested.set()
+
+    async def evaluate(self, symbol: str):
+        """Evaluate one symbol unless it is already being evaluated"""
+        lock = self.locks[symbol]
+        if lock.locked():
+            return None
+        async with lock:
+            self.last_evaluated[symbol] = time.monotonic()
+            self.evaluations += 1
+            prediction, signal = await self.bot.evaluate_symbol(symbol)
+            if signal:
+                self.bot.signals.add(signal)
+                self.bot.dashboard.publish(signal)
+                logger.info(f"{symbol}: {signal.prediction} for {signal.duration_minutes}min (confidence: {signal.confidence:.1%})")
+            return signal
+
+    async def _watch_symbol(self, symbol: str):
+        """Re-evaluate a symbol whenever ticks arrive, debounced by min_interval"""
+        tick_event = self.bot.market_stream.tick_events[symbol]
+        while True:
+            await tick_event.wait()
+            wait = self.last_evaluated.get(symbol, float('-inf')) + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            tick_event.clear()
+            try:
+                await asyncio.wait_for(self.evaluate(symbol), timeout=self.bot.symbol_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"{symbol}: timed out after {self.bot.symbol_timeout}s")
+            except Exception as e:
+                logger.error(f"{symbol}: evaluation failed: {e}")
+
+    async def _run_jobs(self):
+        """Tick the cron-style job scheduler and run requested full cycles"""
+        while True:
+            self.jobs.run_pending()
+            if self.full_cycle_requested.is_set():
+                self.full_cycle_requested.clear()
+                logger.info("Running full cycle")
+                await self.bot.run_for_symbols(self.evaluate)
+            await asyncio.sleep(0.5)
+
+    async def start(self):
+        """Start watchers and the job loop"""
+        if self.tasks:
+            return
+        if self.bot.market_stream:
+            self.tasks += [asyncio.create_task(self._watch_symbol(symbol)) for symbol in self.bot.target_symbols]
+        self.tasks.append(asyncio.create_task(self._run_jobs()))
+        self.request_full_cycle()
+
+    async def stop(self):
+        """Cancel every background task"""
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
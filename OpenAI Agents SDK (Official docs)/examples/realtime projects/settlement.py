@@ -0,0 +1,211 @@
+"""
+Signal settlement for the Future Trading Bot
+Marks open signals as take-profit, stop-loss or expired against live prices and tracks rolling accuracy
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Settlement outcomes
+TAKE_PROFIT = 'TAKE_PROFIT'
+STOP_LOSS = 'STOP_LOSS'
+EXPIRED = 'EXPIRED'
+
+
+@dataclass
+class SignalOutcome:
+    """How one signal ended"""
+    signal_id: Optional[int]  # Row id in the signals table
+    symbol: str
+    signal_type: str  # 'BUY' or 'SELL'
+    outcome: str  # TAKE_PROFIT, STOP_LOSS or EXPIRED
+    entry_price: float
+    exit_price: float
+    pnl_percent: float
+    correct: bool  # Take-profit, or expired in profit
+    opened_at: datetime
+    settled_at: datetime
+
+
+class SettlementWorker:
+    """Settles open BUY/SELL signals as prices arrive
+
+    Open signals are indexed per symbol by price level. One min-heap holds
+    the levels hit by rising prices (BUY take-profit, SELL stop-loss). One
+    max-heap holds the levels hit by falling prices (BUY stop-loss, SELL
+    take-profit). A tick only pops the levels it crossed, so its cost does
+    not depend on how many signals are open.
+
+    `observe()` is O(1): it records the high, low and last price per symbol.
+    `track()` first applies the symbol's pending range to the signals already
+    open, so a new signal is only judged on ticks that arrive after it.
+    The worker loop (`run()`) settles every `interval` seconds. If one
+    signal's take-profit and stop-loss are both crossed within the same
+    interval, the order is unknown and the stop-loss is assumed. Signals
+    still open at `expiry_time` settle at the last price.
+    """
+
+    def __init__(self, db_manager=None, accuracy_window: int = 50, min_samples: int = 10,
+                 interval: float = 0.5, clock: Callable[[], datetime] = datetime.now):
+        self.db_manager = db_manager
+        self.accuracy_window = accuracy_window
+        self.min_samples = min_samples  # Outcomes needed before accuracy affects confidence
+        self.interval = interval
+        self.clock = clock
+        self.sequence = itertools.count()
+        self.open: Dict[int, Any] = {}  # key -> signal
+        self.open_per_symbol: Dict[str, int] = {}
+        self.rising: Dict[str, List[tuple]] = {}  # symbol -> min-heap of (level, key)
+        self.falling: Dict[str, List[tuple]] = {}  # symbol -> min-heap of (-level, key)
+        self.expiries: List[tuple] = []  # (expiry_time, key)
+        self.observed: Dict[str, List[float]] = {}  # symbol -> [high, low, last] since the last settle
+        self.crossed: Dict[int, Dict[str, float]] = {}  # key -> {outcome: level}, closed by the next settle
+        self.last_price: Dict[str, float] = {}
+        self.results: Dict[str, deque] = {}  # symbol -> recent `correct` flags
+        self.settled = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def track(self, signal) -> bool:
+        """Start watching a BUY or SELL signal; HOLD signals have nothing to settle"""
+        if signal.signal_type not in ('BUY', 'SELL'):
+            return False
+        # Ticks seen so far belong to the signals already open, not this one
+        observed = self.observed.pop(signal.symbol, None)
+        if observed is not None:
+            self._cross(signal.symbol, *observed)
+        key = next(self.sequence)
+        self.open[key] = signal
+        self.open_per_symbol[signal.symbol] = self.open_per_symbol.get(signal.symbol, 0) + 1
+        rising = self.rising.setdefault(signal.symbol, [])
+        falling = self.falling.setdefault(signal.symbol, [])
+        upper, lower = ((signal.take_profit, signal.stop_loss) if signal.signal_type == 'BUY'
+                        else (signal.stop_loss, signal.take_profit))
+        heapq.heappush(rising, (upper, key))
+        heapq.heappush(falling, (-lower, key))
+        heapq.heappush(self.expiries, (signal.expiry_time, key))
+        return True
+
+    def observe(self, symbol: str, price: float):
+        """Record a tick for the next settlement pass"""
+        observed = self.observed.get(symbol)
+        if observed is None:
+            self.observed[symbol] = [price, price, price]
+        else:
+            observed[0] = max(observed[0], price)
+            observed[1] = min(observed[1], price)
+            observed[2] = price
+
+    def settle(self, now: Optional[datetime] = None) -> List[SignalOutcome]:
+        """Settle every signal whose level was crossed or whose expiry passed"""
+        now = now or self.clock()
+        observed, self.observed = self.observed, {}
+        for symbol, (high, low, last) in observed.items():
+            self._cross(symbol, high, low, last)
+        crossed, self.crossed = self.crossed, {}
+
+        outcomes = []
+        for key, levels in crossed.items():
+            outcome = STOP_LOSS if STOP_LOSS in levels else TAKE_PROFIT
+            outcomes.append(self._close(key, outcome, levels[outcome], now))
+
+        while self.expiries and self.expiries[0][0] <= now:
+            _, key = heapq.heappop(self.expiries)
+            if key in self.open:
+                signal = self.open[key]
+                outcomes.append(self._close(key, EXPIRED, self.last_price.get(signal.symbol, signal.entry_price), now))
+
+        if outcomes and self.db_manager:
+            self.db_manager.store_outcomes(outcomes)
+        return outcomes
+
+    def _cross(self, symbol: str, high: float, low: float, last: float):
+        """Pop the levels a price range crossed, for the next settlement"""
+        self.last_price[symbol] = last
+        rising, falling = self.rising.get(symbol, []), self.falling.get(symbol, [])
+        while rising and rising[0][0] <= high:
+            level, key = heapq.heappop(rising)
+            if key in self.open:
+                outcome = TAKE_PROFIT if self.open[key].signal_type == 'BUY' else STOP_LOSS
+                self.crossed.setdefault(key, {})[outcome] = level
+        while falling and -falling[0][0] >= low:
+            level, key = heapq.heappop(falling)
+            if key in self.open:
+                outcome = STOP_LOSS if self.open[key].signal_type == 'BUY' else TAKE_PROFIT
+                self.crossed.setdefault(key, {})[outcome] = -level
+
+    def _close(self, key: int, outcome: str, exit_price: float, now: datetime) -> SignalOutcome:
+        signal = self.open.pop(key)
+        side = 1 if signal.signal_type == 'BUY' else -1
+        pnl_percent = side * (exit_price - signal.entry_price) / signal.entry_price * 100
+        result = SignalOutcome(
+            signal_id=getattr(signal, 'id', None), symbol=signal.symbol, signal_type=signal.signal_type,
+            outcome=outcome, entry_price=signal.entry_price, exit_price=exit_price, pnl_percent=pnl_percent,
+            correct=outcome == TAKE_PROFIT or (outcome == EXPIRED and pnl_percent > 0),
+            opened_at=signal.timestamp, settled_at=now
+        )
+        self.settled += 1
+        self.record(signal.symbol, result.correct)
+
+        # Levels of settled signals stay in the heaps until popped; rebuild once they dominate
+        symbol = signal.symbol
+        self.open_per_symbol[symbol] -= 1
+        for heaps in (self.rising, self.falling):
+            if len(heaps[symbol]) > 2 * self.open_per_symbol[symbol] + 16:
+                heaps[symbol] = [entry for entry in heaps[symbol] if entry[1] in self.open]
+                heapq.heapify(heaps[symbol])
+        return result
+
+    def record(self, symbol: str, correct: bool):
+        if symbol not in self.results:
+            self.results[symbol] = deque(maxlen=self.accuracy_window)
+        self.results[symbol].append(correct)
+
+    def warm(self, symbol: str, results: Sequence[bool]):
+        """Seed rolling accuracy from stored outcomes, oldest first"""
+        for correct in results:
+            self.record(symbol, bool(correct))
+
+    def accuracy(self, symbol: str) -> Optional[float]:
+        """Share of the last `accuracy_window` settled signals that were correct (None until `min_samples`)"""
+        results = self.results.get(symbol)
+        if not results or len(results) < self.min_samples:
+            return None
+        return sum(results) / len(results)
+
+    def adjust_confidence(self, symbol: str, confidence: float, weight: float) -> float:
+        """Blend a prediction's confidence with the symbol's realised accuracy"""
+        accuracy = self.accuracy(symbol)
+        if accuracy is None or weight <= 0:
+            return confidence
+        return (1 - weight) * confidence + weight * accuracy
+
+    async def run(self):
+        """Settle on a fixed interval until cancelled"""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                for outcome in self.settle():
+                    logger.info(f"{outcome.symbol}: {outcome.signal_type} settled {outcome.outcome} "
+                                f"({outcome.pnl_percent:+.3f}%)")
+            except Exception as e:
+                logger.error(f"Settlement failed: {e}")
+
+    async def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop the worker after one final settlement pass"""
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        self.settle()
@@ -0,0 +1,103 @@
+"""
+Bounded signal storage for the Future Trading Bot
+Keeps the active signals per symbol, indexed by expiry time
+"""
+
+import heapq
+import itertools
+from collections import deque
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable, Iterator
+
+# Reasons a signal leaves the store
+EXPIRED = 'expired'
+EVICTED = 'evicted'
+
+
+class SignalStore:
+    """Active signals per symbol, capped at `max_per_symbol`, with an expiry heap
+
+    `add()` is O(log n). `sweep()` pops signals whose `expiry_time` has
+    passed in O(log n) each, without scanning the rest. Every signal that
+    leaves the store is passed to `on_expire(signal, reason)`. `reason` is
+    EXPIRED, or EVICTED when a newer signal pushed it out past the cap.
+    Memory is bounded by symbols x `max_per_symbol`.
+    """
+
+    def __init__(self, max_per_symbol: int = 5,
+                 on_expire: Optional[Callable[[Any, str], None]] = None,
+                 clock: Callable[[], datetime] = datetime.now):
+        self.max_per_symbol = max_per_symbol
+        self.on_expire = on_expire
+        self.clock = clock
+        self.by_symbol: Dict[str, deque] = {}  # symbol -> active signals, oldest first
+        self.heap: List[tuple] = []  # (expiry_time, sequence, signal); evicted entries are skipped lazily
+        self.removed: set = set()  # Sequence numbers of evicted signals still in the heap
+        self.sequence = itertools.count()
+        self.sequence_of: Dict[int, int] = {}  # id(signal) -> sequence number
+        self.total_added = 0
+
+    def __len__(self) -> int:
+        return len(self.sequence_of)
+
+    def __iter__(self) -> Iterator:
+        """Active signals, grouped by symbol, oldest first within each"""
+        for signals in self.by_symbol.values():
+            yield from signals
+
+    def add(self, signal):
+        """Store a signal, evicting the symbol's oldest one past the cap"""
+        self.sweep()
+        signals = self.by_symbol.setdefault(signal.symbol, deque())
+        if len(signals) >= self.max_per_symbol:
+            self._remove(signals.popleft(), EVICTED)
+
+        sequence = next(self.sequence)
+        signals.append(signal)
+        self.sequence_of[id(signal)] = sequence
+        heapq.heappush(self.heap, (signal.expiry_time, sequence, signal))
+        self.total_added += 1
+
+        # Drop lazily deleted entries once they dominate the heap
+        if len(self.removed) > len(self.sequence_of):
+            self.heap = [entry for entry in self.heap if entry[1] not in self.removed]
+            heapq.heapify(self.heap)
+            self.removed.clear()
+
+    def extend(self, signals):
+        for signal in signals:
+            self.add(signal)
+
+    def sweep(self, now: Optional[datetime] = None) -> List:
+        """Remove and return every signal that has expired by `now`"""
+        now = now or self.clock()
+        expired = []
+        while self.heap and self.heap[0][0] <= now:
+            _, sequence, signal = heapq.heappop(self.heap)
+            if sequence in self.removed:
+                self.removed.discard(sequence)
+                continue
+            signals = self.by_symbol[signal.symbol]
+            del signals[next(i for i, active in enumerate(signals) if active is signal)]
+            self._remove(signal, EXPIRED, in_heap=False)
+            expired.append(signal)
+        return expired
+
+    def _remove(self, signal, reason: str, in_heap: bool = True):
+        sequence = self.sequence_of.pop(id(signal))
+        if in_heap:
+            self.removed.add(sequence)
+        if self.on_expire:
+            self.on_expire(signal, reason)
+
+    def active(self, symbol: Optional[str] = None) -> List:
+        """Active signals for one symbol, or for all of them"""
+        if symbol is not None:
+            return list(self.by_symbol.get(symbol, ()))
+        return list(self)
+
+    def next_expiry(self) -> Optional[datetime]:
+        """Earliest expiry among active signals"""
+        while self.heap and self.heap[0][1] in self.removed:
+            self.removed.discard(heapq.heappop(self.heap)[1])
+        return self.heap[0][0] if self.heap else None
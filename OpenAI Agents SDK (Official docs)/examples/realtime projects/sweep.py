@@ -0,0 +1,162 @@
+"""
+Parameter sweep for the Future Trading Bot
+Backtests a grid of indicator settings and confidence thresholds across every target symbol on a process pool
+
+Usage: python sweep.py [--db trading_bot.db] [--output sweep_results.npz] [--workers 4]
+"""
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest import BacktestConfig, run_backtest
+from bot import DatabaseManager
+
+try:
+    import config
+except ImportError:
+    import config_template as config
+
+PARAMETER_COLUMNS = ['sma_fast', 'sma_mid', 'sma_slow', 'rsi_period', 'macd_fast', 'macd_slow', 'macd_signal',
+                     'min_confidence']
+METRIC_COLUMNS = ['signals', 'hit_rate', 'take_profit_rate', 'stop_loss_rate', 'expired_rate',
+                  'total_pnl_percent', 'avg_pnl_percent']
+
+
+@dataclass
+class SweepGrid:
+    """Values to try for each setting; every combination is backtested"""
+    sma_sets: List[Tuple[int, int, int]] = field(default_factory=lambda: [(5, 10, 20)])
+    rsi_periods: List[int] = field(default_factory=lambda: [14])
+    macd_sets: List[Tuple[int, int, int]] = field(default_factory=lambda: [(12, 26, 9)])
+    min_confidences: List[float] = field(default_factory=lambda: [0.0])
+
+    def configs(self, base: BacktestConfig = BacktestConfig()) -> List[BacktestConfig]:
+        """One config per indicator combination (confidence thresholds are applied afterwards)"""
+        return [replace(base, sma_fast=sma[0], sma_mid=sma[1], sma_slow=sma[2], rsi_period=rsi,
+                        macd_fast=macd[0], macd_slow=macd[1], macd_signal=macd[2])
+                for sma, rsi, macd in itertools.product(self.sma_sets, self.rsi_periods, self.macd_sets)
+                if sma[0] < sma[1] < sma[2] and macd[0] < macd[1]]
+
+
+def default_grid(settings: Dict[str, Any] = config.TECHNICAL_INDICATORS,
+                 confidence_threshold: float = config.CONFIDENCE_THRESHOLD) -> SweepGrid:
+    """Grid around the configured TECHNICAL_INDICATORS and CONFIDENCE_THRESHOLD"""
+    sma_sets = [(5, 10, 20), (10, 20, 50)]
+    configured_smas = tuple(sorted(settings['sma_periods'])[:3])
+    if len(configured_smas) == 3 and configured_smas not in sma_sets:
+        sma_sets.append(configured_smas)
+    configured_macd = (settings['macd_fast'], settings['macd_slow'], settings['macd_signal'])
+    return SweepGrid(
+        sma_sets=sma_sets,
+        rsi_periods=sorted({7, settings['rsi_period'], 21}),
+        macd_sets=sorted({configured_macd, (8, 17, 9), (5, 35, 5)}),
+        min_confidences=sorted({0.0, 0.6, 0.7, 0.8, confidence_threshold})
+    )
+
+
+def write_price_arrays(histories: Dict[str, Dict[str, np.ndarray]], directory: str) -> Dict[str, Dict[str, str]]:
+    """Save each symbol's timestamp and price arrays as .npy files for workers to memory-map"""
+    paths = {}
+    for i, (symbol, history) in enumerate(histories.items()):
+        paths[symbol] = {}
+        for column in ('timestamp', 'price'):
+            path = os.path.join(directory, f"{i}_{column}.npy")
+            np.save(path, np.ascontiguousarray(history[column], dtype=float))
+            paths[symbol][column] = path
+    return paths
+
+
+# Memory-mapped arrays opened by this worker process, keyed by path
+_mapped: Dict[str, np.ndarray] = {}
+
+
+def _load(path: str) -> np.ndarray:
+    """Read-only memory map of a price array, shared through the page cache instead of pickled"""
+    if path not in _mapped:
+        _mapped[path] = np.load(path, mmap_mode='r')
+    return _mapped[path]
+
+
+def evaluate(symbol: str, paths: Dict[str, str], backtest_config: BacktestConfig,
+             min_confidences: Sequence[float]) -> List[Dict[str, Any]]:
+    """Backtest one symbol with one indicator config, summarised at every confidence threshold"""
+    result = run_backtest(_load(paths['timestamp']), _load(paths['price']), backtest_config)
+    rows = []
+    for threshold in min_confidences:
+        summary = result.select(result.confidence >= threshold).summary()
+        row = {'symbol': symbol, 'min_confidence': threshold}
+        row.update({column: getattr(backtest_config, column) for column in PARAMETER_COLUMNS[:-1]})
+        row.update({column: summary.get(column, 0) for column in METRIC_COLUMNS})
+        rows.append(row)
+    return rows
+
+
+def run_sweep(histories: Dict[str, Dict[str, np.ndarray]], grid: SweepGrid,
+              base: BacktestConfig = BacktestConfig(), workers: Optional[int] = None) -> pd.DataFrame:
+    """Backtest every grid combination for every symbol, in parallel worker processes"""
+    configs = grid.configs(base)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_price_arrays(histories, directory)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(evaluate, symbol, paths[symbol], backtest_config, grid.min_confidences)
+                       for symbol in histories for backtest_config in configs]
+            rows = [row for future in futures for row in future.result()]
+    return pd.DataFrame(rows, columns=['symbol'] + PARAMETER_COLUMNS + METRIC_COLUMNS)
+
+
+def save_results(results: pd.DataFrame, path: str):
+    """Store sweep results as one compressed array per column"""
+    columns = {column: results[column].to_numpy() for column in results.columns}
+    columns['symbol'] = columns['symbol'].astype(str)
+    np.savez_compressed(path, **columns)
+
+
+def load_results(path: str) -> pd.DataFrame:
+    """Read results written by `save_results`"""
+    with np.load(path) as columns:
+        return pd.DataFrame({column: columns[column] for column in columns.files})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest a grid of indicator settings across symbols")
+    parser.add_argument('--db', default=config.DATABASE_PATH)
+    parser.add_argument('--symbols', nargs='+', default=config.TARGET_SYMBOLS)
+    parser.add_argument('--start', type=datetime.fromisoformat)
+    parser.add_argument('--end', type=datetime.fromisoformat)
+    parser.add_argument('--output', default='sweep_results.npz')
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(args.db)
+    histories = {symbol: db_manager.get_price_history(symbol, args.start, args.end) for symbol in args.symbols}
+    db_manager.close()
+    histories = {symbol: history for symbol, history in histories.items() if len(history['price'])}
+    if not histories:
+        print("No stored market data for the requested symbols")
+        return
+
+    grid = default_grid()
+    started = time.perf_counter()
+    results = run_sweep(histories, grid, workers=args.workers)
+    save_results(results, args.output)
+    print(f"Swept {len(grid.configs())} indicator configs x {len(grid.min_confidences)} thresholds "
+          f"over {len(histories)} symbols in {time.perf_counter() - started:.1f}s -> {args.output}")
+
+    ranked = (results[results['signals'] > 0]
+              .groupby(PARAMETER_COLUMNS)[['signals', 'hit_rate', 'total_pnl_percent']].mean()
+              .sort_values('total_pnl_percent', ascending=False))
+    print(ranked.head(10).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Tests for the columnar tick archive and SQLite compaction
+Run with pytest, or directly: python test_archive.py
+"""
+
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from archive import TickArchive
+from bot import DatabaseManager, MarketData, to_epoch_seconds
+
+
+def store_ticks(db: DatabaseManager, symbol: str, start: datetime, count: int, step: timedelta):
+    for i in range(count):
+        price = 1.0 + i * 1e-4
+        db.store_market_data(MarketData(symbol=symbol, price=price, volume=1000 + i, change_24h=0.0,
+                                        timestamp=start + i * step, high_24h=price, low_24h=price))
+
+
+def test_compaction_keeps_hot_window_and_history_intact():
+    """Old rows move to per-day files; history reads span both tiers unchanged"""
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = TickArchive(os.path.join(tmp, 'archive'))
+        db = DatabaseManager(os.path.join(tmp, 'bot.db'), batch_size=1000, archive=archive)
+        start = datetime(2025, 1, 1, 12)
+        store_ticks(db, 'USD/CAD', start, 300, timedelta(minutes=15))  # 3+ days
+        store_ticks(db, 'USD/BRL', start, 10, timedelta(minutes=15))
+        before = db.get_price_history('USD/CAD')
+
+        cutoff = start + timedelta(days=2)
+        moved = db.compact(cutoff)
+        assert moved == 192 + 10
+        assert db.conn.execute('SELECT MIN(timestamp) FROM market_data').fetchone()[0] >= str(cutoff)
+        assert archive.days('USD/CAD') == [datetime(2025, 1, d).date() for d in (1, 2, 3)]
+
+        after = db.get_price_history('USD/CAD')
+        for column in ('timestamp', 'price', 'volume'):
+            assert np.array_equal(before[column], after[column])
+
+        window = db.get_price_history('USD/CAD', start + timedelta(hours=20), start + timedelta(days=2, hours=6))
+        assert len(window['price']) == 4 * (28 + 6)
+        assert window['timestamp'][0] == before['timestamp'][80]
+
+        day = archive.read_day('USD/CAD', datetime(2025, 1, 2).date())
+        assert isinstance(day['price'], np.memmap)
+        assert len(day['price']) == 96
+        assert db.get_recent_prices('USD/CAD', 3) == list(before['price'][-3:])
+        db.close()
+
+
+def test_reappending_skips_archived_ticks():
+    """An interrupted compaction can be rerun without duplicating rows"""
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = TickArchive(tmp)
+        timestamps = 1735689600.0 + np.arange(10) * 60
+        columns = {column: np.arange(10, dtype=float) for column in
+                   ('price', 'volume', 'change_24h', 'high_24h', 'low_24h')}
+        columns['timestamp'] = timestamps
+        assert archive.append('USD/CAD', columns) == 10
+
+        overlap = {column: np.concatenate([values[5:], values[:2] + 100]) for column, values in columns.items()}
+        overlap['timestamp'] = np.concatenate([timestamps[5:], timestamps[-1] + np.array([60.0, 120.0])])
+        assert archive.append('USD/CAD', overlap) == 2
+
+        data = archive.read('USD/CAD')
+        assert len(data['timestamp']) == 12
+        assert np.all(np.diff(data['timestamp']) > 0)
+
+
+def test_distinct_ticks_sharing_a_timestamp_are_kept():
+    """Only an identical (timestamp, price, volume) tick counts as already archived"""
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = TickArchive(tmp)
+        columns = {column: np.array([1.0, 2.0]) for column in ('price', 'volume', 'change_24h', 'high_24h', 'low_24h')}
+        columns['timestamp'] = np.array([1735689600.0, 1735689600.0])
+        assert archive.append('USD/CAD', columns) == 2
+        assert archive.append('USD/CAD', columns) == 0
+
+        columns['price'] = np.array([1.0, 3.0])
+        assert archive.append('USD/CAD', columns) == 1
+        assert list(archive.read('USD/CAD')['price']) == [1.0, 2.0, 3.0]
+
+
+def test_days_are_utc_days_of_local_ticks():
+    """Naive tick times are local; they are converted to UTC before picking their day"""
+    if not hasattr(time, 'tzset'):
+        return
+    previous = os.environ.get('TZ')
+    os.environ['TZ'] = 'America/New_York'
+    time.tzset()
+    try:
+        evening = datetime(2025, 1, 1, 20)  # 01:00 UTC the next day
+        assert to_epoch_seconds([evening, str(evening)]).tolist() == [evening.timestamp()] * 2
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = TickArchive(os.path.join(tmp, 'archive'))
+            db = DatabaseManager(os.path.join(tmp, 'bot.db'), archive=archive)
+            store_ticks(db, 'USD/CAD', evening, 1, timedelta(minutes=1))
+            assert db.compact(evening + timedelta(hours=1)) == 1
+            assert archive.days('USD/CAD') == [datetime(2025, 1, 2).date()]
+            assert db.get_price_history('USD/CAD', evening)['timestamp'].tolist() == [evening.timestamp()]
+            db.close()
+    finally:
+        if previous is None:
+            del os.environ['TZ']
+        else:
+            os.environ['TZ'] = previous
+        time.tzset()
+
+
+if __name__ == "__main__":
+    for test in (test_compaction_keeps_hot_window_and_history_intact, test_reappending_skips_archived_ticks,
+                 test_distinct_ticks_sharing_a_timestamp_are_kept, test_days_are_utc_days_of_local_ticks):
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,104 @@
+"""
+Tests for the vectorized backtesting engine
+Run with pytest, or directly: python test_backtest.py
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+from backtest import (BacktestConfig, Backtester, predict_direction_series, run_backtest, _rolling_std,
+                      TAKE_PROFIT, STOP_LOSS, EXPIRED)
+from bot import DatabaseManager, MarketData, TechnicalAnalyzer
+from indicators import IndicatorEngine
+
+DIRECTIONS = {'UP': 1, 'DOWN': -1, 'SIDEWAYS': 0}
+
+
+def random_walk(n: int, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 1.35 * np.exp(np.cumsum(rng.normal(0, 0.0015, n)))
+
+
+def test_series_matches_live_prediction():
+    """Every tick of the vectorized series agrees with predict_price_direction on engine snapshots"""
+    prices = random_walk(400)
+    series = predict_direction_series(prices)
+    engine = IndicatorEngine(sma_periods=(5, 10, 20), ema_periods=())
+
+    for i, price in enumerate(prices):
+        snapshot = engine.update('USD/CAD', price)
+        window = list(prices[max(0, i - 49):i + 1])
+        live = TechnicalAnalyzer.predict_price_direction(window, indicators=snapshot)
+        assert series['direction'][i] == DIRECTIONS[live['direction']], i
+        assert np.isclose(series['confidence'][i], live['confidence']), i
+        if i >= 19:
+            assert series['duration'][i] == live['duration'], i
+            assert np.isclose(series['target_price'][i], live['target_price']), i
+
+
+def test_take_profit_and_stop_loss_first_hit():
+    """The level touched first decides the outcome; untouched signals settle at expiry"""
+    # Strong uptrend, then a sharp drop: early signals are BUYs
+    prices = np.concatenate([np.linspace(1.0, 1.05, 60), np.linspace(1.05, 1.0, 60)])
+    timestamps = np.arange(len(prices)) * 10.0
+    result = run_backtest(timestamps, prices, BacktestConfig(signal_interval_seconds=60))
+
+    assert len(result.index)
+    buys = result.direction == 1
+    assert buys.any()
+    for i in np.flatnonzero(buys):
+        entry = result.entry_price[i]
+        assert np.isclose(result.stop_loss[i], entry * 0.985)
+        if result.outcome[i] == TAKE_PROFIT:
+            assert result.exit_price[i] == result.take_profit[i]
+            assert result.pnl_percent[i] > 0
+        elif result.outcome[i] == STOP_LOSS:
+            assert np.isclose(result.pnl_percent[i], -1.5)
+    assert set(result.outcome) <= {TAKE_PROFIT, STOP_LOSS, EXPIRED}
+
+    summary = result.summary()
+    assert summary['signals'] == len(result.index)
+    assert np.isclose(summary['take_profit_rate'] + summary['stop_loss_rate'] + summary['expired_rate'], 1.0)
+
+
+def test_backtester_reads_history_and_is_deterministic():
+    """Stored ticks replay to the same result every run, with or without chunking"""
+    db = DatabaseManager(':memory:', batch_size=500)
+    start = datetime(2025, 1, 1)
+    prices = random_walk(3000, seed=11)
+    for i, price in enumerate(prices):
+        db.store_market_data(MarketData(symbol='USD/CAD', price=float(price), volume=1000, change_24h=0.0,
+                                        timestamp=start + timedelta(seconds=5 * i),
+                                        high_24h=float(price), low_24h=float(price)))
+
+    history = db.get_price_history('USD/CAD', start, start + timedelta(hours=2))
+    assert len(history['price']) == 1440
+    assert np.allclose(np.diff(history['timestamp']), 5.0)
+
+    backtester = Backtester(db)
+    first = backtester.run('USD/CAD')
+    second = backtester.run('USD/CAD', config=BacktestConfig(chunk_size=7))
+    assert first.summary()['signals'] > 50
+    assert first.summary() == second.summary()
+    assert np.array_equal(first.outcome, second.outcome)
+    db.close()
+
+
+def test_rolling_std_matches_windowed_std():
+    """The O(n)-memory rolling std agrees with np.std over each trailing window"""
+    prices = random_walk(5000)
+    expected = np.std(sliding_window_view(prices, 10), axis=1)
+    volatility = _rolling_std(prices, 10)
+    assert np.isnan(volatility[:9]).all()
+    assert np.allclose(volatility[9:], expected, rtol=1e-6, atol=1e-12)
+    assert np.all(_rolling_std(np.full(50, 1.35), 10)[9:] == 0)
+
+
+if __name__ == "__main__":
+    for test in (test_series_matches_live_prediction, test_take_profit_and_stop_loss_first_hit,
+                 test_backtester_reads_history_and_is_deterministic, test_rolling_std_matches_windowed_std):
+        test()
+        print(f"✓ {test.__name__}")
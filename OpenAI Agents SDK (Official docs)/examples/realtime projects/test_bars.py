@@ -0,0 +1,81 @@
+"""
+Tests for OHLCV bar aggregation and multi-timeframe analysis
+Run with pytest, or directly: python test_bars.py
+"""
+
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from bars import BarAggregator
+from bot import FutureTradingBot, MarketData
+
+
+def make_ticks(n: int, start: datetime, step_seconds: float, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    prices = 1.35 + np.cumsum(rng.normal(0, 1e-4, n))
+    volumes = rng.integers(1, 100, n).astype(float)
+    timestamps = [start + timedelta(seconds=i * step_seconds) for i in range(n)]
+    return timestamps, prices, volumes
+
+
+def test_bars_match_pandas_resample():
+    """Incremental bars equal a batch resample of the same ticks, for every timeframe"""
+    timestamps, prices, volumes = make_ticks(5000, datetime(2025, 1, 1), 7)
+    aggregator = BarAggregator(history=10000)
+    closed = []
+    for timestamp, price, volume in zip(timestamps, prices, volumes):
+        closed += aggregator.update('USD/CAD', price, volume, timestamp)
+
+    frame = pd.DataFrame({'price': prices, 'volume': volumes}, index=pd.DatetimeIndex(timestamps))
+    for timeframe, rule in (('1m', '1min'), ('5m', '5min'), ('15m', '15min'), ('1h', '1h')):
+        expected = frame['price'].resample(rule).ohlc().dropna()
+        expected['volume'] = frame['volume'].resample(rule).sum()
+        bars = aggregator.bars('USD/CAD', timeframe)
+        assert len(bars) == len(expected)
+        assert [bar.start for bar in bars] == list(expected.index.to_pydatetime())
+        for column in ('open', 'high', 'low', 'close', 'volume'):
+            assert np.allclose([getattr(bar, column) for bar in bars], expected[column])
+        assert sum(bar.timeframe == timeframe for bar in closed) == len(bars) - 1
+
+    late = aggregator.update('USD/CAD', 1.0, 1.0, timestamps[0])
+    assert late == [] and aggregator.late_ticks == 4
+
+
+def test_closed_bars_persist_and_drive_signals():
+    """Closed bars are stored, reloaded on restart, and analysis runs on the configured timeframe"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bot.db')
+        bot = FutureTradingBot('demo-key-not-set', ['USD/CAD'], db_path=db_path, timeframe='1m')
+        timestamps, prices, volumes = make_ticks(1800, datetime(2025, 1, 1), 2)
+        for timestamp, price, volume in zip(timestamps, prices, volumes):
+            bot.ingest_tick(MarketData('USD/CAD', float(price), float(volume), 0.0, timestamp, 1.4, 1.3))
+        bot.db_manager.flush()
+
+        stored = bot.db_manager.get_recent_bars('USD/CAD', '5m', 1000)
+        assert len(stored) == 11
+        assert stored == list(bot.bar_aggregator.closed[('USD/CAD', '5m')])
+
+        snapshot = asyncio.run(bot.take_snapshot('USD/CAD'))
+        assert snapshot.timeframe == '1m'
+        assert len(snapshot.prices) == 50
+        assert snapshot.prices[-1] == snapshot.market_data.price
+        _, signal = asyncio.run(bot.evaluate_symbol('USD/CAD'))
+        assert signal.timeframe == '1m'
+        bot.db_manager.close()
+
+        restarted = FutureTradingBot('demo-key-not-set', ['USD/CAD'], db_path=db_path)
+        reloaded = restarted.bar_aggregator.bars('USD/CAD', '1m', include_current=False)
+        assert len(reloaded) == 60
+        assert reloaded == list(bot.bar_aggregator.closed[('USD/CAD', '1m')])
+        restarted.db_manager.close()
+
+
+if __name__ == "__main__":
+    for test in (test_bars_match_pandas_resample, test_closed_bars_persist_and_drive_signals):
+        test()
+        print(f"✓ {test.__name__}")
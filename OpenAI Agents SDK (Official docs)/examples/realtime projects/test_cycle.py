@@ -0,0 +1,137 @@
+"""
+Tests for FutureTradingBot analysis cycles
+Run with pytest, or directly: python test_cycle.py
+"""
+
+import asyncio
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+from bot import FutureTradingBot, bot_settings_from_config
+from market_stream import MarketStream
+from scheduler import SignalScheduler
+
+SYMBOLS = ['USD/BRL', 'USD/CAD', 'NZD/CAD', 'USD/BDT', 'USD/DZD']
+
+
+def make_bot(**kwargs) -> FutureTradingBot:
+    return FutureTradingBot('demo-key-not-set', SYMBOLS, db_path=':memory:', **kwargs)
+
+
+def test_cycle_runs_symbols_concurrently():
+    """A cycle takes about as long as its slowest symbol, not the sum"""
+    bot = make_bot()
+
+    async def slow_worker(symbol: str):
+        await asyncio.sleep(0.2)
+        return symbol
+
+    started = time.perf_counter()
+    results = asyncio.run(bot.run_for_symbols(slow_worker))
+    elapsed = time.perf_counter() - started
+
+    assert list(results) == SYMBOLS
+    assert elapsed < 0.5
+
+
+def test_slow_symbols_yield_partial_results():
+    """Per-symbol timeouts and the cycle deadline drop only the slow symbols"""
+    bot = make_bot(symbol_timeout=0.1, cycle_deadline=5)
+
+    async def worker(symbol: str):
+        await asyncio.sleep(1 if symbol == 'USD/BDT' else 0)
+        return symbol
+
+    assert list(asyncio.run(bot.run_for_symbols(worker))) == ['USD/BRL', 'USD/CAD', 'NZD/CAD', 'USD/DZD']
+
+    bot = make_bot(max_concurrency=2, symbol_timeout=5, cycle_deadline=0.3)
+
+    async def staggered(symbol: str):
+        await asyncio.sleep(0.2)
+        return symbol
+
+    assert list(asyncio.run(bot.run_for_symbols(staggered))) == ['USD/BRL', 'USD/CAD']
+
+
+def test_each_symbol_fetched_once_per_cycle():
+    """Prediction, signal and display share one snapshot: one tick and no DB reads per symbol"""
+    bot = make_bot()
+
+    async def warm_up():
+        for _ in range(60):
+            for symbol in SYMBOLS:
+                await bot.fetch_real_time_data(symbol)
+    asyncio.run(warm_up())
+
+    fetches = Counter()
+    db_reads = Counter()
+    fetch = bot.fetch_real_time_data
+    get_recent_prices = bot.db_manager.get_recent_prices
+
+    async def counting_fetch(symbol):
+        fetches[symbol] += 1
+        return await fetch(symbol)
+
+    def counting_get_recent_prices(symbol, limit=100):
+        db_reads[symbol] += 1
+        return get_recent_prices(symbol, limit)
+
+    bot.fetch_real_time_data = counting_fetch
+    bot.db_manager.get_recent_prices = counting_get_recent_prices
+
+    signals = asyncio.run(bot.run_prediction_cycle())
+
+    assert fetches == Counter({symbol: 1 for symbol in SYMBOLS})
+    assert not db_reads
+    assert sorted(signal.symbol for signal in signals) == sorted(SYMBOLS)
+    for signal in signals:
+        assert signal.entry_price == bot.snapshots[signal.symbol].market_data.price
+
+
+def test_scheduler_reevaluates_on_ticks_with_debounce():
+    """Busy symbols are re-evaluated as ticks arrive, debounced; idle symbols only in full cycles"""
+    async def run():
+        stream = MarketStream({}, SYMBOLS)
+        bot = make_bot(market_stream=stream)
+        evaluations = Counter()
+
+        async def evaluate_symbol(symbol):
+            evaluations[symbol] += 1
+            return None, None
+        bot.evaluate_symbol = evaluate_symbol
+
+        scheduler = SignalScheduler(bot, min_interval=0.2, full_cycle_seconds=None)
+        await scheduler.start()
+        await asyncio.sleep(0.1)
+        assert evaluations == Counter({symbol: 1 for symbol in SYMBOLS})  # Startup full cycle
+
+        started = time.monotonic()
+        while time.monotonic() - started < 0.5:
+            stream._dispatch('{"symbol": "USD/CAD", "price": 1.35}')
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.3)
+        await scheduler.stop()
+
+        assert 2 <= evaluations['USD/CAD'] <= 5
+        assert evaluations['USD/BRL'] == 1
+
+    asyncio.run(run())
+
+
+def test_config_settings_reach_the_bot():
+    """The concurrency knobs in config.py are passed through to the bot"""
+    config = SimpleNamespace(MAX_CONCURRENT_SYMBOLS=2, SYMBOL_TIMEOUT_SECONDS=3, CYCLE_DEADLINE_SECONDS=7)
+    bot = make_bot(**bot_settings_from_config(config))
+    assert (bot.max_concurrency, bot.symbol_timeout, bot.cycle_deadline) == (2, 3, 7)
+
+    defaults = make_bot(**bot_settings_from_config(SimpleNamespace()))
+    assert (defaults.max_concurrency, defaults.symbol_timeout, defaults.cycle_deadline) == (5, 20.0, 45.0)
+
+
+if __name__ == "__main__":
+    for test in (test_cycle_runs_symbols_concurrently, test_slow_symbols_yield_partial_results,
+                 test_each_symbol_fetched_once_per_cycle, test_scheduler_reevaluates_on_ticks_with_debounce,
+                 test_config_settings_reach_the_bot):
+        test()
+        print(f"✓ {test.__name__}")
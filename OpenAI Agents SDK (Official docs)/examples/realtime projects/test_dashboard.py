@@ -0,0 +1,106 @@
+"""
+Tests for the console dashboard renderer
+Run with pytest, or directly: python test_dashboard.py
+"""
+
+import io
+import logging
+import time
+from datetime import datetime
+
+from bot import TradingSignal
+from dashboard import DashboardRenderer
+
+SYMBOLS = ['USD/BRL', 'USD/CAD', 'NZD/CAD']
+NOW = datetime(2025, 1, 1, 12, 0, 0)
+
+
+class FakeTerminal(io.StringIO):
+    def isatty(self) -> bool:
+        return True
+
+
+def make_signal(symbol: str, prediction: str = 'UP', confidence: float = 0.8) -> TradingSignal:
+    return TradingSignal(symbol=symbol, signal_type='BUY' if prediction == 'UP' else 'SELL', prediction=prediction,
+                         confidence=confidence, entry_price=1.35, stop_loss=1.33, take_profit=1.36, timestamp=NOW,
+                         reasoning='test', timeframe='tick', duration_minutes=5, target_price=1.36)
+
+
+def test_terminal_redraws_only_changed_rows():
+    """The first frame draws everything; later frames rewrite just the rows that changed"""
+    dashboard = DashboardRenderer(SYMBOLS, stream=FakeTerminal(), clock=lambda: NOW)
+    first = dashboard.render()
+    assert first.startswith('\x1b[2J')
+    assert dashboard.rows_written == 2 + len(SYMBOLS)
+
+    assert dashboard.render() == ''  # Nothing changed
+
+    dashboard.publish(make_signal('USD/CAD'))
+    frame = dashboard.render()
+    assert dashboard.rows_written == 2 + len(SYMBOLS) + 2  # Header (active count) and the USD/CAD row
+    assert '\x1b[4;1H' in frame and 'USD/CAD' in frame
+    assert 'USD/BRL' not in frame and 'NZD/CAD' not in frame
+
+
+def test_plain_stream_gets_one_line_per_new_signal():
+    """Without a TTY, each newly published signal becomes a single log line"""
+    dashboard = DashboardRenderer(SYMBOLS, stream=io.StringIO(), clock=lambda: NOW)
+    assert dashboard.render() == ''
+
+    for _ in range(1000):
+        dashboard.publish(make_signal('USD/BRL', 'DOWN'))  # Only the latest per symbol is kept
+    dashboard.publish(make_signal('NZD/CAD'))
+    lines = dashboard.render().splitlines()
+    assert len(lines) == 2
+    assert '\x1b' not in ''.join(lines)
+    assert lines[0].startswith('[12:00:00] USD/BRL') and 'DOWN' in lines[0]
+    assert dashboard.render() == ''
+    assert len(dashboard.latest) == 2
+    assert dashboard.active_count() == 2
+
+
+def test_render_thread_is_rate_limited():
+    """Publishing in a tight loop does not trigger more frames than the refresh rate allows"""
+    stream = FakeTerminal()
+    dashboard = DashboardRenderer(SYMBOLS, stream=stream, refresh_interval=0.05, clock=lambda: NOW)
+    dashboard.start()
+    started = time.monotonic()
+    count = 0
+    while time.monotonic() - started < 0.3:
+        dashboard.publish(make_signal('USD/CAD', confidence=0.6 + (count % 30) / 100))
+        count += 1
+    dashboard.stop()
+
+    frames = stream.getvalue().count('\x1b[4;1H')
+    assert count > 100
+    assert 2 <= frames <= 10
+
+
+def test_console_logging_is_muted_while_live():
+    """Log lines would scroll the terminal under the row diffs; they go only to the file while live"""
+    terminal = FakeTerminal()
+    log_file = io.StringIO()
+    logger = logging.getLogger('test_dashboard')
+    logger.setLevel(logging.INFO)
+    console, file_handler = logging.StreamHandler(terminal), logging.StreamHandler(log_file)
+    logger.addHandler(console)
+    logger.addHandler(file_handler)
+    try:
+        dashboard = DashboardRenderer(SYMBOLS, stream=terminal, refresh_interval=0.05, clock=lambda: NOW,
+                                      logger=logger)
+        dashboard.start()
+        logger.info('signal generated')
+        dashboard.stop()
+        assert 'signal generated' not in terminal.getvalue()
+        assert 'signal generated' in log_file.getvalue()
+        assert console in logger.handlers  # Restored once the dashboard stops
+    finally:
+        logger.removeHandler(console)
+        logger.removeHandler(file_handler)
+
+
+if __name__ == "__main__":
+    for test in (test_terminal_redraws_only_changed_rows, test_plain_stream_gets_one_line_per_new_signal,
+                 test_render_thread_is_rate_limited, test_console_logging_is_muted_while_live):
+        test()
+        print(f"✓ {test.__name__}")
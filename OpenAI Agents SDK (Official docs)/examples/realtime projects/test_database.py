@@ -0,0 +1,167 @@
+"""
+Tests for DatabaseManager
+Run with pytest, or directly: python test_database.py
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+from bot import DatabaseManager, MarketData, SCHEMA_MIGRATIONS
+
+
+def make_tick(symbol: str, price: float, timestamp: datetime) -> MarketData:
+    return MarketData(symbol=symbol, price=price, volume=1000000, change_24h=0.0,
+                      timestamp=timestamp, high_24h=price, low_24h=price)
+
+
+def test_batched_writes_and_read_your_writes():
+    """Rows are queued, visible to reads before flushing, and written in batches"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bot.db')
+        db = DatabaseManager(db_path, batch_size=10, flush_interval=3600)
+        start = datetime(2025, 1, 1)
+
+        for i in range(5):
+            db.store_market_data(make_tick('USD/CAD', 1.0 + i, start + timedelta(seconds=i)))
+        assert len(db.pending_market_data) == 5
+        assert db.get_recent_prices('USD/CAD', 3) == [3.0, 4.0, 5.0]
+
+        for i in range(5, 10):
+            db.store_market_data(make_tick('USD/CAD', 1.0 + i, start + timedelta(seconds=i)))
+        assert db.pending_market_data == []
+
+        other = sqlite3.connect(db_path)
+        assert other.execute('SELECT COUNT(*) FROM market_data').fetchone()[0] == 10
+        assert other.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        other.close()
+
+        db.store_market_data(make_tick('USD/CAD', 11.0, start + timedelta(seconds=10)))
+        assert db.get_recent_prices('USD/CAD', 3) == [9.0, 10.0, 11.0]
+        db.close()
+
+
+def test_in_memory_database():
+    """The shared connection lets ':memory:' databases keep their tables"""
+    db = DatabaseManager(':memory:')
+    db.store_market_data(make_tick('USD/BRL', 1.234, datetime.now()))
+    db.flush()
+    assert db.get_recent_prices('USD/BRL', 10) == [1.234]
+    db.close()
+
+
+def test_migrates_legacy_database():
+    """A database created before schema versioning gains the index on open"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'legacy.db')
+        legacy = sqlite3.connect(db_path)
+        legacy.execute('''
+            CREATE TABLE market_data (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, symbol TEXT NOT NULL, price REAL NOT NULL,
+                volume REAL NOT NULL, change_24h REAL NOT NULL, high_24h REAL NOT NULL,
+                low_24h REAL NOT NULL, timestamp DATETIME NOT NULL
+            )
+        ''')
+        legacy.execute("INSERT INTO market_data VALUES (NULL, 'USD/CAD', 1.5, 1, 0, 1.5, 1.5, '2025-01-01')")
+        legacy.commit()
+        legacy.close()
+
+        db = DatabaseManager(db_path)
+        assert db.schema_version() == SCHEMA_MIGRATIONS[-1][0]
+        assert db.get_recent_prices('USD/CAD') == [1.5]
+
+        plan = db.conn.execute(
+            'EXPLAIN QUERY PLAN SELECT price FROM market_data WHERE symbol = ? ORDER BY timestamp DESC LIMIT ?',
+            ('USD/CAD', 50)
+        ).fetchall()
+        assert any('COVERING INDEX idx_market_data_symbol_timestamp' in row[-1] for row in plan)
+        db.close()
+
+        # Re-opening is a no-op
+        db = DatabaseManager(db_path)
+        assert db.schema_version() == SCHEMA_MIGRATIONS[-1][0]
+        db.close()
+
+
+def test_full_batch_is_written_off_the_event_loop():
+    """Inside an event loop queueing never commits; a full batch is written on a worker thread"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bot.db')
+        db = DatabaseManager(db_path, batch_size=5, flush_interval=0)
+        start = datetime(2025, 1, 1)
+        other = sqlite3.connect(db_path)
+
+        async def main():
+            with db.db_lock:  # A commit in progress does not block queueing
+                for i in range(5):
+                    db.store_market_data(make_tick('USD/CAD', 1.0 + i, start + timedelta(seconds=i)))
+                assert other.execute('SELECT COUNT(*) FROM market_data').fetchone()[0] == 0
+                assert db.flush_task is not None and len(db.pending_market_data) == 5
+            await db.flush_task
+
+        asyncio.run(main())
+        assert other.execute('SELECT COUNT(*) FROM market_data').fetchone()[0] == 5
+        assert db.pending_market_data == [] and db.get_recent_prices('USD/CAD', 2) == [4.0, 5.0]
+        other.close()
+        db.close()
+
+
+def test_reads_see_in_flight_rows_once_without_waiting_for_the_commit():
+    """While a flush is writing, reads neither block nor miss or double its rows"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bot.db'), batch_size=100)
+        start = datetime(2025, 1, 1)
+        for i in range(5):
+            db.store_market_data(make_tick('USD/CAD', 1.0 + i, start + timedelta(seconds=i)))
+        db.flush()
+
+        written, resume = threading.Event(), threading.Event()
+        write = db._write
+
+        def paused_write(*rows):
+            write(*rows)
+            written.set()
+            assert resume.wait(5)
+        db._write = paused_write
+
+        for i in range(5, 10):
+            db.store_market_data(make_tick('USD/CAD', 1.0 + i, start + timedelta(seconds=i)))
+        flusher = threading.Thread(target=db.flush)
+        flusher.start()
+        assert written.wait(5)
+
+        # The flush holds db_lock with its rows inserted but not committed
+        db.store_market_data(make_tick('USD/CAD', 11.0, start + timedelta(seconds=10)))
+        reads = []
+        reader = threading.Thread(target=lambda: reads.append(db.get_recent_prices('USD/CAD', 20)))
+        reader.start()
+        reader.join(5)
+        assert not reader.is_alive() and reads == [[1.0 + i for i in range(11)]]
+
+        # The commit lands after a read has snapshotted the queues but before it queries
+        class CommitFirst:
+            def __enter__(self):
+                resume.set()
+                flusher.join()
+
+            def __exit__(self, *exc):
+                return False
+
+        read_lock, db.read_lock = db.read_lock, CommitFirst()
+        assert db.get_recent_prices('USD/CAD', 20) == [1.0 + i for i in range(11)]
+        db.read_lock = read_lock
+        assert db.get_recent_prices('USD/CAD', 20) == [1.0 + i for i in range(11)]
+        assert [tick[0] for tick in db.get_recent_ticks('USD/CAD', 3)] == [9.0, 10.0, 11.0]
+        db._write = write
+        db.close()
+
+
+if __name__ == "__main__":
+    for test in (test_batched_writes_and_read_your_writes, test_in_memory_database,
+                 test_migrates_legacy_database, test_full_batch_is_written_off_the_event_loop,
+                 test_reads_see_in_flight_rows_once_without_waiting_for_the_commit):
+        test()
+        print(f"✓ {test.__name__}")
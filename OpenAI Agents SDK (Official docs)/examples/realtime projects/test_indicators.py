@@ -0,0 +1,75 @@
+"""
+Tests for the indicator engine
+Run with pytest, or directly: python test_indicators.py
+"""
+
+import numpy as np
+
+from indicators import IndicatorEngine, sma_series, ema_series, rsi_series, macd_series
+from bot import TechnicalAnalyzer
+
+
+def random_walk(n: int = 300, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 1.0 * np.cumprod(1 + rng.normal(0, 0.001, n))
+
+
+def test_batch_matches_reference_loops():
+    """Vectorized series agree with straightforward Python loops"""
+    prices = random_walk()
+    period = 12
+
+    assert np.isclose(sma_series(prices, 5)[-1], sum(prices[-5:]) / 5)
+
+    ema = sum(prices[:period]) / period
+    multiplier = 2 / (period + 1)
+    for price in prices[period:]:
+        ema = (price * multiplier) + (ema * (1 - multiplier))
+    assert np.isclose(ema_series(prices, period)[-1], ema)
+
+    deltas = np.diff(prices)
+    avg_gain = np.clip(deltas[:14], 0, None).mean()
+    avg_loss = np.clip(-deltas[:14], 0, None).mean()
+    for delta in deltas[14:]:
+        avg_gain = (avg_gain * 13 + max(delta, 0)) / 14
+        avg_loss = (avg_loss * 13 + max(-delta, 0)) / 14
+    assert np.isclose(rsi_series(prices, 14)[-1], 100 - 100 / (1 + avg_gain / avg_loss))
+
+
+def test_incremental_matches_batch():
+    """Rolling per-tick state produces the same values as a batch pass"""
+    prices = random_walk()
+    engine = IndicatorEngine()
+    for price in prices:
+        snapshot = engine.update('USD/CAD', price)
+
+    batch = engine.batch(prices)
+    for period, value in snapshot['sma'].items():
+        assert np.isclose(value, batch['sma'][period][-1])
+    for period, value in snapshot['ema'].items():
+        assert np.isclose(value, batch['ema'][period][-1])
+    assert np.isclose(snapshot['rsi'], batch['rsi'][-1])
+    for key in ('macd', 'signal', 'histogram'):
+        assert np.isclose(snapshot['macd'][key], batch['macd'][key][-1])
+
+
+def test_warmup_and_technical_analyzer():
+    """Indicators stay empty until enough ticks arrive; MACD signal is a real EMA"""
+    engine = IndicatorEngine(sma_periods=(5, 10, 20))
+    prices = random_walk(engine.warmup_length)
+    engine.warm('USD/BRL', prices[:-1])
+    assert engine.snapshot('USD/BRL')['macd'] is None
+    engine.update('USD/BRL', prices[-1])
+    assert engine.snapshot('USD/BRL')['macd'] is not None
+
+    macd = TechnicalAnalyzer.calculate_macd(list(prices))
+    assert not np.isclose(macd['signal'], macd['macd'] * 0.9)
+    assert np.isclose(macd['signal'], macd_series(prices)['signal'][-1])
+    assert TechnicalAnalyzer.calculate_rsi(list(prices[:10])) is None
+
+
+if __name__ == "__main__":
+    for test in (test_batch_matches_reference_loops, test_incremental_matches_batch,
+                 test_warmup_and_technical_analyzer):
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,154 @@
+"""
+Tests for websocket market data ingestion against local stand-in feeds
+Run with pytest, or directly: python test_market_stream.py
+"""
+
+import asyncio
+import json
+
+import websockets
+
+from bot import FutureTradingBot
+from market_stream import MarketStream, parse_tick
+
+SYMBOLS = ['USD/CAD', 'USD/BRL']
+
+
+class StandInFeed:
+    """Local websocket server that streams ticks for whatever symbols a client subscribes to"""
+
+    def __init__(self, base_price: float):
+        self.base_price = base_price
+        self.server = None
+        self.subscriptions = []
+        self.sent = 0
+
+    @property
+    def url(self) -> str:
+        port = next(iter(self.server.sockets)).getsockname()[1]
+        return f"ws://127.0.0.1:{port}"
+
+    async def handler(self, ws):
+        request = json.loads(await ws.recv())
+        self.subscriptions.append(request)
+        try:
+            while True:
+                for symbol in request['symbols']:
+                    self.sent += 1
+                    await ws.send(json.dumps({'symbol': symbol, 'price': self.base_price + self.sent * 1e-4,
+                                              'volume': 1000, 'timestamp': 1735689600 + self.sent}))
+                await asyncio.sleep(0.01)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def start(self):
+        self.server = await websockets.serve(self.handler, '127.0.0.1', 0)
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def wait_for(condition, timeout: float = 5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def test_ticks_flow_into_bot_buffers():
+    """One multiplexed subscription feeds per-symbol queues that the bot ingests"""
+    async def run():
+        feed = StandInFeed(base_price=1.35)
+        await feed.start()
+        stream = MarketStream({'primary': feed.url}, SYMBOLS)
+        bot = FutureTradingBot('demo-key-not-set', SYMBOLS, db_path=':memory:', market_stream=stream)
+        await stream.start()
+
+        await wait_for(lambda: all(queue.qsize() >= 3 for queue in stream.queues.values()))
+        assert feed.subscriptions == [{'action': 'subscribe', 'symbols': SYMBOLS}]
+
+        queued = stream.queues['USD/CAD'].qsize()
+        market_data = await bot.fetch_real_time_data('USD/CAD')
+        assert market_data.price > 1.35
+        assert len(bot.price_buffers.get('USD/CAD')) >= queued
+        assert bot.price_buffers.get('USD/CAD').last_price == market_data.price
+        assert bot.indicator_engine.snapshot('USD/CAD')['price'] == market_data.price
+
+        await stream.stop()
+        await feed.stop()
+
+    asyncio.run(run())
+
+
+def test_fails_over_to_backup_and_back():
+    """The backup feed takes over when the primary drops, and hands back once it reconnects"""
+    async def run():
+        primary, backup = StandInFeed(base_price=1.0), StandInFeed(base_price=5.0)
+        await primary.start()
+        await backup.start()
+        primary_url = primary.url
+        stream = MarketStream({'primary': primary_url, 'backup': backup.url}, SYMBOLS,
+                              initial_backoff=0.05, max_backoff=0.1)
+        await stream.start()
+
+        await wait_for(lambda: stream.active_endpoint == 'primary' and stream.connected['backup'])
+        await wait_for(lambda: not stream.queues['USD/CAD'].empty())
+        assert all(tick['price'] < 5 for tick in stream.drain('USD/CAD'))
+
+        await primary.stop()
+        await wait_for(lambda: stream.active_endpoint == 'backup')
+        stream.drain('USD/CAD')
+        await wait_for(lambda: not stream.queues['USD/CAD'].empty())
+        assert all(tick['price'] > 5 for tick in stream.drain('USD/CAD'))
+
+        port = int(primary_url.rsplit(':', 1)[1])
+        primary.server = await websockets.serve(primary.handler, '127.0.0.1', port)
+        await wait_for(lambda: stream.active_endpoint == 'primary')
+
+        await stream.stop()
+        await primary.stop()
+        await backup.stop()
+
+    asyncio.run(run())
+
+
+def test_malformed_ticks_are_skipped():
+    """Bad values give None instead of raising out of the connection loop"""
+    assert parse_tick('{"symbol": "USD/CAD", "price": 1.35}')['price'] == 1.35
+    for message in ('{"symbol": "USD/CAD", "price": "n/a"}', '{"symbol": "USD/CAD", "price": null}',
+                    '{"symbol": "USD/CAD", "price": 1.35, "timestamp": 1e20}',
+                    '{"symbol": "USD/CAD", "price": 1.35, "timestamp": "soon"}',
+                    '{"symbol": "USD/CAD", "price": 1.35, "volume": [1]}'):
+        assert parse_tick(message) is None, message
+
+
+def test_backoff_grows_while_a_feed_drops_after_connecting():
+    """An endpoint that accepts and then closes is not reconnected in a tight loop"""
+    async def run():
+        connections = []
+
+        async def drop(ws):
+            connections.append(await ws.recv())
+            await ws.send('{"symbol": "USD/CAD", "price": "bad"}')
+
+        server = await websockets.serve(drop, '127.0.0.1', 0)
+        port = next(iter(server.sockets)).getsockname()[1]
+        stream = MarketStream({'flaky': f"ws://127.0.0.1:{port}"}, SYMBOLS, initial_backoff=0.05, max_backoff=0.4)
+        await stream.start()
+        await asyncio.sleep(1.0)
+        await stream.stop()
+        server.close()
+        await server.wait_closed()
+        # Reset on every connect would mean ~20 connections at 0.05s; doubling gives about 5
+        assert 2 <= len(connections) <= 7
+        assert stream.queues['USD/CAD'].empty()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    for test in (test_ticks_flow_into_bot_buffers, test_fails_over_to_backup_and_back,
+                 test_malformed_ticks_are_skipped, test_backoff_grows_while_a_feed_drops_after_connecting):
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,53 @@
+"""
+Tests for the in-memory tick buffers
+Run with pytest, or directly: python test_price_buffer.py
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from bot import DatabaseManager, MarketData
+from price_buffer import PriceRingBuffer, MarketDataBuffers
+
+
+def test_ring_buffer_wraps_and_returns_contiguous_views():
+    """Windows are oldest-first, contiguous, and only keep the last `capacity` ticks"""
+    buffer = PriceRingBuffer(capacity=4)
+    assert len(buffer) == 0 and buffer.last_price is None
+
+    buffer.extend([1.0, 2.0, 3.0], [10, 20, 30], [100, 101, 102])
+    assert list(buffer.prices()) == [1.0, 2.0, 3.0]
+
+    buffer.extend([4.0, 5.0, 6.0], [40, 50, 60], [103, 104, 105])
+    assert len(buffer) == 4
+    assert list(buffer.prices()) == [3.0, 4.0, 5.0, 6.0]
+    assert list(buffer.volumes(2)) == [50, 60]
+    assert list(buffer.timestamps(10)) == [102, 103, 104, 105]
+    assert buffer.prices().flags['C_CONTIGUOUS']
+    assert np.shares_memory(buffer.prices(), buffer._prices)
+    assert buffer.last_price == 6.0
+
+
+def test_buffers_warm_from_database():
+    """Warming loads the latest stored and queued ticks in chronological order"""
+    db = DatabaseManager(':memory:')
+    start = datetime(2025, 1, 1)
+    for i in range(6):
+        db.store_market_data(MarketData(symbol='USD/CAD', price=1.0 + i, volume=100.0 + i, change_24h=0.0,
+                                        timestamp=start + timedelta(seconds=i), high_24h=2.0, low_24h=0.5))
+        if i == 3:
+            db.flush()
+
+    buffers = MarketDataBuffers(capacity=5)
+    assert buffers.warm('USD/CAD', db) == 5
+    assert list(buffers.prices('USD/CAD')) == [2.0, 3.0, 4.0, 5.0, 6.0]
+    assert list(buffers.volumes('USD/CAD', 2)) == [104.0, 105.0]
+    assert buffers.get('USD/CAD').timestamps()[-1] == (start + timedelta(seconds=5)).timestamp()
+    db.close()
+
+
+if __name__ == "__main__":
+    for test in (test_ring_buffer_wraps_and_returns_contiguous_views, test_buffers_warm_from_database):
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,95 @@
+"""
+Tests for WebSearchAgent sentiment caching and batching
+Run with pytest, or directly: python test_sentiment.py
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from bot import WebSearchAgent
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions and records every request"""
+
+    def __init__(self):
+        self.requests = []
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        prompt = kwargs['messages'][-1]['content']
+        lines = [line.strip() for line in prompt.splitlines()]
+        symbols = [line[4:] for line in lines if line.startswith('### ')]
+        results = [{'symbol': symbol, 'sentiment_score': 0.4, 'confidence': 0.7, 'key_factors': ['test'],
+                    'recommendation': 'BUY', 'reasoning': f'{symbol} looks fine'} for symbol in symbols]
+        message = SimpleNamespace(content=json.dumps({'results': results}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def make_agent(**kwargs):
+    agent = WebSearchAgent('test-key', **kwargs)
+    completions = FakeCompletions()
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return agent, completions
+
+
+def news(text: str):
+    return [{'title': 'Headline', 'content': text}]
+
+
+def test_concurrent_symbols_share_one_request():
+    """Symbols requested together are answered by a single structured-output call"""
+    agent, completions = make_agent()
+
+    async def run():
+        return await asyncio.gather(*(agent.analyze_market_sentiment(symbol, news(symbol))
+                                      for symbol in ('USD/BRL', 'USD/CAD', 'NZD/CAD')))
+
+    results = asyncio.run(run())
+    assert len(completions.requests) == 1
+    assert completions.requests[0]['response_format']['type'] == 'json_schema'
+    assert [result['reasoning'] for result in results] == ['USD/BRL looks fine', 'USD/CAD looks fine',
+                                                           'NZD/CAD looks fine']
+
+
+def test_cache_until_news_changes_or_ttl_expires():
+    """Unchanged news is served from cache; new content or an expired entry is recomputed"""
+    agent, completions = make_agent()
+
+    async def run():
+        await agent.analyze_market_sentiment('USD/CAD', news('calm'))
+        await agent.analyze_market_sentiment('USD/CAD', news('calm'))
+        assert len(completions.requests) == 1
+        await agent.analyze_market_sentiment('USD/CAD', news('rate hike'))
+        assert len(completions.requests) == 2
+        agent.cache_ttl = 0
+        await agent.analyze_market_sentiment('USD/CAD', news('rate cut'))
+        await agent.analyze_market_sentiment('USD/CAD', news('rate cut'))
+        assert len(completions.requests) == 4
+
+    asyncio.run(run())
+
+
+def test_errors_fall_back_to_neutral_and_are_not_cached():
+    agent, completions = make_agent()
+
+    async def failing_create(**kwargs):
+        raise RuntimeError('API down')
+
+    async def run():
+        completions.create, working_create = failing_create, completions.create
+        result = await agent.analyze_market_sentiment('USD/BRL', news('x'))
+        assert result['recommendation'] == 'HOLD' and 'USD/BRL' not in agent.cache
+        completions.create = working_create
+        result = await agent.analyze_market_sentiment('USD/BRL', news('x'))
+        assert result['recommendation'] == 'BUY'
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    for test in (test_concurrent_symbols_share_one_request, test_cache_until_news_changes_or_ttl_expires,
+                 test_errors_fall_back_to_neutral_and_are_not_cached):
+        test()
+        print(f"✓ {test.__name__}")
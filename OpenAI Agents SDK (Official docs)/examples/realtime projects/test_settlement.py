@@ -0,0 +1,143 @@
+"""
+Tests for signal settlement and rolling accuracy
+Run with pytest, or directly: python test_settlement.py
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from bot import FutureTradingBot, TradingSignal
+from settlement import SettlementWorker, TAKE_PROFIT, STOP_LOSS, EXPIRED
+
+START = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def make_signal(signal_type: str, take_profit: float, stop_loss: float, duration: int = 5,
+                symbol: str = 'USD/CAD', entry: float = 1.0) -> TradingSignal:
+    return TradingSignal(symbol=symbol, signal_type=signal_type, prediction='UP' if signal_type == 'BUY' else 'DOWN',
+                         confidence=0.8, entry_price=entry, stop_loss=stop_loss, take_profit=take_profit,
+                         timestamp=START, reasoning='test', timeframe='tick', duration_minutes=duration,
+                         target_price=take_profit)
+
+
+def test_levels_and_expiry():
+    """Crossed levels settle as TP/SL; both in one pass counts as SL; the rest settle at expiry"""
+    worker = SettlementWorker(min_samples=1)
+    buy = make_signal('BUY', take_profit=1.01, stop_loss=0.985)
+    sell = make_signal('SELL', take_profit=0.99, stop_loss=1.015)
+    both = make_signal('BUY', take_profit=1.002, stop_loss=0.998)
+    idle = make_signal('SELL', take_profit=0.9, stop_loss=1.1, duration=10)
+    hold = make_signal('HOLD', take_profit=1.01, stop_loss=0.99)
+    for signal in (buy, sell, both, idle):
+        assert worker.track(signal)
+    assert not worker.track(hold)
+
+    for price in (1.001, 0.997, 1.003):
+        worker.observe('USD/CAD', price)
+    outcomes = worker.settle(START + timedelta(minutes=1))
+    assert [(o.outcome, o.exit_price) for o in outcomes] == [(STOP_LOSS, 0.998)]
+
+    worker.observe('USD/CAD', 1.012)
+    (outcome,) = worker.settle(START + timedelta(minutes=2))
+    assert outcome.outcome == TAKE_PROFIT and outcome.exit_price == 1.01 and outcome.correct
+
+    worker.observe('USD/CAD', 0.995)
+    (outcome,) = worker.settle(START + timedelta(minutes=6))
+    assert outcome.signal_type == 'SELL' and outcome.outcome == EXPIRED
+    assert np.isclose(outcome.pnl_percent, 0.5) and outcome.correct
+
+    (outcome,) = worker.settle(START + timedelta(minutes=11))
+    assert outcome.outcome == EXPIRED and outcome.exit_price == 0.995
+    assert not worker.open
+    assert worker.accuracy('USD/CAD') == 0.75
+    assert worker.adjust_confidence('USD/CAD', 0.9, 0.5) == 0.825
+
+
+def test_matches_brute_force_scan():
+    """Indexed settlement over thousands of signals agrees with checking every signal on every pass"""
+    rng = np.random.default_rng(5)
+    worker = SettlementWorker()
+    signals = []
+    for i in range(3000):
+        entry = 1.0 + rng.normal(0, 0.002)
+        width = rng.uniform(0.001, 0.01)
+        side = 'BUY' if i % 2 else 'SELL'
+        take_profit, stop_loss = (entry + width, entry - width) if side == 'BUY' else (entry - width, entry + width)
+        signal = make_signal(side, take_profit, stop_loss, duration=int(rng.integers(1, 30)), entry=entry)
+        signals.append(signal)
+        worker.track(signal)
+
+    settled, expected = {}, {}
+    prices = 1.0 + np.cumsum(rng.normal(0, 0.0005, 600))
+    for minute, window in enumerate(prices.reshape(60, 10)):
+        now = START + timedelta(minutes=minute + 1)
+        for price in window:
+            worker.observe('USD/CAD', float(price))
+        settled.update({outcome.entry_price: outcome.outcome for outcome in worker.settle(now)})
+
+        high, low = window.max(), window.min()
+        for signal in list(signals):
+            buy = signal.signal_type == 'BUY'
+            hit_sl = low <= signal.stop_loss if buy else high >= signal.stop_loss
+            hit_tp = high >= signal.take_profit if buy else low <= signal.take_profit
+            if hit_sl or hit_tp or signal.expiry_time <= now:
+                expected[signal.entry_price] = STOP_LOSS if hit_sl else TAKE_PROFIT if hit_tp else EXPIRED
+                signals.remove(signal)
+        assert len(worker.open) == len(signals)
+
+    assert settled == expected
+    assert set(expected.values()) == {TAKE_PROFIT, STOP_LOSS, EXPIRED}
+    assert max(len(heap) for heap in worker.rising.values()) <= 2 * len(worker.open) + 16
+
+
+def test_bot_writes_outcomes():
+    """Signals the bot generates are settled from its own ticks and stored in signal_outcomes"""
+    bot = FutureTradingBot('demo-key-not-set', ['USD/CAD'], db_path=':memory:')
+
+    async def run():
+        for _ in range(40):
+            await bot.fetch_real_time_data('USD/CAD')
+        return await bot.generate_trading_signal('USD/CAD')
+    signal = asyncio.run(run())
+    assert signal.id is not None
+
+    bot.settlement.track(make_signal('BUY', take_profit=signal.entry_price * 10, stop_loss=0.0))
+    bot.settlement.settle(datetime.now() + timedelta(hours=1))
+    bot.db_manager.flush()
+
+    rows = bot.db_manager.conn.execute('SELECT signal_id, outcome FROM signal_outcomes ORDER BY signal_id IS NULL, id').fetchall()
+    settled = 2 if signal.signal_type in ('BUY', 'SELL') else 1
+    assert len(rows) == settled
+    assert rows[-1] == (None, EXPIRED)
+    if settled == 2:
+        assert rows[0][0] == signal.id
+    assert len(bot.db_manager.get_recent_outcomes('USD/CAD')) == settled
+
+
+def test_new_signal_ignores_earlier_ticks():
+    """A signal tracked after an adverse move is not stopped out by ticks from before it existed"""
+    worker = SettlementWorker()
+    older = make_signal('BUY', take_profit=1.01, stop_loss=0.99)
+    worker.track(older)
+    for price in (1.0, 0.985, 0.992):
+        worker.observe('USD/CAD', price)
+
+    newer = make_signal('BUY', take_profit=1.0, stop_loss=0.988, entry=0.992)
+    worker.track(newer)
+    worker.observe('USD/CAD', 0.993)
+    outcomes = worker.settle(START + timedelta(minutes=1))
+    assert [(o.entry_price, o.outcome) for o in outcomes] == [(1.0, STOP_LOSS)]  # Only the older signal
+    assert len(worker.open) == 1
+
+    worker.observe('USD/CAD', 0.987)
+    (outcome,) = worker.settle(START + timedelta(minutes=2))
+    assert outcome.entry_price == 0.992 and outcome.outcome == STOP_LOSS and outcome.exit_price == 0.988
+
+
+if __name__ == "__main__":
+    for test in (test_levels_and_expiry, test_matches_brute_force_scan, test_bot_writes_outcomes,
+                 test_new_signal_ignores_earlier_ticks):
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,96 @@
+"""
+Tests for the bounded signal store
+Run with pytest, or directly: python test_signal_store.py
+"""
+
+import asyncio
+import tracemalloc
+from datetime import datetime, timedelta
+
+from bot import FutureTradingBot, TradingSignal
+from signal_store import SignalStore, EXPIRED, EVICTED
+
+START = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def make_signal(symbol: str, minute: float, duration: int) -> TradingSignal:
+    return TradingSignal(symbol=symbol, signal_type='BUY', prediction='UP', confidence=0.8, entry_price=1.35,
+                         stop_loss=1.33, take_profit=1.36, timestamp=START + timedelta(minutes=minute),
+                         reasoning='test', timeframe='tick', duration_minutes=duration, target_price=1.36)
+
+
+def test_cap_and_expiry_order():
+    """Signals beyond the cap are evicted oldest first; sweeps pop by expiry time, not insertion order"""
+    outcomes = []
+    now = [START]
+    store = SignalStore(max_per_symbol=2, on_expire=lambda signal, reason: outcomes.append((signal, reason)),
+                        clock=lambda: now[0])
+
+    first, second, third = make_signal('USD/CAD', 0, 10), make_signal('USD/CAD', 1, 3), make_signal('USD/CAD', 2, 6)
+    other = make_signal('USD/BRL', 0, 1)
+    store.extend([first, second, other])
+    store.add(third)
+    assert outcomes == [(first, EVICTED)]
+    assert store.active('USD/CAD') == [second, third]
+    assert len(store) == 3
+
+    assert store.sweep(START + timedelta(minutes=0.5)) == []
+    assert store.next_expiry() == START + timedelta(minutes=1)
+    assert store.sweep(START + timedelta(minutes=5)) == [other, second]
+    assert outcomes[1:] == [(other, EXPIRED), (second, EXPIRED)]
+    assert store.active() == [third]
+
+    # The evicted signal's heap entry is skipped when its expiry passes
+    assert store.sweep(START + timedelta(minutes=20)) == [third]
+    assert len(store) == 0 and not store.heap and not store.removed
+
+
+def test_memory_stays_flat():
+    """A long run of signals keeps the store and its heap bounded"""
+    now = [START]
+    store = SignalStore(max_per_symbol=5, clock=lambda: now[0])
+    symbols = [f"SYM{i}" for i in range(20)]
+
+    def run(minutes: int):
+        for minute in range(minutes):
+            now[0] = START + timedelta(minutes=minute)
+            for symbol in symbols:
+                for _ in range(3):
+                    store.add(make_signal(symbol, minute, 10))
+
+    run(200)
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    run(400)
+    growth = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, 'filename'))
+    tracemalloc.stop()
+
+    assert len(store) == len(symbols) * 5
+    assert len(store.heap) <= 2 * len(store) + 1
+    assert store.total_added == 600 * len(symbols) * 3
+    assert growth < 100_000
+
+
+def test_bot_keeps_bounded_signals():
+    """Prediction cycles add to the capped store instead of an ever-growing list"""
+    bot = FutureTradingBot('demo-key-not-set', ['USD/CAD', 'USD/BRL'], db_path=':memory:', max_signals_per_symbol=3)
+    expired = []
+    bot.signals.on_expire = lambda signal, reason: expired.append(reason)
+
+    async def run():
+        for _ in range(30):
+            await bot.fetch_real_time_data('USD/CAD')
+            await bot.fetch_real_time_data('USD/BRL')
+        for _ in range(5):
+            await bot.run_prediction_cycle()
+    asyncio.run(run())
+
+    assert len(bot.signals.active('USD/CAD')) == 3
+    assert len(bot.signals) == 6
+    assert expired == [EVICTED] * 4
+
+
+if __name__ == "__main__":
+    for test in (test_cap_and_expiry_order, test_memory_stays_flat, test_bot_keeps_bounded_signals):
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,72 @@
+"""
+Tests for the multi-process parameter sweep
+Run with pytest, or directly: python test_sweep.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from backtest import BacktestConfig, run_backtest
+from sweep import SweepGrid, default_grid, run_sweep, save_results, load_results
+
+
+def make_history(seed: int, n: int = 2000):
+    rng = np.random.default_rng(seed)
+    return {'timestamp': np.arange(n) * 5.0, 'price': 1.35 * np.exp(np.cumsum(rng.normal(0, 0.0015, n)))}
+
+
+def test_default_grid_covers_configured_settings():
+    settings = {'sma_periods': [20, 50, 200], 'ema_periods': [12, 26], 'rsi_period': 14,
+                'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9}
+    grid = default_grid(settings, confidence_threshold=0.65)
+    assert (20, 50, 200) in grid.sma_sets
+    assert 14 in grid.rsi_periods
+    assert (12, 26, 9) in grid.macd_sets
+    assert 0.65 in grid.min_confidences
+
+
+def test_sweep_matches_single_backtests_and_round_trips():
+    """Worker results equal in-process backtests, and the columnar file reloads unchanged"""
+    histories = {'USD/CAD': make_history(1), 'USD/BRL': make_history(2)}
+    grid = SweepGrid(sma_sets=[(5, 10, 20), (10, 20, 50)], rsi_periods=[7, 14],
+                     macd_sets=[(12, 26, 9)], min_confidences=[0.0, 0.8])
+    results = run_sweep(histories, grid, workers=2)
+
+    assert len(results) == 2 * 4 * 2
+    row = results[(results['symbol'] == 'USD/BRL') & (results['sma_fast'] == 10) &
+                  (results['rsi_period'] == 7) & (results['min_confidence'] == 0.8)].iloc[0]
+    expected = run_backtest(histories['USD/BRL']['timestamp'], histories['USD/BRL']['price'],
+                            BacktestConfig(sma_fast=10, sma_mid=20, sma_slow=50, rsi_period=7,
+                                           min_confidence=0.8)).summary()
+    assert row['signals'] == expected['signals']
+    assert np.isclose(row['total_pnl_percent'], expected['total_pnl_percent'])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sweep.npz')
+        save_results(results, path)
+        loaded = load_results(path)
+    assert list(loaded.columns) == list(results.columns)
+    assert list(loaded['symbol']) == list(results['symbol'])
+    assert np.allclose(loaded['hit_rate'], results['hit_rate'])
+
+
+def test_importing_sweep_in_a_worker_has_no_logging_side_effects():
+    """Workers import sweep (and through it bot) without adding handlers or opening trading_bot.log"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    script = ("import logging, sweep\n"
+              "assert not logging.getLogger().handlers, logging.getLogger().handlers\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [here, os.environ.get('PYTHONPATH')])))
+        subprocess.run([sys.executable, '-c', script], cwd=tmp, env=env, check=True)
+        assert not os.path.exists(os.path.join(tmp, 'trading_bot.log'))
+
+
+if __name__ == "__main__":
+    for test in (test_default_grid_covers_configured_settings, test_sweep_matches_single_backtests_and_round_trips,
+                 test_importing_sweep_in_a_worker_has_no_logging_side_effects):
+        test()
+        print(f"✓ {test.__name__}")
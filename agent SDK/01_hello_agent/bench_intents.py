@@ -0,0 +1,81 @@
+"""
+Microbenchmark: compiled intent router vs the old keyword scans
+Run directly: python bench_intents.py
+"""
+
+import timeit
+
+from intents import IntentRouter
+
+
+LEGACY_TOOL_MAPPINGS = [
+        (["weather", "temperature", "forecast", "hot", "cold", "rain", "sunny", "climate", "degrees"], "weather", "Use get_weather tool for"),
+        (["news", "headlines", "latest news", "current events", "breaking news", "today's news"], "news", "Use get_news_headlines tool for"),
+        (["time", "current time", "what time", "clock", "date", "today", "now"], "time", "Use get_current_time tool for"),
+        (["calculate", "math", "multiply", "divide", "add", "subtract", "*", "+", "-", "/", "=", "computation"], "math", "Use calculate_math tool for"),
+        (["search", "find", "look up", "google", "research", "information about", "tell me about", "universities", "scholarships", "list of"], "search", "Use search_internet tool for"),
+        (["convert", "currency", "usd", "eur", "gbp", "exchange", "dollar", "euro"], "currency", "Use currency_converter tool for"),
+        (["password", "generate password", "secure password", "create password"], "password", "Use password_generator tool for"),
+        (["random", "random number", "pick a number", "generate number"], "random", "Use generate_random_number tool for"),
+        (["analyze", "text analysis", "word count", "analyze text"], "analyze", "Use text_analyzer tool for"),
+        (["unit", "convert", "meters", "feet", "kg", "pounds", "celsius", "fahrenheit"], "unit", "Use unit_converter tool for"),
+]
+
+
+def legacy_should_force_tool_usage(query: str) -> tuple[bool, str, str]:
+    """should_force_tool_usage as it was before the intent router, kept as the baseline"""
+    query_lower = query.lower()
+
+    for keywords, tool_name, instruction in LEGACY_TOOL_MAPPINGS:
+        if any(keyword in query_lower for keyword in keywords):
+            modified_query = f"{instruction}: {query}"
+            return True, tool_name, modified_query
+
+    return False, "", query
+
+
+def legacy_rank(query: str) -> list:
+    """The same substring scans extended to score every intent, i.e. what ranking would cost the old way"""
+    query_lower = query.lower()
+    scores = [(sum(keyword in query_lower for keyword in keywords), tool_name)
+              for keywords, tool_name, _ in LEGACY_TOOL_MAPPINGS]
+    return sorted((score for score in scores if score[0]), reverse=True)
+
+
+QUERIES = [
+    "What's the weather in London?",
+    "Get the latest news headlines",
+    "What time is it?",
+    "Calculate 15 * 23 + 47",
+    "Search for universities in Italy",
+    "Convert 100 USD to EUR",
+    "Create a strong password",
+    "Give me a random number between 1 and 100",
+    "Convert 100 meters to feet",
+    "Hello, how are you?",
+    "Can you explain how photosynthesis works in plants, step by step, for a school project?",
+    "I'd like some well-known tips for writing a cover letter that stands out to recruiters",
+]
+
+
+def main(number: int = 20000):
+    router = IntentRouter()
+    print(f"{'query':<60} {'legacy':>10} {'router':>10}")
+    for query in QUERIES:
+        legacy = legacy_should_force_tool_usage(query)[1] or "-"
+        top = router.route(query)
+        print(f"{query[:58]:<60} {legacy:>10} {top.name if top else '-':>10}")
+
+    per_query = number * len(QUERIES) / 1e6
+    timings = [
+        ("legacy, first match only", lambda: [legacy_should_force_tool_usage(q) for q in QUERIES]),
+        ("legacy, every intent scored", lambda: [legacy_rank(q) for q in QUERIES]),
+        ("compiled router, ranked", lambda: [router.rank(q) for q in QUERIES]),
+    ]
+    print()
+    for name, run in timings:
+        print(f"{name:<30} {timeit.timeit(run, number=number) / per_query:6.2f} µs/query")
+
+
+if __name__ == "__main__":
+    main()
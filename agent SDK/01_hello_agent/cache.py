@@ -0,0 +1,187 @@
+"""
+Tool-result cache for the support agent
+Shares recent tool results between chats, with a TTL per tool, LRU eviction and one in-flight call per key
+"""
+
+import asyncio
+import dataclasses
+import functools
+import inspect
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from agents import FunctionTool
+
+# Names people use for currencies, as ISO 4217 codes
+CURRENCY_ALIASES = {
+    "$": "USD", "DOLLAR": "USD", "DOLLARS": "USD", "US DOLLAR": "USD", "US DOLLARS": "USD",
+    "€": "EUR", "EURO": "EUR", "EUROS": "EUR",
+    "£": "GBP", "POUND": "GBP", "POUNDS": "GBP", "POUND STERLING": "GBP", "BRITISH POUND": "GBP",
+    "¥": "JPY", "YEN": "JPY", "JAPANESE YEN": "JPY",
+    "CANADIAN DOLLAR": "CAD", "CANADIAN DOLLARS": "CAD",
+    "PAKISTANI RUPEE": "PKR", "PAKISTANI RUPEES": "PKR",
+}
+
+
+class Uncached(str):
+    """Tool output to return but never cache: errors and fallbacks after an upstream failure
+
+    It is still a str, so the model and the chat see the same text.
+    """
+
+
+def currency_code(value: str) -> str:
+    """ "usd", " Usd ", "dollars" and "$" all become "USD" """
+    name = " ".join(str(value).split()).upper()
+    return CURRENCY_ALIASES.get(name, name)
+
+
+def normalize(value: Any) -> Hashable:
+    """A cache key part that ignores case and spacing in text, and 100 vs 100.0"""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, normalize(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize(item) for item in value)
+    return value
+
+
+def sizeof(value: Any) -> int:
+    """Rough memory size of a cached result, in bytes"""
+    if isinstance(value, (str, bytes)):
+        return len(value) + 64
+    return len(repr(value)) + 64
+
+
+class TTLCache:
+    """An LRU cache whose entries expire, with a cap on their total size
+
+    `call()` returns a fresh cached result when there is one. Otherwise it
+    starts the call as a task that every caller of the same key awaits, so
+    concurrent identical requests share one call; a caller that gets
+    cancelled does not cancel it for the others. Results are cached when
+    `cache_if(result)` is true; exceptions and `Uncached` results are never
+    cached. Entries beyond `max_bytes` are evicted least recently used first.
+    """
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024, clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()  # key -> (expires, size, value)
+        self.size = 0
+        self.inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = self.misses = self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= self.clock():
+            self._remove(key)
+            return False, None
+        self.entries.move_to_end(key)
+        return True, entry[2]
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        size = sizeof(value)
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (self.clock() + ttl, size, value)
+        self.size += size
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+
+    def _remove(self, key: Hashable):
+        self.size -= self.entries.pop(key)[1]
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    async def call(self, key: Hashable, ttl: float, function: Callable[[], Awaitable[Any]],
+                   cache_if: Optional[Callable[[Any], bool]] = None) -> Any:
+        hit, value = self.get(key)
+        if hit:
+            self.hits += 1
+            return value
+        task = self.inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(function())
+            self.inflight[key] = task
+
+            def done(task: asyncio.Task):
+                if self.inflight.get(key) is task:
+                    del self.inflight[key]
+                if not task.cancelled() and task.exception() is None and not isinstance(task.result(), Uncached):
+                    if cache_if is None or cache_if(task.result()):
+                        self.set(key, task.result(), ttl)
+            task.add_done_callback(done)
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self.entries), "bytes": self.size, "hits": self.hits, "misses": self.misses,
+                "coalesced": self.coalesced}
+
+
+# Shared by all chats in this process
+tool_cache = TTLCache()
+
+
+def cached(ttl: float, normalizers: Optional[Dict[str, Callable[[Any], Hashable]]] = None,
+           cache_if: Optional[Callable[[Any], bool]] = None, cache: Optional[TTLCache] = None):
+    """Cache results of a tool for `ttl` seconds, keyed by its normalized arguments
+
+    Works above `@function_tool` (wrapping the FunctionTool, keyed by the
+    arguments the model sent) or on a plain async function:
+
+        @cached(ttl=600)
+        @function_tool
+        async def get_weather(city: str) -> str: ...
+
+    Arguments are normalized with `normalize()` (case, spacing), or with
+    `normalizers[name]` for the named ones, e.g. `{"currency": currency_code}`.
+    """
+    normalizers = normalizers or {}
+
+    def key_for(name: str, arguments: Dict[str, Any]) -> Hashable:
+        return name, tuple(sorted((arg, normalizers.get(arg, normalize)(value)) for arg, value in arguments.items()))
+
+    def decorator(target):
+        store = cache if cache is not None else tool_cache
+
+        if isinstance(target, FunctionTool):
+            invoke = target.on_invoke_tool
+
+            async def on_invoke_tool(context, input: str):
+                try:
+                    arguments = json.loads(input) if input else {}
+                except json.JSONDecodeError:
+                    arguments = {"": input}
+                return await store.call(key_for(target.name, arguments), ttl, lambda: invoke(context, input), cache_if)
+            return dataclasses.replace(target, on_invoke_tool=on_invoke_tool)
+
+        if not inspect.iscoroutinefunction(target):
+            raise TypeError(f"@cached needs an async function or a FunctionTool, got {target!r}")
+        signature = inspect.signature(target)
+
+        @functools.wraps(target)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return await store.call(key_for(target.__qualname__, bound.arguments), ttl,
+                                    lambda: target(*args, **kwargs), cache_if)
+        return wrapper
+    return decorator
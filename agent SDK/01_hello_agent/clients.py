@@ -0,0 +1,101 @@
+"""
+Shared network clients for the support agent and its tools
+One pooled async HTTP client per event loop, and one AsyncOpenAI client per API key and endpoint
+"""
+
+import asyncio
+import importlib.util
+from typing import Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+# Pool limits for outbound tool traffic
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_HOST = 10
+KEEPALIVE_EXPIRY = 30.0  # Seconds an idle connection stays open
+TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+# Pool limits per AsyncOpenAI client (model calls from the agent and from tools share them)
+OPENAI_MAX_CONNECTIONS = 50
+OPENAI_MAX_KEEPALIVE = 20
+OPENAI_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_http_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+_openai_clients: Dict[tuple, AsyncOpenAI] = {}  # (api_key, base_url) -> client
+
+
+class PerHostLimitTransport(httpx.AsyncHTTPTransport):
+    """Caps concurrent requests to any one host, on top of the pool-wide limit
+
+    httpx only limits connections for the whole pool, so one slow API could
+    otherwise take every connection and stall requests to the others.
+    """
+
+    def __init__(self, per_host: int = MAX_CONNECTIONS_PER_HOST, **kwargs):
+        super().__init__(**kwargs)
+        self.per_host = per_host
+        self.host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        slots = self.host_slots.setdefault(request.url.host, asyncio.Semaphore(self.per_host))
+        async with slots:
+            return await super().handle_async_request(request)
+
+
+def create_http_client(per_host: int = MAX_CONNECTIONS_PER_HOST) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS,
+                          keepalive_expiry=KEEPALIVE_EXPIRY)
+    transport = PerHostLimitTransport(per_host, limits=limits, http2=HTTP2_AVAILABLE)
+    return httpx.AsyncClient(transport=transport, timeout=TIMEOUT, follow_redirects=True,
+                             headers={"User-Agent": "Mozilla/5.0 (Panaversity Support Agent)"})
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The pooled client for the running event loop
+
+    Connections belong to the loop that opened them, so each loop gets its
+    own client. In the Chainlit app that is one client for the process.
+    """
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        # Forget clients of loops that have since closed (e.g. earlier asyncio.run calls)
+        for stale in [stale for stale in _http_clients if stale.is_closed()]:
+            del _http_clients[stale]
+        client = _http_clients[loop] = create_http_client()
+    return client
+
+
+def get_openai_client(api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+    """The shared AsyncOpenAI client for an API key and endpoint
+
+    Provider configs and tools that talk to the same endpoint get the same
+    client, so they share one connection pool and TLS sessions instead of
+    each opening their own.
+    """
+    key = (api_key, base_url)
+    client = _openai_clients.get(key)
+    if client is None or client.is_closed():
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_connections=OPENAI_MAX_CONNECTIONS,
+                                max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+                                keepalive_expiry=KEEPALIVE_EXPIRY),
+            timeout=OPENAI_TIMEOUT,
+            http2=HTTP2_AVAILABLE,
+        )
+        client = _openai_clients[key] = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+    return client
+
+
+async def close_clients():
+    """Close the running loop's HTTP client and every shared AsyncOpenAI client"""
+    client: Optional[httpx.AsyncClient] = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+    openai_clients = list(_openai_clients.values())
+    _openai_clients.clear()
+    await asyncio.gather(*(client.close() for client in openai_clients if not client.is_closed()))
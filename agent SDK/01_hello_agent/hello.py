@@ -1,7 +1,6 @@
 import os
 import asyncio
 import chainlit as cl
-import requests
 import json
 from datetime import datetime
 import random
@@ -10,12 +9,21 @@ import math
 from agents import (
     Agent, 
     RunConfig, 
-    AsyncOpenAI, 
     OpenAIChatCompletionsModel,
     Runner,
     function_tool
 )
 
+from openai.types.responses import ResponseTextDeltaEvent
+
+from cache import Uncached, cached, currency_code, tool_cache
+from clients import get_http_client, get_openai_client, close_clients
+from history import HistoryManager, token_counter
+from store import SessionConflict, open_store
+from intents import IntentRouter
+from router import ModelRouter
+from tool_calls import ToolCallRecorder, answer_with_tool_output
+
 from dotenv import load_dotenv, find_dotenv
 
 
@@ -29,15 +37,12 @@ openai_api_key = os.getenv("OPENAI_API_KEY")
 if not gemini_api_key and not openai_api_key:
     raise ValueError("Either GEMINI_API_KEY or OPENAI_API_KEY must be set in your .env file.")
 
-# Global variable to track which provider to use
-current_provider_type = "gemini"  # Start with Gemini, fallback to OpenAI
-
 def create_gemini_config():
     """Create Gemini configuration"""
     if not gemini_api_key:
         return None, None
     
-    provider = AsyncOpenAI(
+    provider = get_openai_client(
         api_key=gemini_api_key,
         base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
     )
@@ -54,7 +59,7 @@ def create_openai_config():
     if not openai_api_key:
         return None, None
         
-    provider = AsyncOpenAI(api_key=openai_api_key)
+    provider = get_openai_client(api_key=openai_api_key)
     
     model = OpenAIChatCompletionsModel(
         model="gpt-4o-mini",  # Use a cost-effective OpenAI model
@@ -63,34 +68,38 @@ def create_openai_config():
     
     return provider, model
 
-# Try to create initial configuration with Gemini
-provider, model = create_gemini_config()
-
-# Fallback to OpenAI if Gemini is not available
-if not provider or not model:
+# Step 3: Config - one RunConfig per available provider, routed by health (Gemini preferred)
+router = ModelRouter()
+for provider_name, create_config in (("gemini", create_gemini_config), ("openai", create_openai_config)):
+    provider, model = create_config()
+    if provider and model:
+        router.add(provider_name, RunConfig(
+            model=model,
+            model_provider=provider,
+            tracing_disabled=True,  # Disable tracing for this example
+        ))
+
+if not router.providers:
+    raise ValueError("Could not initialize either Gemini or OpenAI. Please check your API keys.")
+
+if router.preferred.name != "gemini":
     print("Gemini not available, using OpenAI...")
-    provider, model = create_openai_config()
-    current_provider_type = "openai"
-    
-    if not provider or not model:
-        raise ValueError("Could not initialize either Gemini or OpenAI. Please check your API keys.")
-
-# Step 3: Config
-config = RunConfig(
-    model=model,
-    model_provider=provider,
-    tracing_disabled=True,  # Disable tracing for this example
-)
+
+# Config of the preferred provider, for scripts that run the agent directly
+config = router.preferred.config
 
 # Step 4: Tools
 
+# Results are shared between chats for a while: the same city, query or currency pair asked again is answered from memory.
+# Errors and fallbacks are returned as Uncached, so the next question tries the upstream API again.
+@cached(ttl=10 * 60)
 @function_tool
-def get_weather(city: str) -> str:
+async def get_weather(city: str) -> str:
     """Get current weather information for a specific city."""
     try:
         # Using OpenWeatherMap API (you'll need to get a free API key)
         api_key = os.getenv("OPENWEATHER_API_KEY", "demo_key")
-        url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
+        url = "https://api.openweathermap.org/data/2.5/weather"
         
         if api_key == "demo_key":
             # Enhanced demo response with more realistic data based on city
@@ -108,7 +117,7 @@ def get_weather(city: str) -> str:
             else:
                 return f"Weather in {city}: 20°C, partly cloudy with moderate conditions. Humidity: 65%. Wind: 12 km/h. (Demo data - add OPENWEATHER_API_KEY for real-time weather)\n\nNote: For detailed 20-hour forecasts, hourly data, and extended predictions, please use dedicated weather services like Weather.com or AccuWeather.com"
         
-        response = requests.get(url, timeout=10)
+        response = await get_http_client().get(url, params={"q": city, "appid": api_key, "units": "metric"})
         if response.status_code == 200:
             data = response.json()
             temp = data['main']['temp']
@@ -116,24 +125,20 @@ def get_weather(city: str) -> str:
             humidity = data['main']['humidity']
             return f"Weather in {city}: {temp}°C, {description}, humidity: {humidity}%"
         else:
-            return f"Could not fetch weather data for {city}"
+            return Uncached(f"Could not fetch weather data for {city}")
     except Exception as e:
-        return f"Error fetching weather: {str(e)}"
+        return Uncached(f"Error fetching weather: {str(e)}")
 
+@cached(ttl=30 * 60)
 @function_tool
-def search_internet(query: str) -> str:
+async def search_internet(query: str) -> str:
     """Search the internet for information about a topic."""
     try:
         # First try OpenAI's knowledge (more reliable than web search)
-        from openai import OpenAI
-        
-        # Get OpenAI API key from environment
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        
         if not openai_api_key:
-            return "OpenAI API key not found. Please set OPENAI_API_KEY in your environment variables."
+            return Uncached("OpenAI API key not found. Please set OPENAI_API_KEY in your environment variables.")
         
-        client = OpenAI(api_key=openai_api_key)
+        client = get_openai_client(openai_api_key)
         
         # Enhanced search with specialized knowledge for common queries
         query_lower = query.lower()
@@ -232,7 +237,7 @@ The current weather tool provides only current conditions. For comprehensive hou
             return f"Search results for '{query}':\n{specialized_response}"
         
         # Use OpenAI's knowledge base for general queries
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-4o-mini",  # Use a reliable model
             messages=[
                 {
@@ -251,45 +256,38 @@ The current weather tool provides only current conditions. For comprehensive hou
         if response.choices[0].message.content:
             return f"Search results for '{query}':\n{response.choices[0].message.content}"
         else:
-            return f"Could not find comprehensive information for '{query}'"
+            return Uncached(f"Could not find comprehensive information for '{query}'")
             
-    except ImportError:
-        return "OpenAI library not installed. Please install it with: pip install openai"
     except Exception as e:
         # Fallback to DuckDuckGo if OpenAI fails
         try:
-            url = f"https://api.duckduckgo.com/?q={query}&format=json&pretty=1"
-            response = requests.get(url, timeout=10)
+            url = "https://api.duckduckgo.com/"
+            response = await get_http_client().get(url, params={"q": query, "format": "json"})
             
             if response.status_code == 200:
                 data = response.json()
                 if data.get('AbstractText'):
-                    return f"Search result for '{query}': {data['AbstractText']} (Source: DuckDuckGo)"
+                    return Uncached(f"Search result for '{query}': {data['AbstractText']} (Source: DuckDuckGo)")
                 elif data.get('Definition'):
-                    return f"Definition of '{query}': {data['Definition']} (Source: DuckDuckGo)"
+                    return Uncached(f"Definition of '{query}': {data['Definition']} (Source: DuckDuckGo)")
                 else:
-                    return f"Search completed for '{query}'. For detailed information, please check reliable academic or official sources."
+                    return Uncached(f"Search completed for '{query}'. For detailed information, please check reliable academic or official sources.")
             else:
-                return f"Search completed for '{query}'. For detailed information, please check reliable sources."
+                return Uncached(f"Search completed for '{query}'. For detailed information, please check reliable sources.")
         except:
-            return f"Search information for '{query}': Please check reliable academic databases, official university websites, or educational platforms for the most accurate and up-to-date information."
+            return Uncached(f"Search information for '{query}': Please check reliable academic databases, official university websites, or educational platforms for the most accurate and up-to-date information.")
 
 @function_tool
-def web_browse(url: str) -> str:
+async def web_browse(url: str) -> str:
     """Browse a specific website and extract its content."""
     try:
-        from openai import OpenAI
-        
-        # Get OpenAI API key from environment
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        
         if not openai_api_key:
             return "OpenAI API key not found. Please set OPENAI_API_KEY in your environment variables."
         
-        client = OpenAI(api_key=openai_api_key)
+        client = get_openai_client(openai_api_key)
         
         # Use OpenAI to browse and summarize the webpage
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-4o",
             messages=[
                 {
@@ -309,12 +307,10 @@ def web_browse(url: str) -> str:
         else:
             return f"Could not extract content from {url}"
             
-    except ImportError:
-        return "OpenAI library not installed. Please install it with: pip install openai"
     except Exception as e:
         # Fallback to simple HTTP request
         try:
-            response = requests.get(url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'})
+            response = await get_http_client().get(url)
             if response.status_code == 200:
                 content = response.text[:1000]  # First 1000 characters
                 return f"Website content from {url} (first 1000 chars):\n{content}..."
@@ -349,8 +345,9 @@ def generate_random_number(min_val: int = 1, max_val: int = 100) -> str:
     number = random.randint(min_val, max_val)
     return f"Random number between {min_val} and {max_val}: {number}"
 
+@cached(ttl=5 * 60)
 @function_tool
-def get_news_headlines() -> str:
+async def get_news_headlines() -> str:
     """Get latest news headlines."""
     try:
         # Using NewsAPI (you'll need to get a free API key)
@@ -368,8 +365,8 @@ def get_news_headlines() -> str:
 7) Healthcare innovation shows promising results - Clinical trials demonstrate effective new treatments
 (Demo data - add NEWS_API_KEY for real news)"""
         
-        url = f"https://newsapi.org/v2/top-headlines?country=us&apiKey={api_key}"
-        response = requests.get(url, timeout=10)
+        url = "https://newsapi.org/v2/top-headlines"
+        response = await get_http_client().get(url, params={"country": "us", "apiKey": api_key})
         
         if response.status_code == 200:
             data = response.json()
@@ -379,16 +376,16 @@ def get_news_headlines() -> str:
             return "Latest Headlines:\n" + "\n".join(headlines)
         else:
             # Fallback to demo data if API fails
-            return """Latest Headlines:
+            return Uncached("""Latest Headlines:
 1) Tech stocks rise amid AI developments - Major AI companies see significant gains
 2) Climate summit reaches new agreements - Global leaders commit to environmental targets  
 3) Sports: Championship finals this weekend - Major sporting events draw attention
 4) New breakthrough in renewable energy - Scientists develop efficient solar panels
 5) Global markets show positive trends - Economic indicators suggest growth
-(Demo data - News API unavailable)"""
+(Demo data - News API unavailable)""")
     except Exception as e:
         # Always return demo data on error to ensure tool provides useful output
-        return """Latest Headlines:
+        return Uncached("""Latest Headlines:
 1) Technology: AI advances reshape multiple industries - Innovation continues at rapid pace
 2) Economy: Global markets show resilience amid challenges - Investors remain optimistic
 3) Science: New research breakthrough announced - Scientific community celebrates discovery
@@ -396,24 +393,32 @@ def get_news_headlines() -> str:
 5) Health: Medical innovation shows promising results - Clinical trials advance treatments
 6) Sports: Major competitions draw global attention - Athletes prepare for key events
 7) Education: Universities embrace digital transformation - Learning evolves with technology
-(Demo headlines - Add NEWS_API_KEY environment variable for real-time news)"""
+(Demo headlines - Add NEWS_API_KEY environment variable for real-time news)""")
+
+@cached(ttl=60 * 60, normalizers={"base": currency_code}, cache_if=lambda rates: rates is not None)
+async def exchange_rates(base: str) -> dict | None:
+    """Latest exchange rates from `base`, or None if they could not be fetched"""
+    # Using a free exchange rate API
+    response = await get_http_client().get(f"https://api.exchangerate-api.com/v4/latest/{base}")
+    if response.status_code != 200:
+        return None
+    return response.json()['rates']
 
 @function_tool
-def currency_converter(amount: float, from_currency: str, to_currency: str) -> str:
+async def currency_converter(amount: float, from_currency: str, to_currency: str) -> str:
     """Convert currency from one type to another."""
     try:
-        # Using a free exchange rate API
-        url = f"https://api.exchangerate-api.com/v4/latest/{from_currency.upper()}"
-        response = requests.get(url, timeout=10)
+        # Rates are cached per base currency for an hour, so any amount and target reuses them
+        from_currency, to_currency = currency_code(from_currency), currency_code(to_currency)
+        rates = await exchange_rates(from_currency)
         
-        if response.status_code == 200:
-            data = response.json()
-            if to_currency.upper() in data['rates']:
-                rate = data['rates'][to_currency.upper()]
+        if rates is not None:
+            if to_currency in rates:
+                rate = rates[to_currency]
                 converted = amount * rate
-                return f"{amount} {from_currency.upper()} = {converted:.2f} {to_currency.upper()}"
+                return f"{amount} {from_currency} = {converted:.2f} {to_currency}"
             else:
-                return f"Currency {to_currency.upper()} not found"
+                return f"Currency {to_currency} not found"
         else:
             return "Could not fetch exchange rates"
     except Exception as e:
@@ -523,6 +528,11 @@ You: MUST call get_current_time() and respond with exact output
 
 **NEVER provide responses without using tools when tools are available for the query type.**""",
     name="Panaversity Support Agent",
+    # Answers that are exactly a tool's output skip the extra model turn; search and browse results are summarized
+    tool_use_behavior=answer_with_tool_output([
+        "get_weather", "get_current_time", "calculate_math", "generate_random_number", "get_news_headlines",
+        "currency_converter", "text_analyzer", "unit_converter", "password_generator"
+    ]),
     tools=[
         get_weather,
         search_internet,
@@ -550,116 +560,110 @@ You: MUST call get_current_time() and respond with exact output
 # import pprint
 # pprint.pprint(result)
 
+# Folds conversation turns that left the history window into a short rolling summary
+summary_agent: Agent = Agent(
+    name="History Summarizer",
+    instructions="""You maintain a running summary of a support conversation.
+Merge the new turns into the summary so far. Keep names, places, numbers, preferences and open questions.
+Drop greetings and tool output details. Answer with the updated summary only, in at most 150 words.""",
+)
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "3000"))
+
+async def summarize_history(summary: str, turns: list[dict]) -> str:
+    transcript = "\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+    result, _ = await router.run(Runner.run, summary_agent,
+                                 f"Summary so far:\n{summary or '(none)'}\n\nNew turns:\n{transcript}")
+    return str(result.final_output)
+
+# Conversations persist in $SESSION_STORE_URL (SQLite by default, or Redis), so any worker can continue a chat
+session_store = open_store()
+
+def create_history(session_id: str, persist: bool = True) -> HistoryManager:
+    async def save_summary(summary: str, upto: int) -> None:
+        await session_store.save_summary(session_id, summary, upto)
+
+    # Count tokens with the preferred provider's tokenizer; fallbacks use smaller or similar ones
+    return HistoryManager(budget=HISTORY_TOKEN_BUDGET, count_tokens=token_counter(router.preferred.name),
+                          summarizer=summarize_history, on_summary=save_summary if persist else None)
+
+async def load_history(session_id: str, attempts: int = 2) -> HistoryManager:
+    """The chat's history, loaded from the store on its first message"""
+    for attempt in range(attempts):
+        try:
+            state = await session_store.load(session_id)
+            break
+        except Exception as e:
+            print(f"Debug - Loading session {session_id} failed (attempt {attempt + 1}): {e}")
+    else:
+        # Saved turns we could not read must not be overwritten: continue this chat without saving it
+        history = create_history(session_id, persist=False)
+        cl.user_session.set("persist", False)
+        cl.user_session.set("history", history)
+        return history
+    history = create_history(session_id)
+    history.restore(state.summary, state.turns, state.tool_outputs, state.next_seq)
+    cl.user_session.set("persist", True)
+    cl.user_session.set("history", history)
+    return history
+
+async def save_turns(session_id: str, turns: list, tool_outputs: dict | None = None) -> None:
+    # Only this turn's messages are written; a store outage must not break the chat
+    if not cl.user_session.get("persist", True):
+        return
+    try:
+        await session_store.append(session_id, turns, tool_outputs)
+    except SessionConflict as e:
+        print(f"Debug - Session {session_id} changed elsewhere, no longer saving this chat: {e}")
+        cl.user_session.set("persist", False)
+    except Exception as e:
+        print(f"Debug - Saving session {session_id} failed: {e}")
+
 @cl.on_chat_start
 async def start_chat() -> None:
-    cl.user_session.set("history", [])
+    # History loads lazily on the first message
+    cl.user_session.set("session_id", cl.context.session.thread_id)
+    cl.user_session.set("history", None)
     await cl.Message(
         content="Hello! I am your support agent. How can I assist you today?",
         author="Panaversity Support Agent",
     ).send()
 
+@cl.on_chat_resume
+async def resume_chat(thread) -> None:
+    # A resumed thread may have been served by another worker; its history loads from the store
+    cl.user_session.set("session_id", thread["id"])
+    cl.user_session.set("history", None)
+
+@cl.on_app_shutdown
+async def shutdown() -> None:
+    # Close pooled connections cleanly
+    await close_clients()
+    await session_store.close()
+
+intent_router = IntentRouter()
+
 def should_force_tool_usage(query: str) -> tuple[bool, str, str]:
     """
     Determine if a query should force tool usage and which tool to use.
     Returns: (should_force, tool_name, modified_query)
     """
-    query_lower = query.lower()
-    
-    # Define explicit mappings for tool usage
-    tool_mappings = [
-        (["weather", "temperature", "forecast", "hot", "cold", "rain", "sunny", "climate", "degrees"], "weather", "Use get_weather tool for"),
-        (["news", "headlines", "latest news", "current events", "breaking news", "today's news"], "news", "Use get_news_headlines tool for"),
-        (["time", "current time", "what time", "clock", "date", "today", "now"], "time", "Use get_current_time tool for"),
-        (["calculate", "math", "multiply", "divide", "add", "subtract", "*", "+", "-", "/", "=", "computation"], "math", "Use calculate_math tool for"),
-        (["search", "find", "look up", "google", "research", "information about", "tell me about", "universities", "scholarships", "list of"], "search", "Use search_internet tool for"),
-        (["convert", "currency", "usd", "eur", "gbp", "exchange", "dollar", "euro"], "currency", "Use currency_converter tool for"),
-        (["password", "generate password", "secure password", "create password"], "password", "Use password_generator tool for"),
-        (["random", "random number", "pick a number", "generate number"], "random", "Use generate_random_number tool for"),
-        (["analyze", "text analysis", "word count", "analyze text"], "analyze", "Use text_analyzer tool for"),
-        (["unit", "convert", "meters", "feet", "kg", "pounds", "celsius", "fahrenheit"], "unit", "Use unit_converter tool for"),
-    ]
-    
-    for keywords, tool_name, instruction in tool_mappings:
-        if any(keyword in query_lower for keyword in keywords):
-            modified_query = f"{instruction}: {query}"
-            return True, tool_name, modified_query
-    
-    return False, "", query
-
-async def run_with_fallback(agent, history, current_config):
-    """
-    Run the agent with automatic fallback to OpenAI if Gemini fails
-    """
-    global current_provider_type, provider, model, config
-    
-    try:
-        # Try with current provider
-        result = await Runner.run(
-            agent,
-            input=history,
-            run_config=current_config
-        )
-        return result, current_provider_type
-        
-    except Exception as e:
-        error_str = str(e)
-        
-        # Check if this is a Gemini quota/rate limit error
-        if ("429" in error_str or "quota" in error_str.lower() or 
-            "rate limit" in error_str.lower() or "RESOURCE_EXHAUSTED" in error_str):
-            
-            if current_provider_type == "gemini" and openai_api_key:
-                print("Debug - Gemini quota exceeded, switching to OpenAI...")
-                
-                # Switch to OpenAI
-                new_provider, new_model = create_openai_config()
-                if new_provider and new_model:
-                    new_config = RunConfig(
-                        model=new_model,
-                        model_provider=new_provider,
-                        tracing_disabled=True
-                    )
-                    
-                    # Update global variables
-                    provider = new_provider
-                    model = new_model
-                    config = new_config
-                    current_provider_type = "openai"
-                    
-                    print("Debug - Successfully switched to OpenAI, retrying...")
-                    
-                    # Retry with OpenAI
-                    try:
-                        result = await Runner.run(
-                            agent,
-                            input=history,
-                            run_config=new_config
-                        )
-                        return result, current_provider_type
-                    except Exception as retry_error:
-                        print(f"Debug - OpenAI also failed: {retry_error}")
-                        raise retry_error
-                else:
-                    print("Debug - Could not create OpenAI config")
-                    raise e
-            else:
-                print("Debug - Already using OpenAI or no OpenAI key available")
-                raise e
-        else:
-            # Not a quota error, re-raise
-            raise e
+    intent = intent_router.route(query)
+    if intent is None:
+        return False, "", query
+    return True, intent.name, intent.augment(query)
 
 @cl.on_message
 async def handle_message(message: cl.Message) -> str:
-    global config
-    history = cl.user_session.get("history", [])
+    session_id = cl.user_session.get("session_id") or cl.context.session.thread_id
+    history = cl.user_session.get("history")
     
     msg = cl.Message("")
     await msg.send()
     
-    # Ensure history is a list (safety check)
+    # First message of this chat on this worker: load what the store has
     if history is None:
-        history = []
+        history = await load_history(session_id)
     
     # Check if we should force tool usage
     should_force, tool_name, modified_query = should_force_tool_usage(message.content)
@@ -672,145 +676,66 @@ async def handle_message(message: cl.Message) -> str:
         print(f"Debug - No tool forcing needed for query: {message.content}")
         user_message = message.content
     
-    # Standard Interface [{"role": "user", "content": user_message}]    
-    history.append({"role": "user", "content": user_message})
+    # History keeps what the user typed; only this turn's input carries the tool instruction
+    user_turn = history.add_user(message.content)
+    model_input = history.build_input(current=user_message)
+    print(f"Debug - History: {len(model_input)} messages, ~{history.input_tokens()} tokens")
     
     try:
-        print(f"Debug - Using {current_provider_type} provider")
-        
-        # Use the fallback system
-        result, used_provider = await run_with_fallback(agent, history, config)
-        
-        # Notify user if provider switched
-        if used_provider != current_provider_type:
-            print(f"Debug - Provider switched to {used_provider}")
-            # Add a notice to the response
-            provider_switch_notice = f"\n\n*Note: Switched to {used_provider.upper()} due to API limits.*"
+        # Stream the run: text deltas go straight to the message, tool calls show up as steps.
+        # The router picks the healthiest provider and falls back on provider errors.
+        tool_steps = {}  # call_id -> cl.Step
+        recorder = ToolCallRecorder()
+        async for used_provider, result, event in router.stream(Runner.run_streamed, agent, input=model_input, hooks=recorder):
+            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                await msg.stream_token(event.data.delta)
+            elif event.type == "run_item_stream_event" and event.name == "tool_called":
+                call = event.item.raw_item
+                step = cl.Step(name=getattr(call, "name", "tool"), type="tool")
+                step.input = getattr(call, "arguments", "")
+                await step.send()
+                tool_steps[getattr(call, "call_id", step.id)] = step
+            elif event.type == "run_item_stream_event" and event.name == "tool_output":
+                step = tool_steps.pop(event.item.raw_item.get("call_id"), None)
+                if step:
+                    step.output = str(event.item.output)
+                    await step.update()
+        print(f"Debug - Answered by {used_provider}, provider health: {router.status()}")
+        
+        # Notify user when the preferred provider was skipped
+        if used_provider != router.preferred.name:
+            provider_switch_notice = f"\n\n*Note: Answered by {used_provider.upper()} while {router.preferred.name.upper()} is unavailable.*"
         else:
             provider_switch_notice = ""
         
-        # Debug: Check if tools were used and extract tool outputs
-        tool_outputs = []
-        print(f"Debug - New items count: {len(result.new_items)}")
-        for item in result.new_items:
-            print(f"Debug - Item type: {type(item).__name__}")
-            # Check for different types of tool output items
-            if hasattr(item, 'output') and item.output:
-                tool_outputs.append(str(item.output))
-                print(f"Debug - Tool output: {item.output}")
-            elif hasattr(item, 'content') and item.content:
-                tool_outputs.append(str(item.content))
-                print(f"Debug - Tool content: {item.content}")
-            elif hasattr(item, 'result') and item.result:
-                tool_outputs.append(str(item.result))
-                print(f"Debug - Tool result: {item.result}")
+        # Tool calls of this run, as recorded by the hooks
+        tool_calls = recorder.complete(result.new_items)
+        for call in tool_calls:
+            print(f"Debug - Tool {call.tool}({call.arguments}) took {call.latency or 0:.2f}s: {str(call.output)[:100]}")
+        if tool_calls:
+            print(f"Debug - Tool cache: {tool_cache.stats()}")
         
-        response_text = result.final_output
+        # A direct tool answer ends the run without another model turn, so it has not been streamed yet
+        response_text = str(result.final_output or "")
+        if not msg.content.endswith(response_text):
+            await msg.stream_token(("\n\n" if msg.content else "") + response_text)
+        final_response = msg.content + provider_switch_notice
         
-        # Post-processing: If tools were used but response seems generic, force tool output inclusion
-        if tool_outputs:
-            print(f"Debug - Found {len(tool_outputs)} tool outputs")
-            print(f"Debug - Tool outputs: {tool_outputs}")
-            
-            # More aggressive checking for tool output inclusion
-            tool_output_included = False
-            for output in tool_outputs:
-                # Check if any significant part of the tool output is in the response
-                output_words = output.lower().split()
-                significant_words = [word for word in output_words if len(word) > 3 and word not in ['the', 'and', 'for', 'with', 'this', 'that', 'from']]
-                
-                if len(significant_words) >= 2:
-                    words_in_response = sum(1 for word in significant_words[:5] if word in response_text.lower())
-                    if words_in_response >= 2:
-                        tool_output_included = True
-                        break
-                elif output.strip() in response_text:
-                    tool_output_included = True
-                    break
-            
-            if not tool_output_included:
-                print("Debug - Tool outputs not properly included, forcing inclusion")
-                # Get the most informative tool output
-                primary_output = max(tool_outputs, key=len) if tool_outputs else ""
-                
-                # If the response is generic or unhelpful, replace it entirely with tool output
-                generic_phrases = [
-                    "i was unable", "i cannot", "i don't have access", 
-                    "sorry", "apologize", "not available", "try again later"
-                ]
-                
-                is_generic_response = any(phrase in response_text.lower() for phrase in generic_phrases)
-                
-                if is_generic_response or len(response_text.strip()) < 20:
-                    print("Debug - Replacing generic response with tool output")
-                    response_text = primary_output
-                else:
-                    print("Debug - Prepending tool output to response")
-                    response_text = f"{primary_output}\n\n{response_text}"
-            else:
-                print("Debug - Tool output found in response")
-        else:
-            print("Debug - No tool outputs detected")
-            
-            # If no tools were called but the query should have triggered tools, call them manually
-            should_force, tool_name, _ = should_force_tool_usage(message.content)
-            if should_force:
-                print(f"Debug - Should have used {tool_name} tool, calling manually")
-                manual_result = None
-                
-                try:
-                    if tool_name == "weather" and any(word in message.content.lower() for word in ["london", "lahore", "karachi", "new york", "paris"]):
-                        # Extract city name from query
-                        query_words = message.content.lower().split()
-                        cities = ["london", "lahore", "karachi", "new york", "paris", "tokyo", "dubai", "islamabad"]
-                        city = next((word for word in query_words if word in cities), "London")
-                        manual_result = get_weather(city)
-                    elif tool_name == "news":
-                        manual_result = get_news_headlines()
-                    elif tool_name == "time":
-                        manual_result = get_current_time()
-                    elif tool_name == "math" and any(op in message.content for op in ["+", "-", "*", "/", "calculate"]):
-                        # Try to extract math expression
-                        import re
-                        math_pattern = r'(\d+\s*[+\-*/]\s*\d+)'
-                        match = re.search(math_pattern, message.content)
-                        if match:
-                            manual_result = calculate_math(match.group(1))
-                    elif tool_name == "search":
-                        manual_result = search_internet(message.content)
-                    elif tool_name == "random":
-                        manual_result = generate_random_number()
-                    elif tool_name == "password":
-                        manual_result = password_generator()
-                    
-                    if manual_result:
-                        print(f"Debug - Manual tool result: {manual_result}")
-                        response_text = f"{manual_result}\n\n{response_text}"
-                        
-                except Exception as e:
-                    print(f"Debug - Manual tool call failed: {e}")
+        if provider_switch_notice:
+            await msg.stream_token(provider_switch_notice)
+        await msg.update()
         
-        # Add provider switch notice if applicable
-        final_response = response_text + provider_switch_notice
-        
-        # Simulate streaming by sending the response word by word
-        words = final_response.split(' ')
-        for i, word in enumerate(words):
-            if i == 0:
-                await msg.stream_token(word)
-            else:
-                await msg.stream_token(' ' + word)
-            await asyncio.sleep(0.05)  # Small delay between words
-        
-        history.append({"role": "assistant", "content": final_response})
-        cl.user_session.set("history", history)
+        # Tool outputs are stored by call id, outside the turn text
+        tool_outputs = {call.call_id: call.output for call in tool_calls if call.finished}
+        assistant_turn = history.add_assistant(final_response, tool_outputs)
+        await save_turns(session_id, [user_turn, assistant_turn], tool_outputs)
         
     except Exception as e:
         error_msg = f"Error: {str(e)}"
         await msg.stream_token(error_msg)
+        await msg.update()
         print(f"Debug - Error occurred: {e}")
-        history.append({"role": "assistant", "content": error_msg})
-        cl.user_session.set("history", history)
+        await save_turns(session_id, [user_turn, history.add_assistant(error_msg)])
 
 # Test function to verify tools work
 async def test_tools():
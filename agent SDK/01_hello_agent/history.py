@@ -0,0 +1,232 @@
+"""
+Conversation history for the support agent
+Keeps each chat's model input within a token budget, with a rolling summary of older turns
+"""
+
+import asyncio
+import itertools
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Awaitable, Callable, Deque, Dict, Iterable, List, Optional
+
+# Encodings for providers whose tokenizer is available locally (through tiktoken)
+TIKTOKEN_ENCODINGS = {"openai": "o200k_base"}  # gpt-4o and gpt-4o-mini
+CHARS_PER_TOKEN = 4  # Estimate for providers without a local tokenizer, e.g. Gemini
+MESSAGE_OVERHEAD = 4  # Tokens per message for role and framing
+
+Summarizer = Callable[[str, List[dict]], Awaitable[str]]
+SummaryCallback = Callable[[str, int], Awaitable[None]]  # (summary, seq of the last summarized turn)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@lru_cache(maxsize=None)
+def token_counter(provider: str) -> Callable[[str], int]:
+    """A function counting tokens the way `provider` does
+
+    Uses tiktoken when it is installed and has the encoding (it downloads
+    encodings on first use). Otherwise, and for providers without a local
+    tokenizer, it estimates from the length.
+    """
+    encoding_name = TIKTOKEN_ENCODINGS.get(provider)
+    if encoding_name:
+        try:
+            import tiktoken
+            encoding = tiktoken.get_encoding(encoding_name)
+            return lambda text: len(encoding.encode(text, disallowed_special=()))
+        except Exception:
+            pass
+    return estimate_tokens
+
+
+@dataclass
+class Turn:
+    """One message of the conversation"""
+    role: str  # 'user' or 'assistant'
+    content: str  # What the user typed, or the answer shown to them
+    tokens: int
+    tool_refs: List[str] = field(default_factory=list)  # Keys into HistoryManager.tool_outputs
+    seq: int = 0
+    expanded_tokens: int = 0  # Extra tokens while its tool output is expanded into the model input
+
+
+class HistoryManager:
+    """A sliding window of recent turns within `budget` tokens, plus a rolling summary
+
+    - `add_user()` / `add_assistant()` count a turn's tokens once, when it is
+      added. Turns that no longer fit the budget leave the window right
+      away, oldest first, always as whole exchanges.
+    - Turns that left the window are folded into the rolling summary by a
+      background task calling `summarizer(previous_summary, turns)`. A turn
+      never waits for it; it uses whatever summary is ready. If summarizing
+      fails, the turns wait for the next attempt (at most `max_pending`).
+    - Tool outputs are kept out of the turns, in `tool_outputs`, keyed by
+      reference. Only the last `expand_recent` assistant turns carry their
+      tool output into the model input, and count it against the budget.
+      Older ones keep a one-line stub.
+
+    The work per turn is bounded by the window, not by the conversation
+    length. To persist a conversation, save each new turn, pass
+    `on_summary` to save summaries, and `restore()` both on load.
+    """
+
+    def __init__(self, budget: int = 3000, count_tokens: Callable[[str], int] = estimate_tokens,
+                 summarizer: Optional[Summarizer] = None, summary_budget: int = 400,
+                 expand_recent: int = 1, max_pending: int = 200, max_tool_outputs: int = 50,
+                 on_summary: Optional[SummaryCallback] = None):
+        self.budget = budget
+        self.count_tokens = count_tokens
+        self.summarizer = summarizer
+        self.on_summary = on_summary
+        self.summary_budget = summary_budget
+        self.expand_recent = expand_recent
+        self.max_pending = max_pending
+        self.max_tool_outputs = max_tool_outputs
+        self.turns: Deque[Turn] = deque()
+        self.window_tokens = 0
+        self.summary = ""
+        self.summary_tokens = 0
+        self.pending: List[Turn] = []  # Left the window, not yet summarized
+        self.tool_outputs: Dict[str, str] = {}  # ref -> tool output
+        self.sequence = itertools.count()
+        self.task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def restore(self, summary: str, turns: Iterable[dict], tool_outputs: Optional[Dict[str, str]] = None,
+                next_seq: int = 0):
+        """Load a saved conversation: its summary and the turns after it, oldest first
+
+        Turns are dicts with role, content, and optionally tool_refs and seq.
+        Turns that do not fit the window wait for the next summary.
+        """
+        self.summary = summary
+        self.summary_tokens = self.count_tokens(summary) + MESSAGE_OVERHEAD if summary else 0
+        self.tool_outputs.update(tool_outputs or {})
+        for saved in turns:
+            turn = self._add(saved["role"], saved["content"], saved.get("tool_refs", ()), saved.get("seq"))
+            next_seq = max(next_seq, turn.seq + 1)
+        self.sequence = itertools.count(max(next_seq, next(self.sequence)))
+
+    def _add(self, role: str, content: str, tool_refs: Iterable[str] = (), seq: Optional[int] = None) -> Turn:
+        turn = Turn(role=role, content=content, tokens=self.count_tokens(content) + MESSAGE_OVERHEAD,
+                    tool_refs=list(tool_refs), seq=next(self.sequence) if seq is None else seq)
+        if turn.tool_refs:
+            expanded = self.message(turn, expand=True)["content"]
+            if expanded != content:
+                turn.expanded_tokens = self.count_tokens(expanded) + MESSAGE_OVERHEAD - turn.tokens
+        self.turns.append(turn)
+        self.window_tokens += turn.tokens
+        self._trim()
+        return turn
+
+    def add_user(self, content: str) -> Turn:
+        return self._add("user", content)
+
+    def add_assistant(self, content: str, tool_outputs: Optional[Dict[str, str]] = None) -> Turn:
+        """Record an answer; `tool_outputs` (ref -> output) are stored out of band"""
+        for ref, output in (tool_outputs or {}).items():
+            self.tool_outputs[ref] = str(output)
+        while len(self.tool_outputs) > self.max_tool_outputs:
+            del self.tool_outputs[next(iter(self.tool_outputs))]
+        return self._add("assistant", content, (tool_outputs or {}).keys())
+
+    def _trim(self):
+        """Drop the oldest exchanges until the window fits (the newest turn always stays)"""
+        limit = self.budget - min(self.summary_tokens, self.summary_budget)
+        while len(self.turns) > 1 and self.window_tokens + self._expansion_tokens() > limit:
+            self._evict()
+            # Never start the window with an answer whose question is gone
+            while len(self.turns) > 1 and self.turns[0].role == "assistant":
+                self._evict()
+
+    def _evict(self):
+        turn = self.turns.popleft()
+        self.window_tokens -= turn.tokens
+        self.pending.append(turn)
+        if len(self.pending) > self.max_pending:
+            del self.pending[0]
+        self._schedule_summary()
+
+    def _schedule_summary(self):
+        if self.summarizer is None or (self.task is not None and not self.task.done()):
+            return
+        try:
+            self.task = asyncio.get_running_loop().create_task(self._summarize())
+        except RuntimeError:
+            pass  # No running loop; the next turn inside one will schedule it
+
+    async def _summarize(self):
+        while self.pending:
+            batch = list(self.pending)
+            try:
+                summary = await self.summarizer(self.summary, [self.message(turn, expand=False) for turn in batch])
+            except Exception as e:
+                print(f"Debug - History summary failed, will retry: {e}")
+                return
+            del self.pending[:len(batch)]
+            self.summary = summary.strip()
+            self.summary_tokens = self.count_tokens(self.summary) + MESSAGE_OVERHEAD
+            for turn in batch:
+                for ref in turn.tool_refs:
+                    self.tool_outputs.pop(ref, None)
+            if self.on_summary is not None:
+                try:
+                    await self.on_summary(self.summary, batch[-1].seq)
+                except Exception as e:
+                    print(f"Debug - Saving history summary failed: {e}")
+
+    async def wait_for_summary(self):
+        """Wait for a running summary (tests and shutdown; turns do not wait)"""
+        if self.task is not None:
+            await asyncio.gather(self.task, return_exceptions=True)
+
+    def message(self, turn: Turn, expand: bool) -> dict:
+        """A turn as a model input message"""
+        if not turn.tool_refs:
+            return {"role": turn.role, "content": turn.content}
+        outputs = [self.tool_outputs[ref] for ref in turn.tool_refs if ref in self.tool_outputs]
+        if expand and outputs and any(output not in turn.content for output in outputs):
+            content = "\n\n".join(["Tool output:"] + outputs + ["Answer:", turn.content])
+        elif expand or len(turn.content) <= 200:
+            content = turn.content
+        else:
+            content = turn.content[:200] + f"... [tool output {', '.join(turn.tool_refs)} elided]"
+        return {"role": turn.role, "content": content}
+
+    def build_input(self, current: Optional[str] = None) -> List[dict]:
+        """Model input: the summary, the window, and `current` in place of the last user turn
+
+        `current` lets the newest question carry extra instructions (such as
+        "Use get_weather tool for: ...") without storing them in history.
+        """
+        self._schedule_summary()
+        messages = []
+        if self.summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"})
+        expanded = {turn.seq for turn in self._expanded()}
+        for turn in self.turns:
+            messages.append(self.message(turn, expand=turn.seq in expanded))
+        if current is not None and self.turns and self.turns[-1].role == "user":
+            messages[-1] = {"role": "user", "content": current}
+        return messages
+
+    def _expanded(self) -> List[Turn]:
+        """The last `expand_recent` assistant turns, newest first: those whose tool output is expanded"""
+        expanded = []
+        for turn in reversed(self.turns):
+            if len(expanded) >= self.expand_recent:
+                break
+            if turn.role == "assistant":
+                expanded.append(turn)
+        return expanded
+
+    def _expansion_tokens(self) -> int:
+        return sum(turn.expanded_tokens for turn in self._expanded())
+
+    def input_tokens(self) -> int:
+        return self.window_tokens + self._expansion_tokens() + (self.summary_tokens if self.summary else 0)
@@ -0,0 +1,165 @@
+"""
+Intent routing for the support agent
+Matches a query against every tool intent in one regex pass and ranks the candidates
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Intent:
+    """One tool intent and the terms that signal it
+
+    `keywords` match as whole words or phrases, case-insensitively.
+    `patterns` are raw regexes for things words cannot express, such as
+    "15 * 8"; they run against the lowercased query. Each matched term adds its weight to the intent's score.
+    Phrases weigh one point per word, so "latest news" outranks "news".
+    """
+    name: str
+    tool: str
+    instruction: str
+    keywords: Tuple[str, ...] = ()
+    patterns: Tuple[str, ...] = ()
+    pattern_weight: float = 2.0
+
+
+@dataclass
+class IntentMatch:
+    name: str
+    tool: str
+    instruction: str
+    score: float
+    terms: List[str]  # Matched text, in query order
+
+    def augment(self, query: str) -> str:
+        """The query prefixed with the instruction to use this intent's tool"""
+        return f"{self.instruction}: {query}"
+
+
+# Tool intents for the Panaversity support agent, most specific first (ties go to the earlier one)
+TOOL_INTENTS = (
+    Intent("weather", "get_weather", "Use get_weather tool for",
+           keywords=("weather", "temperature", "forecast", "hot", "cold", "rain", "raining", "sunny", "climate",
+                     "degrees", "humidity", "what's it like outside")),
+    Intent("news", "get_news_headlines", "Use get_news_headlines tool for",
+           keywords=("news", "headlines", "latest news", "current events", "breaking news", "today's news",
+                     "what's happening")),
+    Intent("time", "get_current_time", "Use get_current_time tool for",
+           keywords=("time", "current time", "what time", "clock", "date", "today's date", "what day")),
+    Intent("math", "calculate_math", "Use calculate_math tool for",
+           keywords=("calculate", "math", "multiply", "divide", "add", "subtract", "computation", "solve",
+                     "square root", "sum of"),
+           patterns=(r"\d+(?:\.\d+)?\s*[-+*/^%]\s*\(?\s*\d",)),
+    Intent("search", "search_internet", "Use search_internet tool for",
+           keywords=("search", "search for", "find", "look up", "google", "research", "information about",
+                     "tell me about", "universities", "scholarships", "list of")),
+    Intent("currency", "currency_converter", "Use currency_converter tool for",
+           keywords=("currency", "exchange", "exchange rate", "usd", "eur", "gbp", "jpy", "cad", "pkr", "dollar",
+                     "dollars", "euro", "euros", "pound sterling", "convert"),
+           patterns=(r"\b\d+(?:\.\d+)?\s*(?:usd|eur|gbp|jpy|cad|pkr)\s+(?:to|in)\s+(?:usd|eur|gbp|jpy|cad|pkr)\b",)),
+    Intent("password", "password_generator", "Use password_generator tool for",
+           keywords=("password", "generate password", "secure password", "create password", "strong password")),
+    Intent("random", "generate_random_number", "Use generate_random_number tool for",
+           keywords=("random", "random number", "pick a number", "generate number")),
+    Intent("analyze", "text_analyzer", "Use text_analyzer tool for",
+           keywords=("analyze", "text analysis", "word count", "analyze text", "count words")),
+    Intent("unit", "unit_converter", "Use unit_converter tool for",
+           keywords=("unit", "units", "convert", "meters", "feet", "kg", "pounds", "celsius", "fahrenheit",
+                     "miles", "km", "inches", "grams")),
+)
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """A regex matching any of `words`, factored by common prefix (longest match first)"""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A shorter word ends here: the rest is optional, and being greedy the longer word wins
+        return f"(?:{body})?" if "" in node else body
+    return build(trie)
+
+
+def keyword_pattern(keywords: Iterable[str]) -> str:
+    """A regex matching any keyword as a whole word or phrase
+
+    Every alternative starts with a literal character, which lets the
+    regex engine skip ahead to positions that can start a keyword. The
+    leading word boundary is checked just after that character, as
+    "the character before it is not a word character".
+    """
+    by_first: Dict[str, List[str]] = {}
+    for keyword in keywords:
+        by_first.setdefault(keyword[0], []).append(keyword[1:])
+    branches = []
+    for first, rests in sorted(by_first.items()):
+        tail = trie_pattern(rest for rest in rests if rest)
+        if tail and "" in rests:
+            tail = f"(?:{tail})?"
+        branches.append(re.escape(first) + r"(?<!\w.)" + tail)
+    return "(?:" + "|".join(branches) + r")\b"
+
+
+class IntentRouter:
+    """Scores every intent for a query in a single pass of one compiled regex
+
+    All keywords of all intents go into one prefix-factored alternation with
+    word boundaries. Every raw pattern gets its own named group in the same
+    regex. A single `finditer` over the lowercased query finds every term;
+    keyword hits go through a dict to the intents that own them. A keyword
+    listed by two intents (e.g. "convert") scores for both, and the other
+    terms break the tie. Keywords must start and end with a letter or digit.
+    """
+
+    def __init__(self, intents: Sequence[Intent] = TOOL_INTENTS):
+        self.intents = list(intents)
+        self.by_keyword: Dict[str, List[Tuple[int, float]]] = {}  # keyword -> [(intent index, weight)]
+        self.by_group: Dict[str, Tuple[int, float]] = {}
+
+        patterns = []
+        for i, intent in enumerate(self.intents):
+            for keyword in intent.keywords:
+                keyword = " ".join(keyword.lower().split())
+                if not (keyword[:1].isalnum() and keyword[-1:].isalnum()):
+                    raise ValueError(f"Keyword {keyword!r} of intent {intent.name!r} must start and end with a "
+                                     f"letter or digit; use a pattern instead")
+                self.by_keyword.setdefault(keyword, []).append((i, float(len(keyword.split()))))
+            for j, pattern in enumerate(intent.patterns):
+                group = f"p{i}_{j}"
+                self.by_group[group] = (i, intent.pattern_weight)
+                patterns.append(f"(?P<{group}>{pattern})")
+
+        self.regex = re.compile("|".join([f"(?P<keyword>{keyword_pattern(self.by_keyword)})"] + patterns))
+
+    def rank(self, query: str) -> List[IntentMatch]:
+        """Every intent the query signals, best first (ties keep table order)
+
+        Runs of whitespace count as one space, so "latest  news" still matches the phrase.
+        """
+        scores: Dict[int, float] = {}
+        terms: Dict[int, List[str]] = {}
+        by_keyword, by_group = self.by_keyword, self.by_group
+        for found in self.regex.finditer(" ".join(query.lower().split())):
+            text = found.group()
+            group = found.lastgroup
+            for i, weight in by_keyword[text] if group == "keyword" else (by_group[group],):
+                scores[i] = scores.get(i, 0.0) + weight
+                terms.setdefault(i, []).append(text)
+        ranked = sorted(scores, key=lambda i: (-scores[i], i))
+        return [IntentMatch(self.intents[i].name, self.intents[i].tool, self.intents[i].instruction,
+                            scores[i], terms[i]) for i in ranked]
+
+    def route(self, query: str) -> Optional[IntentMatch]:
+        """The best intent for the query, or None when no tool is signalled"""
+        ranked = self.rank(query)
+        return ranked[0] if ranked else None
@@ -0,0 +1,219 @@
+"""
+Model routing for the support agent
+Chooses a provider for every run from live health data and falls back when one fails
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+from openai import APIConnectionError, APIStatusError, RateLimitError
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def is_provider_error(error: Exception) -> bool:
+    """True for failures that say something about the provider rather than the request
+
+    Rate limits, timeouts, connection failures, auth problems and 5xx
+    responses are worth retrying elsewhere. A 400 would fail on any
+    provider, so it is raised as is.
+    """
+    if isinstance(error, (RateLimitError, APIConnectionError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in (401, 403, 408, 409) or error.status_code >= 500
+    return False
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the provider asked us to wait, from a Retry-After header"""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+@dataclass
+class ProviderHealth:
+    """Live health of one provider"""
+    name: str
+    config: Any  # RunConfig
+    priority: int  # Preference tier, lower is preferred; latency orders providers within a tier
+    error_rate: float = 0.0  # EWMA of failures, 0..1
+    latency: Optional[float] = None  # EWMA of successful run time, seconds
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    cooldown: float = 0.0
+    probing: bool = False  # A half-open probe is in flight
+    requests: int = 0
+    failures: int = 0
+    last_error: str = ""
+
+
+class ModelRouter:
+    """Routes each agent run to the healthiest provider, preferring the first one
+
+    Every provider has a circuit breaker:
+
+    - closed: takes traffic. A rate limit opens it at once. Other provider
+      errors open it after `failure_threshold` in a row.
+    - open: skipped until `cooldown` seconds have passed. The cooldown honours
+      Retry-After and doubles on every failed probe, up to `max_cooldown`.
+    - half_open: one request at a time is sent as a probe. Success closes
+      the breaker, so traffic returns to the preferred provider by itself.
+      Failure reopens it.
+
+    Among closed providers, those with an error rate above `degraded_error_rate`
+    go last. The rest go by priority tier, and within a tier by latency
+    (untried providers first). By default every provider gets its own tier in
+    the order added; give several the same `priority` to route by speed.
+    """
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30.0, max_cooldown: float = 600.0,
+                 degraded_error_rate: float = 0.5, alpha: float = 0.2, clock: Callable[[], float] = time.monotonic):
+        self.providers: List[ProviderHealth] = []
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.degraded_error_rate = degraded_error_rate
+        self.alpha = alpha  # EWMA weight of the newest sample
+        self.clock = clock
+
+    def add(self, name: str, config: Any, priority: Optional[int] = None) -> ProviderHealth:
+        health = ProviderHealth(name=name, config=config,
+                                priority=len(self.providers) if priority is None else priority)
+        self.providers.append(health)
+        return health
+
+    @property
+    def preferred(self) -> Optional[ProviderHealth]:
+        return min(self.providers, key=lambda health: health.priority) if self.providers else None
+
+    def get(self, name: str) -> ProviderHealth:
+        return next(health for health in self.providers if health.name == name)
+
+    def candidates(self) -> List[ProviderHealth]:
+        """Providers to try for the next run, best first"""
+        now = self.clock()
+        ranked = []
+        for health in self.providers:
+            if health.state == OPEN and now - health.opened_at >= health.cooldown:
+                health.state = HALF_OPEN
+            if health.state == OPEN or (health.state == HALF_OPEN and health.probing):
+                continue
+            degraded = health.state == CLOSED and health.error_rate > self.degraded_error_rate
+            # A half-open provider is tried before healthy ones with lower preference, so it recovers
+            ranked.append(((degraded, health.priority, health.latency or 0.0), health))
+        return [health for _, health in sorted(ranked, key=lambda entry: entry[0])]
+
+    def plan(self) -> List[ProviderHealth]:
+        """Providers one run should try in order"""
+        if not self.providers:
+            raise RuntimeError("No model provider is configured")
+        # With every circuit open, try the one due back first rather than failing outright
+        return self.candidates() or [min(self.providers, key=lambda h: h.opened_at + h.cooldown)]
+
+    def begin(self, health: ProviderHealth):
+        """Mark a run as started on `health`"""
+        health.requests += 1
+        if health.state == HALF_OPEN:
+            health.probing = True
+
+    def record_success(self, health: ProviderHealth, latency: float):
+        health.error_rate *= 1 - self.alpha
+        health.latency = latency if health.latency is None else (1 - self.alpha) * health.latency + self.alpha * latency
+        health.consecutive_failures = 0
+        health.probing = False
+        if health.state != CLOSED:
+            print(f"Debug - {health.name} recovered, closing its circuit")
+        health.state = CLOSED
+        health.cooldown = 0.0
+
+    def record_failure(self, health: ProviderHealth, error: Exception):
+        health.failures += 1
+        health.error_rate = (1 - self.alpha) * health.error_rate + self.alpha
+        health.consecutive_failures += 1
+        health.last_error = f"{type(error).__name__}: {error}"
+        probe_failed = health.state == HALF_OPEN
+        health.probing = False
+        if probe_failed or isinstance(error, RateLimitError) or health.consecutive_failures >= self.failure_threshold:
+            cooldown = min(self.max_cooldown, health.cooldown * 2 if probe_failed else self.cooldown)
+            health.cooldown = max(cooldown, retry_after(error) or 0.0)
+            health.state = OPEN
+            health.opened_at = self.clock()
+            print(f"Debug - {health.name} circuit open for {health.cooldown:.0f}s ({health.last_error})")
+
+    def release(self, health: ProviderHealth):
+        """End a run that neither succeeded nor failed because of the provider"""
+        health.probing = False
+
+    async def run(self, runner: Callable, *args, **kwargs) -> Tuple[Any, str]:
+        """Call `runner(*args, run_config=..., **kwargs)` on the best provider, falling back on provider errors
+
+        Returns (result, provider name). Raises the last error when every
+        candidate failed, or at once for errors that are not the provider's.
+        """
+        last_error = None
+        for health in self.plan():
+            self.begin(health)
+            started = self.clock()
+            try:
+                result = await runner(*args, run_config=health.config, **kwargs)
+            except Exception as e:
+                if not is_provider_error(e):
+                    self.release(health)
+                    raise
+                self.record_failure(health, e)
+                last_error = e
+                continue
+            self.record_success(health, self.clock() - started)
+            return result, health.name
+        raise last_error
+
+    async def stream(self, runner: Callable, *args, **kwargs) -> AsyncIterator[Tuple[str, Any, Any]]:
+        """Streaming counterpart of `run()` for `Runner.run_streamed`
+
+        Yields (provider name, streaming result, event). A provider error
+        before the model has produced anything falls back to the next
+        provider, as in `run()`. Once model output has reached the caller the
+        answer is partly delivered, so a later error is recorded and raised.
+        """
+        last_error = None
+        for health in self.plan():
+            self.begin(health)
+            started = self.clock()
+            delivered = False
+            try:
+                result = runner(*args, run_config=health.config, **kwargs)
+                async for event in result.stream_events():
+                    # The initial agent_updated event comes before any model call
+                    delivered = delivered or getattr(event, "type", None) != "agent_updated_stream_event"
+                    yield health.name, result, event
+            except Exception as e:
+                if not is_provider_error(e):
+                    self.release(health)
+                    raise
+                self.record_failure(health, e)
+                if delivered:
+                    raise
+                last_error = e
+                continue
+            except BaseException:
+                # Cancelled, or the caller stopped iterating
+                self.release(health)
+                raise
+            self.record_success(health, self.clock() - started)
+            return
+        raise last_error
+
+    def status(self) -> List[dict]:
+        """Health of every provider, for logs and dashboards"""
+        return [{"name": h.name, "state": h.state, "error_rate": round(h.error_rate, 3),
+                 "latency": None if h.latency is None else round(h.latency, 3),
+                 "requests": h.requests, "failures": h.failures} for h in self.providers]
@@ -0,0 +1,299 @@
+"""
+Persistent session store for the support agent
+Saves each chat's turns, rolling summary and tool outputs so any worker can pick a conversation up
+"""
+
+import abc
+import asyncio
+import json
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlparse
+
+DEFAULT_STORE_URL = "sqlite:///sessions.db"
+
+
+class SessionConflict(Exception):
+    """An append would overwrite or skip turns already saved for the session"""
+
+
+@dataclass
+class SessionState:
+    """What a chat needs to continue: the summary and the turns after it"""
+    summary: str = ""
+    summarized_upto: int = -1  # seq of the last turn folded into the summary
+    turns: List[dict] = field(default_factory=list)  # {seq, role, content, tool_refs}, oldest first
+    tool_outputs: Dict[str, str] = field(default_factory=dict)  # ref -> output, for the loaded turns
+    next_seq: int = 0
+
+
+def turn_record(turn: Any) -> dict:
+    """A history turn (or a dict with the same keys) as a stored record"""
+    if isinstance(turn, dict):
+        return {"seq": turn["seq"], "role": turn["role"], "content": turn["content"],
+                "tool_refs": list(turn.get("tool_refs", ()))}
+    return {"seq": turn.seq, "role": turn.role, "content": turn.content, "tool_refs": list(turn.tool_refs)}
+
+
+class SessionStore(abc.ABC):
+    """Interface of a session backend
+
+    Modelled on the Agents SDK `Session` (get_items / add_items), but keyed by
+    session id so one store serves every chat, and aware of the rolling
+    summary. Turns are only ever appended; `load()` reads just the summary and
+    the last `limit` turns after it. An append whose seqs do not continue the
+    saved ones raises `SessionConflict` and writes nothing.
+    """
+
+    @abc.abstractmethod
+    async def load(self, session_id: str, limit: int = 200) -> SessionState:
+        ...
+
+    @abc.abstractmethod
+    async def append(self, session_id: str, turns: Iterable[Any], tool_outputs: Optional[Dict[str, str]] = None):
+        ...
+
+    @abc.abstractmethod
+    async def save_summary(self, session_id: str, summary: str, upto: int):
+        ...
+
+    @abc.abstractmethod
+    async def clear(self, session_id: str):
+        ...
+
+    async def close(self):
+        pass
+
+
+class SQLiteStore(SessionStore):
+    """Sessions in a SQLite database in WAL mode
+
+    WAL lets readers run alongside a writer, so several worker processes can
+    share the file. Queries run in threads on a small pool of connections,
+    keeping the event loop free; `busy_timeout` makes a writer wait for
+    another process's write instead of failing.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS turns (
+            session_id TEXT NOT NULL, seq INTEGER NOT NULL, role TEXT NOT NULL, content TEXT NOT NULL,
+            tool_refs TEXT NOT NULL DEFAULT '[]', PRIMARY KEY (session_id, seq)) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS tool_outputs (
+            session_id TEXT NOT NULL, ref TEXT NOT NULL, output TEXT NOT NULL,
+            PRIMARY KEY (session_id, ref)) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS summaries (
+            session_id TEXT PRIMARY KEY, summary TEXT NOT NULL, upto INTEGER NOT NULL);
+    """
+
+    def __init__(self, path: str = "sessions.db", pool_size: int = 4, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self.connections: List[sqlite3.Connection] = []
+        self.lock = threading.Lock()
+        self.pool_size = pool_size
+        with self.connection() as db:
+            db.executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL; a power cut loses at most the last turns
+        return db
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """A pooled connection; opens a new one while the pool is below its size"""
+        try:
+            db = self.pool.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                grow = len(self.connections) < self.pool_size
+                if grow:
+                    db = self._connect()
+                    self.connections.append(db)
+            if not grow:
+                db = self.pool.get()
+        try:
+            yield db
+        finally:
+            self.pool.put(db)
+
+    def _load(self, session_id: str, limit: int) -> SessionState:
+        with self.connection() as db:
+            row = db.execute("SELECT summary, upto FROM summaries WHERE session_id = ?", (session_id,)).fetchone()
+            summary, upto = row if row else ("", -1)
+            rows = db.execute("SELECT seq, role, content, tool_refs FROM turns WHERE session_id = ? AND seq > ? "
+                              "ORDER BY seq DESC LIMIT ?", (session_id, upto, limit)).fetchall()
+            last = db.execute("SELECT MAX(seq) FROM turns WHERE session_id = ?", (session_id,)).fetchone()[0]
+            turns = [{"seq": seq, "role": role, "content": content, "tool_refs": json.loads(refs)}
+                     for seq, role, content, refs in reversed(rows)]
+            refs = [ref for turn in turns for ref in turn["tool_refs"]]
+            outputs = {}
+            if refs:
+                outputs = dict(db.execute(
+                    f"SELECT ref, output FROM tool_outputs WHERE session_id = ? AND ref IN ({','.join('?' * len(refs))})",
+                    (session_id, *refs)).fetchall())
+        return SessionState(summary, upto, turns, outputs, max(upto, -1 if last is None else last) + 1)
+
+    def _append(self, session_id: str, records: List[dict], tool_outputs: Dict[str, str]):
+        with self.connection() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                # Plain INSERT: a turn already saved under this seq is never replaced
+                db.executemany("INSERT INTO turns VALUES (?, ?, ?, ?, ?)",
+                               [(session_id, r["seq"], r["role"], r["content"], json.dumps(r["tool_refs"]))
+                                for r in records])
+                db.executemany("INSERT OR REPLACE INTO tool_outputs VALUES (?, ?, ?)",
+                               [(session_id, ref, str(output)) for ref, output in tool_outputs.items()])
+                db.execute("COMMIT")
+            except sqlite3.IntegrityError as e:
+                db.execute("ROLLBACK")
+                raise SessionConflict(f"Session {session_id} already has turns {[r['seq'] for r in records]}") from e
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def _save_summary(self, session_id: str, summary: str, upto: int):
+        with self.connection() as db:
+            # Summaries finish in the background; never let an older one replace a newer one
+            db.execute("INSERT INTO summaries VALUES (?, ?, ?) ON CONFLICT(session_id) DO UPDATE SET "
+                       "summary = excluded.summary, upto = excluded.upto WHERE excluded.upto > summaries.upto",
+                       (session_id, summary, upto))
+
+    def _clear(self, session_id: str):
+        with self.connection() as db:
+            db.execute("BEGIN IMMEDIATE")
+            for table in ("turns", "tool_outputs", "summaries"):
+                db.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+            db.execute("COMMIT")
+
+    async def load(self, session_id: str, limit: int = 200) -> SessionState:
+        return await asyncio.to_thread(self._load, session_id, limit)
+
+    async def append(self, session_id: str, turns: Iterable[Any], tool_outputs: Optional[Dict[str, str]] = None):
+        await asyncio.to_thread(self._append, session_id, [turn_record(t) for t in turns], dict(tool_outputs or {}))
+
+    async def save_summary(self, session_id: str, summary: str, upto: int):
+        await asyncio.to_thread(self._save_summary, session_id, summary, upto)
+
+    async def clear(self, session_id: str):
+        await asyncio.to_thread(self._clear, session_id)
+
+    async def close(self):
+        with self.lock:
+            for db in self.connections:
+                db.close()
+            self.connections.clear()
+        self.pool = queue.Queue()
+
+
+class RedisStore(SessionStore):
+    """Sessions in Redis, or any server speaking its protocol (Valkey, KeyDB, ...)
+
+    Each chat has a list of turns, a hash of tool outputs and a hash with the
+    summary. Turns are appended in seq order from 0, so a turn's list index is
+    its seq and `load()` reads only the tail of the list. `client` is a
+    `redis.asyncio.Redis`-compatible client; `from_url()` needs the `redis`
+    package. `ttl` (seconds) expires idle chats.
+    """
+
+    def __init__(self, client, prefix: str = "chat", ttl: Optional[int] = None):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisStore":
+        import redis.asyncio as redis
+        return cls(redis.from_url(url, decode_responses=True), **kwargs)
+
+    def keys(self, session_id: str):
+        base = f"{self.prefix}:{session_id}"
+        return f"{base}:turns", f"{base}:tools", f"{base}:summary"
+
+    async def load(self, session_id: str, limit: int = 200) -> SessionState:
+        turns_key, tools_key, summary_key = self.keys(session_id)
+        async with self.client.pipeline(transaction=False) as pipe:
+            saved, length = await pipe.hgetall(summary_key).llen(turns_key).execute()
+        summary, upto = saved.get("summary", ""), int(saved.get("upto", -1))
+        start = max(upto + 1, length - limit)
+        turns = [json.loads(raw) for raw in await self.client.lrange(turns_key, start, -1)] if start < length else []
+        turns = [turn for turn in turns if turn["seq"] > upto]  # In case a failed append left a gap
+        refs = [ref for turn in turns for ref in turn["tool_refs"]]
+        outputs = {}
+        if refs:
+            outputs = {ref: output for ref, output in zip(refs, await self.client.hmget(tools_key, refs))
+                       if output is not None}
+        return SessionState(summary, upto, turns, outputs, max(upto + 1, length, turns[-1]["seq"] + 1 if turns else 0))
+
+    async def append(self, session_id: str, turns: Iterable[Any], tool_outputs: Optional[Dict[str, str]] = None):
+        turns_key, tools_key, summary_key = self.keys(session_id)
+        from redis.exceptions import WatchError
+        records = [turn_record(turn) for turn in turns]
+        async with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    # The list index must stay the seq: only append right after the last saved turn
+                    await pipe.watch(turns_key)
+                    length = await pipe.llen(turns_key)
+                    if records and records[0]["seq"] != length:
+                        raise SessionConflict(f"Session {session_id} has {length} turns, "
+                                              f"cannot append seq {records[0]['seq']}")
+                    pipe.multi()
+                    if records:
+                        pipe.rpush(turns_key, *(json.dumps(record) for record in records))
+                    if tool_outputs:
+                        pipe.hset(tools_key, mapping={ref: str(output) for ref, output in tool_outputs.items()})
+                    if self.ttl:
+                        for key in (turns_key, tools_key, summary_key):
+                            pipe.expire(key, self.ttl)
+                    await pipe.execute()
+                    return
+                except WatchError:
+                    continue  # Another worker appended meanwhile; check again
+
+    async def save_summary(self, session_id: str, summary: str, upto: int):
+        from redis.exceptions import WatchError
+        summary_key = self.keys(session_id)[2]
+        async with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    # Summaries finish in the background; never let an older one replace a newer one
+                    await pipe.watch(summary_key)
+                    saved = await pipe.hget(summary_key, "upto")
+                    if saved is not None and int(saved) >= upto:
+                        return
+                    pipe.multi()
+                    pipe.hset(summary_key, mapping={"summary": summary, "upto": upto})
+                    if self.ttl:
+                        pipe.expire(summary_key, self.ttl)
+                    await pipe.execute()
+                    return
+                except WatchError:
+                    continue  # Another worker saved a summary meanwhile; check again
+
+    async def clear(self, session_id: str):
+        await self.client.delete(*self.keys(session_id))
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def open_store(url: Optional[str] = None) -> SessionStore:
+    """The store for a URL: sqlite:///path/to/file.db, or redis://host:port/db (rediss:// for TLS)
+
+    Defaults to $SESSION_STORE_URL, then a sessions.db file in the working directory.
+    """
+    url = url or os.getenv("SESSION_STORE_URL") or DEFAULT_STORE_URL
+    scheme = urlparse(url).scheme
+    if scheme == "sqlite":
+        return SQLiteStore(url[len("sqlite:///"):] or "sessions.db")
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisStore.from_url(url)
+    raise ValueError(f"Unsupported session store URL: {url}")
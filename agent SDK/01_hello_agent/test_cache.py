@@ -0,0 +1,142 @@
+"""
+Test the tool-result cache
+Needs no API keys. Run with pytest, or directly: python test_cache.py
+"""
+
+import asyncio
+
+from agents import Agent, RunConfig, Runner, function_tool
+
+from cache import TTLCache, Uncached, cached, currency_code
+from test_tool_calls import ScriptedModel
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_and_normalized_keys():
+    """Equivalent arguments share an entry until it expires; failures are not kept"""
+    clock = Clock()
+    cache = TTLCache(clock=clock)
+    calls = []
+
+    @cached(ttl=600, normalizers={"base": currency_code}, cache=cache)
+    async def rates(base: str, amount: float = 1.0) -> str:
+        calls.append(base)
+        return f"rates for {currency_code(base)}"
+
+    @cached(ttl=60, cache_if=lambda result: not result.startswith("Error"), cache=cache)
+    async def flaky(city: str) -> str:
+        calls.append(city)
+        return "Error: down"
+
+    async def main():
+        assert await rates("usd") == "rates for USD"
+        for same in (" USD ", "Dollars", "$"):
+            assert await rates(same, amount=1) == "rates for USD"
+        assert calls == ["usd"]
+        await rates("eur")
+        clock.now = 601
+        await rates("USD")
+        assert calls == ["usd", "eur", "USD"]
+
+        await flaky("London")
+        await flaky("london")
+        assert calls[-2:] == ["London", "london"]
+
+    asyncio.run(main())
+    assert cache.stats()["hits"] == 3
+
+
+def test_lru_eviction_under_memory_cap():
+    """The least recently used entries go first once the cap is reached"""
+    cache = TTLCache(max_bytes=3 * (100 + 64))
+    for key in "abc":
+        cache.set(key, key * 100, ttl=60)
+    cache.get("a")
+    cache.set("d", "d" * 100, ttl=60)
+    assert list(cache.entries) == ["c", "a", "d"] and cache.size <= cache.max_bytes
+    cache.set("huge", "x" * 10_000, ttl=60)
+    assert "huge" not in cache.entries and len(cache) == 3
+
+
+def test_concurrent_requests_share_one_call():
+    """Identical requests in flight wait for the first; a cancelled caller does not cancel it"""
+    cache = TTLCache()
+    started = []
+
+    @cached(ttl=300, cache=cache)
+    async def headlines(country: str) -> str:
+        started.append(country)
+        await asyncio.sleep(0.1)
+        return f"Headlines for {country}"
+
+    async def main():
+        first = asyncio.ensure_future(headlines("us"))
+        await asyncio.sleep(0)
+        first.cancel()
+        results = await asyncio.gather(*(headlines(" US") for _ in range(9)), headlines("uk"))
+        assert first.cancelled()
+        assert results == ["Headlines for us"] * 9 + ["Headlines for uk"]
+        assert started == ["us", "uk"]
+        assert await headlines("Us") == "Headlines for us"
+
+    asyncio.run(main())
+    assert cache.stats()["coalesced"] == 9 and not cache.inflight
+
+
+def test_wraps_function_tool():
+    """Above @function_tool, repeated calls from the model reuse the result"""
+    cache = TTLCache()
+    calls = []
+
+    @cached(ttl=600, cache=cache)
+    @function_tool
+    async def get_weather(city: str) -> str:
+        """Get the weather for a city."""
+        calls.append(city)
+        return f"Weather in {city}: 15°C"
+
+    assert get_weather.name == "get_weather" and "city" in get_weather.params_json_schema["properties"]
+    agent = Agent(name="support", instructions="Use tools.", tools=[get_weather])
+    for city in ("London", " london"):
+        model = ScriptedModel([[("get_weather", '{"city": "%s"}' % city)], "done"])
+        asyncio.run(Runner.run(agent, "Weather?", run_config=RunConfig(model=model, tracing_disabled=True)))
+    assert calls == ["London"] and cache.stats()["hits"] == 1
+
+
+def test_fallback_output_is_not_cached():
+    """A tool returns Uncached text after an upstream failure; the next call tries again"""
+    cache = TTLCache()
+    upstream = ["down", "up", "up"]
+    outputs = []
+
+    @cached(ttl=300, cache=cache)
+    @function_tool
+    async def get_news_headlines() -> str:
+        """Get the latest headlines."""
+        if upstream.pop(0) == "down":
+            outputs.append(Uncached("Latest Headlines: (Demo data - News API unavailable)"))
+        else:
+            outputs.append("Latest Headlines: 1) Live")
+        return outputs[-1]
+
+    agent = Agent(name="support", instructions="Use tools.", tools=[get_news_headlines])
+    for expected_entries in (0, 1, 1):
+        model = ScriptedModel([[("get_news_headlines", "{}")], "done"])
+        asyncio.run(Runner.run(agent, "News?", run_config=RunConfig(model=model, tracing_disabled=True)))
+        assert len(cache) == expected_entries
+    assert isinstance(outputs[0], Uncached) and outputs[1] == "Latest Headlines: 1) Live"
+    assert upstream == ["up"] and cache.stats()["hits"] == 1
+
+
+if __name__ == "__main__":
+    for test in (test_ttl_and_normalized_keys, test_lru_eviction_under_memory_cap,
+                 test_concurrent_requests_share_one_call, test_wraps_function_tool, test_fallback_output_is_not_cached):
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,93 @@
+"""
+Test the pooled HTTP client used by the tools
+Runs against a local server, no API keys needed. Run with pytest, or directly: python test_clients.py
+"""
+
+import asyncio
+import time
+
+from clients import get_http_client, get_openai_client, close_clients, create_http_client
+
+DELAY = 0.2  # Seconds the local server takes per request
+BODY = b'{"ok": true}'
+
+
+async def slow_server():
+    """A keep-alive HTTP server that answers every request after DELAY; returns (server, url, stats)"""
+    stats = {"connections": 0, "requests": 0}
+
+    async def serve(reader, writer):
+        stats["connections"] += 1
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                stats["requests"] += 1
+                await asyncio.sleep(DELAY)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n\r\n%s" % (len(BODY), BODY))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/weather", stats
+
+
+def test_concurrent_requests_overlap_and_reuse_connections():
+    """Ten concurrent tool calls take about one request's time, and later calls reuse the pool"""
+    async def run():
+        server, url, stats = await slow_server()
+        client = get_http_client()
+        assert get_http_client() is client
+
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(client.get(url) for _ in range(10)))
+        elapsed = time.perf_counter() - started
+        assert all(response.json() == {"ok": True} for response in responses)
+        assert elapsed < DELAY * 4, f"requests were serialized ({elapsed:.2f}s)"
+
+        await asyncio.gather(*(client.get(url) for _ in range(10)))
+        assert stats["requests"] == 20 and stats["connections"] == 10
+
+        await close_clients()
+        assert client.is_closed and get_http_client() is not client
+        await close_clients()
+        server.close()
+    asyncio.run(run())
+
+
+def test_per_host_limit():
+    """No more than `per_host` requests to one host are in flight at once"""
+    async def run():
+        server, url, _ = await slow_server()
+        client = create_http_client(per_host=2)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client.get(url) for _ in range(6)))
+        elapsed = time.perf_counter() - started
+        assert DELAY * 3 <= elapsed < DELAY * 5, f"{elapsed:.2f}s"
+        await client.aclose()
+        server.close()
+    asyncio.run(run())
+
+
+def test_openai_client_registry():
+    """Provider configs and tools asking for the same key and endpoint share one client until shutdown"""
+    gemini = get_openai_client("key", "https://generativelanguage.googleapis.com/v1beta/openai/")
+    assert get_openai_client("key", "https://generativelanguage.googleapis.com/v1beta/openai/") is gemini
+    openai = get_openai_client("key")
+    assert openai is not gemini and get_openai_client(api_key="key") is openai
+
+    asyncio.run(close_clients())
+    assert gemini.is_closed() and openai.is_closed()
+    assert get_openai_client("key") is not openai
+
+
+if __name__ == "__main__":
+    for test in (test_concurrent_requests_overlap_and_reuse_connections, test_per_host_limit,
+                 test_openai_client_registry):
+        test()
+        print(f"✓ {test.__name__}")
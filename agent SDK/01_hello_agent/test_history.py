@@ -0,0 +1,138 @@
+"""
+Test the token-budgeted conversation history
+Needs no API keys. Run with pytest, or directly: python test_history.py
+"""
+
+import asyncio
+import time
+
+from history import MESSAGE_OVERHEAD, HistoryManager, estimate_tokens, token_counter
+
+
+def words(n: int) -> str:
+    return " ".join(["word"] * n)  # 5 characters per word, so ~n * 1.25 tokens
+
+
+def test_window_stays_within_budget():
+    """Old exchanges leave the window whole, and the newest turn always stays"""
+    history = HistoryManager(budget=200)
+    for i in range(20):
+        history.add_user(f"question {i} " + words(30))
+        history.add_assistant(f"answer {i} " + words(30))
+        assert history.input_tokens() <= 200
+        assert history.turns[0].role == "user"
+    assert [m["content"].split()[:2] for m in history.build_input()][-2:] == [["question", "19"], ["answer", "19"]]
+    assert len(history.pending) == 40 - len(history)
+
+    huge = HistoryManager(budget=50)
+    huge.add_user(words(500))
+    assert len(huge) == 1 and huge.input_tokens() > 50
+
+
+def test_augmented_prompt_is_not_stored():
+    """The tool instruction goes to this turn's input only"""
+    history = HistoryManager()
+    history.add_user("What's the weather in London?")
+    messages = history.build_input(current="Use get_weather tool for: What's the weather in London?")
+    assert messages == [{"role": "user", "content": "Use get_weather tool for: What's the weather in London?"}]
+    history.add_assistant("Weather in London: 15°C", {"call0": "Weather in London: 15°C"})
+    history.add_user("And in Paris?")
+    assert [m["content"] for m in history.build_input()] == [
+        "What's the weather in London?", "Weather in London: 15°C", "And in Paris?"]
+
+
+def test_tool_outputs_are_stored_by_reference():
+    """Only the latest answer carries its tool output; older ones keep a stub"""
+    history = HistoryManager(budget=10_000)
+    results = "Search results: " + words(100)
+    history.add_user("Universities in Italy")
+    history.add_assistant("Italy has great universities. " + words(60), {"call1": results})
+    assert history.build_input()[-1]["content"].startswith("Tool output:\n\n" + results)
+    assert history.turns[-1].tokens < estimate_tokens(results)
+
+    history.add_user("Thanks")
+    history.add_assistant("You're welcome!")
+    older = history.build_input()[1]["content"]
+    assert results not in older and older.endswith("[tool output call1 elided]")
+    assert history.tool_outputs == {"call1": results}
+
+
+def test_summary_runs_in_the_background():
+    """Turns never wait for the summarizer; the next turn uses the summary once ready"""
+    calls = []
+
+    async def summarize(summary, turns):
+        calls.append([turn["content"].split()[:2] for turn in turns])
+        await asyncio.sleep(0.2)
+        return f"{summary} +{len(turns)}".strip()
+
+    async def chat():
+        history = HistoryManager(budget=100, summarizer=summarize)
+        for i in range(3):
+            history.add_user(f"question {i} " + words(30))
+            history.add_assistant(f"answer {i} " + words(30))
+        started = time.perf_counter()
+        messages = history.build_input()
+        assert time.perf_counter() - started < 0.05
+        assert messages[0]["role"] == "user"  # The summary is not ready yet
+
+        await history.wait_for_summary()
+        assert history.summary and not history.pending
+        assert history.build_input()[0]["content"].startswith("Summary of the earlier conversation:")
+        assert history.input_tokens() <= 100
+        return history
+
+    history = asyncio.run(chat())
+    assert calls[0][0] == ["question", "0"]
+    assert sum(len(batch) for batch in calls) == 6 - len(history)
+
+
+def test_failed_summary_keeps_turns():
+    """A summarizer error leaves the turns pending for the next attempt"""
+    async def summarize(summary, turns):
+        raise RuntimeError("provider down")
+
+    async def chat():
+        history = HistoryManager(budget=30, summarizer=summarize)
+        history.add_user(words(20))
+        history.add_assistant(words(20))
+        history.add_user("next")
+        await history.wait_for_summary()
+        return history
+
+    history = asyncio.run(chat())
+    assert history.summary == "" and len(history.pending) == 2
+
+
+def test_token_counter():
+    """Providers without a local tokenizer use the length estimate"""
+    assert token_counter("gemini") is estimate_tokens
+    assert token_counter("gemini")("abcdefgh") == 2
+    count = token_counter("openai")  # tiktoken when installed and its encoding loads
+    assert 1 <= count("hello world") <= 3
+
+
+def test_expanded_tool_output_counts_against_the_budget():
+    """The newest answer's tool output is part of the input, so it is budgeted too"""
+    history = HistoryManager(budget=300)
+    results = "Search results: " + words(150)
+    history.add_user("Universities in Italy")
+    history.add_assistant("Italy has great universities.", {"call1": results})
+    expanded = sum(estimate_tokens(m["content"]) + MESSAGE_OVERHEAD for m in history.build_input())
+    assert history.input_tokens() == expanded > estimate_tokens(results)
+
+    for i in range(10):
+        history.add_user(f"question {i} " + words(20))
+        history.add_assistant(f"answer {i}", {f"call{i + 2}": results} if i == 9 else None)
+        model_input = history.build_input()
+        assert history.input_tokens() == sum(estimate_tokens(m["content"]) + MESSAGE_OVERHEAD for m in model_input)
+        assert history.input_tokens() <= 300
+    assert results in model_input[-1]["content"]
+
+
+if __name__ == "__main__":
+    for test in (test_window_stays_within_budget, test_augmented_prompt_is_not_stored,
+                 test_tool_outputs_are_stored_by_reference, test_summary_runs_in_the_background,
+                 test_failed_summary_keeps_turns, test_token_counter, test_expanded_tool_output_counts_against_the_budget):
+        test()
+        print(f"✓ {test.__name__}")
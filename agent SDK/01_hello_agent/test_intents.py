@@ -0,0 +1,78 @@
+"""
+Test the compiled intent router
+Needs no API keys. Run with pytest, or directly: python test_intents.py
+"""
+
+from bench_intents import legacy_should_force_tool_usage
+from intents import Intent, IntentRouter
+
+router = IntentRouter()
+
+
+def test_routes_tool_queries():
+    """Each tool's typical queries go to that tool"""
+    cases = {
+        "What's the weather in London?": "weather",
+        "What's the latest news?": "news",
+        "What time is it?": "time",
+        "Calculate 15 * 8": "math",
+        "What's 3.14159 * 25?": "math",
+        "Search for Python tutorials": "search",
+        "Convert 100 USD to EUR": "currency",
+        "Convert 100 meters to feet": "unit",
+        "Create a strong password": "password",
+        "Give me a random number between 1 and 100": "random",
+        "Analyze this text: the quick brown fox": "analyze",
+    }
+    for query, intent in cases.items():
+        assert router.route(query).name == intent, (query, router.rank(query))
+
+
+def test_no_substring_misfires():
+    """Words inside other words and stray punctuation no longer trigger tools"""
+    for query in ("Hello, how are you?", "I need to update my address now",
+                  "Can you give me some well-known tips for a cover letter?",
+                  "Explain how photosynthesis works in plants"):
+        assert router.rank(query) == [], (query, router.rank(query))
+    # The old scans matched a bare "-" and "now"/"date" inside other words
+    assert legacy_should_force_tool_usage("Tips for a one-page cover letter")[1] == "math"
+    assert legacy_should_force_tool_usage("Some well-known tips")[1] == "time"
+    assert legacy_should_force_tool_usage("Please update my address")[1] == "time"
+
+
+def test_ranking_and_shared_keywords():
+    """All intents are scored; a shared keyword counts for both and the rest decides"""
+    ranked = router.rank("Convert 100 USD to EUR")
+    assert [match.name for match in ranked] == ["currency", "unit"]
+    assert ranked[0].score > ranked[1].score and ranked[1].terms == ["convert"]
+
+    ranked = router.rank("What's the weather and the latest news today?")
+    assert {match.name for match in ranked} == {"weather", "news"}
+    assert ranked[0].name == "news" and ranked[0].terms == ["latest news"]
+    assert ranked[0].augment("q") == "Use get_news_headlines tool for: q"
+
+    for spaced in ("latest  news", "Latest\tnews", " latest\n news "):
+        ranked = router.rank(spaced)
+        assert ranked[0].terms == ["latest news"] and ranked[0].score == 2.0, (spaced, ranked)
+
+
+def test_custom_table():
+    """Any declarative table compiles; keywords must be word-bounded"""
+    food = IntentRouter([
+        Intent("deals", "find_deals", "Find deals for", keywords=("deal", "discount", "late night")),
+        Intent("cuisine", "search_by_cuisine", "Search by cuisine for", keywords=("pizza", "bbq", "fast food")),
+    ])
+    assert [match.name for match in food.rank("Late night pizza deal?")] == ["deals", "cuisine"]
+    assert food.route("Pizzas near me") is None
+    try:
+        IntentRouter([Intent("math", "calculate_math", "Use", keywords=("+",))])
+        assert False, "a keyword that cannot take word boundaries should be rejected"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    for test in (test_routes_tool_queries, test_no_substring_misfires, test_ranking_and_shared_keywords,
+                 test_custom_table):
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,174 @@
+"""
+Test the model router's health tracking and circuit breakers
+Needs no API keys. Run with pytest, or directly: python test_router.py
+"""
+
+import asyncio
+
+import httpx
+from openai import APIConnectionError, BadRequestError, RateLimitError
+
+from router import ModelRouter, CLOSED, OPEN, HALF_OPEN
+
+REQUEST = httpx.Request("POST", "https://example.invalid/v1/chat/completions")
+
+
+def rate_limited(retry_after: str = None) -> RateLimitError:
+    headers = {"retry-after": retry_after} if retry_after else {}
+    return RateLimitError("429 RESOURCE_EXHAUSTED", response=httpx.Response(429, headers=headers, request=REQUEST), body=None)
+
+
+def make_router():
+    now = [0.0]
+    router = ModelRouter(failure_threshold=2, cooldown=30, clock=lambda: now[0])
+    router.add("gemini", "gemini-config")
+    router.add("openai", "openai-config")
+    return router, now
+
+
+def scripted(outcomes: dict):
+    """A runner whose result per config comes from `outcomes` (an exception is raised)"""
+    calls = []
+
+    async def runner(prompt, run_config):
+        calls.append(run_config)
+        outcome = outcomes[run_config]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return f"{outcome}: {prompt}"
+    return runner, calls
+
+
+def test_rate_limit_fails_over_and_recovers():
+    """A 429 opens the preferred circuit; after the cooldown one probe brings traffic back"""
+    router, now = make_router()
+    outcomes = {"gemini-config": rate_limited(), "openai-config": "openai"}
+    runner, calls = scripted(outcomes)
+
+    result, used = asyncio.run(router.run(runner, "hi"))
+    assert (result, used) == ("openai: hi", "openai")
+    assert router.get("gemini").state == OPEN
+
+    # While open, gemini is not even tried
+    calls.clear()
+    assert asyncio.run(router.run(runner, "again"))[1] == "openai"
+    assert calls == ["openai-config"]
+
+    # Cooldown over but gemini still limited: the probe fails and the cooldown doubles
+    now[0] = 31
+    assert router.candidates()[0].state == HALF_OPEN
+    assert asyncio.run(router.run(runner, "probe"))[1] == "openai"
+    assert router.get("gemini").state == OPEN and router.get("gemini").cooldown == 60
+
+    # Gemini recovers: the next probe succeeds and closes the circuit
+    outcomes["gemini-config"] = "gemini"
+    now[0] = 95
+    assert asyncio.run(router.run(runner, "probe"))[1] == "gemini"
+    assert router.get("gemini").state == CLOSED
+    assert asyncio.run(router.run(runner, "next"))[1] == "gemini"
+
+
+def test_threshold_retry_after_and_request_errors():
+    """Connection errors open after the threshold, Retry-After stretches the cooldown, 400s are not the provider's fault"""
+    router, now = make_router()
+    outcomes = {"gemini-config": APIConnectionError(request=REQUEST), "openai-config": "openai"}
+    runner, _ = scripted(outcomes)
+
+    asyncio.run(router.run(runner, "one"))
+    gemini = router.get("gemini")
+    assert gemini.state == CLOSED and gemini.consecutive_failures == 1 and gemini.error_rate > 0
+    asyncio.run(router.run(runner, "two"))
+    assert gemini.state == OPEN
+
+    router, now = make_router()
+    runner, _ = scripted({"gemini-config": rate_limited("120"), "openai-config": "openai"})
+    asyncio.run(router.run(runner, "hi"))
+    assert router.get("gemini").cooldown == 120
+
+    router, now = make_router()
+    bad_request = BadRequestError("bad tool schema", response=httpx.Response(400, request=REQUEST), body=None)
+    runner, calls = scripted({"gemini-config": bad_request, "openai-config": "openai"})
+    try:
+        asyncio.run(router.run(runner, "hi"))
+        assert False, "a 400 should not fall back"
+    except BadRequestError:
+        pass
+    assert calls == ["gemini-config"] and router.get("gemini").failures == 0
+
+
+def test_single_probe_and_all_open():
+    """Only one request probes a half-open provider; with everything open the soonest one is tried"""
+    router, now = make_router()
+    for health in router.providers:
+        router.record_failure(health, rate_limited())
+    router.get("openai").cooldown = 10
+    runner, calls = scripted({"gemini-config": "gemini", "openai-config": "openai"})
+    assert router.candidates() == []
+    assert asyncio.run(router.run(runner, "hi"))[1] == "openai"
+
+    router, now = make_router()
+    router.record_failure(router.get("gemini"), rate_limited())
+    now[0] = 30
+    probe = router.candidates()[0]
+    router.begin(probe)
+    assert [h.name for h in router.candidates()] == ["openai"]
+    router.record_success(probe, 0.5)
+    assert [h.name for h in router.candidates()] == ["gemini", "openai"]
+
+
+class ScriptedStream:
+    """Stands in for RunResultStreaming: yields `events`, then raises `error` if given"""
+
+    def __init__(self, events, error=None):
+        self.events, self.error = events, error
+
+    async def stream_events(self):
+        for event in self.events:
+            yield event
+        if self.error:
+            raise self.error
+
+
+def test_stream_falls_back_only_before_first_event():
+    """A stream that fails up front moves to the next provider; one that fails midway is raised"""
+    router, now = make_router()
+    streams = {"gemini-config": ScriptedStream([], rate_limited()), "openai-config": ScriptedStream(["a", "b"])}
+
+    async def collect():
+        return [(name, event) async for name, _, event in
+                router.stream(lambda prompt, run_config: streams[run_config], "hi")]
+    assert asyncio.run(collect()) == [("openai", "a"), ("openai", "b")]
+    assert router.get("gemini").state == OPEN and router.get("openai").latency is not None
+
+    streams["openai-config"] = ScriptedStream(["a"], APIConnectionError(request=REQUEST))
+    try:
+        asyncio.run(collect())
+        assert False, "a stream that already delivered text should not restart elsewhere"
+    except APIConnectionError:
+        pass
+    assert router.get("openai").failures == 1
+
+
+def test_latency_orders_providers_within_a_tier():
+    """Providers sharing a priority go fastest first; a lower tier still wins"""
+    router = ModelRouter(clock=lambda: 0.0)
+    router.add("gemini", "gemini-config", priority=0)
+    router.add("openai", "openai-config", priority=0)
+    router.add("backup", "backup-config", priority=1)
+    router.record_success(router.get("gemini"), 2.0)
+    router.record_success(router.get("openai"), 0.5)
+    router.record_success(router.get("backup"), 0.1)
+    assert [health.name for health in router.candidates()] == ["openai", "gemini", "backup"]
+
+    for _ in range(10):
+        router.record_success(router.get("openai"), 4.0)
+    assert [health.name for health in router.candidates()] == ["gemini", "openai", "backup"]
+    assert router.preferred.name == "gemini"
+
+
+if __name__ == "__main__":
+    for test in (test_rate_limit_fails_over_and_recovers, test_threshold_retry_after_and_request_errors,
+                 test_single_probe_and_all_open, test_stream_falls_back_only_before_first_event,
+                 test_latency_orders_providers_within_a_tier):
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,156 @@
+"""
+Test the persistent session stores
+SQLite runs on a temporary file; Redis runs on fakeredis, a local stand-in for the server.
+Needs no API keys. Run with pytest, or directly: python test_store.py
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+from history import HistoryManager
+from store import RedisStore, SQLiteStore, SessionConflict, SessionStore, open_store
+
+
+def words(n: int) -> str:
+    return " ".join(["word"] * n)
+
+
+async def chat(store: SessionStore, session_id: str, history: HistoryManager, question: str, answer: str,
+               tool_outputs=None):
+    """One turn the way hello.py saves it: both messages appended together"""
+    user_turn = history.add_user(question)
+    assistant_turn = history.add_assistant(answer, tool_outputs)
+    await store.append(session_id, [user_turn, assistant_turn], tool_outputs)
+
+
+async def roundtrip(store: SessionStore):
+    """A chat survives a restart, and a second chat in the same store stays apart"""
+    first = HistoryManager()
+    await chat(store, "a", first, "Weather in London?", "Weather in London: 15°C", {"call0": "Weather in London: 15°C"})
+    await chat(store, "a", first, "And Paris?", "Weather in Paris: 18°C")
+    await chat(store, "b", HistoryManager(), "Hello", "Hi!")
+
+    state = await store.load("a")
+    assert [(t["seq"], t["role"], t["content"]) for t in state.turns] == [
+        (0, "user", "Weather in London?"), (1, "assistant", "Weather in London: 15°C"),
+        (2, "user", "And Paris?"), (3, "assistant", "Weather in Paris: 18°C")]
+    assert state.turns[1]["tool_refs"] == ["call0"] and state.tool_outputs == {"call0": "Weather in London: 15°C"}
+    assert state.next_seq == 4 and state.summary == ""
+
+    restored = HistoryManager()
+    restored.restore(state.summary, state.turns, state.tool_outputs, state.next_seq)
+    assert restored.build_input() == first.build_input()
+    assert restored.add_user("Thanks").seq == 4
+
+    assert [t["content"] for t in (await store.load("b")).turns] == ["Hello", "Hi!"]
+    assert (await store.load("new")).turns == []
+    await store.clear("a")
+    assert (await store.load("a")).next_seq == 0
+
+
+async def summary_and_lazy_load(store: SessionStore):
+    """Loading reads the summary and only the turns after it; older summaries never win"""
+    async def summarize(summary, turns):
+        return f"{summary} +{len(turns)}".strip()
+
+    async def save_summary(summary, upto):
+        await store.save_summary("long", summary, upto)
+
+    history = HistoryManager(budget=100, summarizer=summarize, on_summary=save_summary)
+    for i in range(10):
+        await chat(store, "long", history, f"question {i} " + words(30), f"answer {i} " + words(30))
+    await history.wait_for_summary()
+
+    state = await store.load("long")
+    assert state.summary == history.summary and state.summarized_upto >= 0
+    assert [t["seq"] for t in state.turns] == list(range(state.summarized_upto + 1, 20))
+    assert state.next_seq == 20
+
+    await store.save_summary("long", "stale", 0)
+    assert (await store.load("long")).summary == history.summary
+
+    tail = await store.load("long", limit=2)
+    assert [t["content"].split()[:2] for t in tail.turns] == [["question", "9"], ["answer", "9"]]
+
+
+async def append_after_failed_load(store: SessionStore):
+    """A chat that could not load its history cannot overwrite the saved turns"""
+    await chat(store, "saved", HistoryManager(), "Weather in London?", "Weather in London: 15°C")
+    fresh = HistoryManager()  # What a failed load leaves: seqs start again at 0
+    try:
+        await chat(store, "saved", fresh, "Hello again", "Hi!")
+        assert False, "an append reusing saved seqs should be refused"
+    except SessionConflict:
+        pass
+    state = await store.load("saved")
+    assert [t["content"] for t in state.turns] == ["Weather in London?", "Weather in London: 15°C"]
+
+    restored = HistoryManager()
+    restored.restore(state.summary, state.turns, state.tool_outputs, state.next_seq)
+    await chat(store, "saved", restored, "Hello again", "Hi!")
+    assert [t["seq"] for t in (await store.load("saved")).turns] == [0, 1, 2, 3]
+
+
+def test_sqlite_store():
+    async def main(path):
+        store = SQLiteStore(path, pool_size=2)
+        await roundtrip(store)
+        await summary_and_lazy_load(store)
+        await append_after_failed_load(store)
+        # Concurrent turns share the pool without blocking the event loop
+        await asyncio.gather(*(store.append(f"s{i}", [{"seq": 0, "role": "user", "content": "hi"}])
+                               for i in range(20)))
+        assert len(store.connections) <= 2
+        await store.close()
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "sessions.db")
+        asyncio.run(main(path))
+        assert sqlite3.connect(path).execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        reopened = open_store(f"sqlite:///{path}")
+        assert isinstance(reopened, SQLiteStore)
+        assert len(asyncio.run(reopened.load("s3")).turns) == 1
+
+
+def test_redis_store():
+    try:
+        from fakeredis import FakeServer
+        from fakeredis.aioredis import FakeRedis
+    except ImportError:
+        print("fakeredis not installed, skipping the Redis store test")
+        return
+
+    async def main():
+        server = FakeServer()  # Shared like a real server: a second client sees the same data
+        store = RedisStore(FakeRedis(server=server, decode_responses=True), prefix="test")
+        await roundtrip(store)
+        await summary_and_lazy_load(store)
+        await append_after_failed_load(store)
+        other_worker = RedisStore(FakeRedis(server=server, decode_responses=True), prefix="test")
+        assert (await other_worker.load("long")).next_seq == 20
+        await store.close()
+        await other_worker.close()
+
+    asyncio.run(main())
+
+
+def test_store_interface_is_abstract():
+    """A backend missing part of the interface fails when created, not on first use"""
+    class LoadOnly(SessionStore):
+        async def load(self, session_id, limit=200):
+            return await super().load(session_id, limit)
+
+    for store_class in (SessionStore, LoadOnly):
+        try:
+            store_class()
+            assert False, f"{store_class.__name__} should not be instantiable"
+        except TypeError:
+            pass
+
+
+if __name__ == "__main__":
+    for test in (test_sqlite_store, test_redis_store, test_store_interface_is_abstract):
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,92 @@
+"""
+Test tool-call capture and direct tool answers
+Runs a real agent loop on a scripted model, no API keys needed.
+Run with pytest, or directly: python test_tool_calls.py
+"""
+
+import asyncio
+
+from agents import Agent, Runner, RunConfig, Usage, function_tool
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from openai.types.responses import ResponseFunctionToolCall, ResponseOutputMessage, ResponseOutputText
+
+from tool_calls import ToolCallRecorder, answer_with_tool_output
+
+
+class ScriptedModel(Model):
+    """A model that replies with the next scripted turn: a list of (tool, arguments) calls, or text"""
+
+    def __init__(self, turns):
+        self.turns = list(turns)
+
+    async def get_response(self, *args, **kwargs) -> ModelResponse:
+        turn = self.turns.pop(0)
+        if isinstance(turn, str):
+            output = [ResponseOutputMessage(id="msg", type="message", role="assistant", status="completed",
+                                            content=[ResponseOutputText(type="output_text", text=turn, annotations=[])])]
+        else:
+            output = [ResponseFunctionToolCall(type="function_call", id=f"fc{i}", call_id=f"call{i}", name=name,
+                                               arguments=arguments) for i, (name, arguments) in enumerate(turn)]
+        return ModelResponse(output=output, usage=Usage(), response_id=None)
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+@function_tool
+async def get_weather(city: str) -> str:
+    """Get the weather for a city."""
+    await asyncio.sleep(0.05)
+    return f"Weather in {city}: 15°C"
+
+
+@function_tool
+def get_news_headlines() -> str:
+    """Get the latest headlines."""
+    return "Latest Headlines: 1) Tests pass"
+
+
+@function_tool
+def search_internet(query: str) -> str:
+    """Search the internet."""
+    return f"Search results for '{query}': lots"
+
+
+def run(turns, question: str):
+    agent = Agent(name="support", instructions="Use tools.", tools=[get_weather, get_news_headlines, search_internet],
+                  tool_use_behavior=answer_with_tool_output(["get_weather", "get_news_headlines"]))
+    model = ScriptedModel(turns)
+    recorder = ToolCallRecorder()
+    result = asyncio.run(Runner.run(agent, question, hooks=recorder,
+                                    run_config=RunConfig(model=model, tracing_disabled=True)))
+    return result, recorder.complete(result.new_items), model
+
+
+def test_direct_tools_answer_without_another_turn():
+    """Parallel direct tools become the answer in call order, with typed records"""
+    result, records, model = run([[("get_weather", '{"city": "London"}'), ("get_news_headlines", "{}")],
+                                  "should not be reached"], "Weather in London and the news?")
+    assert result.final_output == "Weather in London: 15°C\n\nLatest Headlines: 1) Tests pass"
+    assert model.turns == ["should not be reached"]
+
+    assert [(r.call_id, r.tool, r.arguments) for r in records] == [
+        ("call0", "get_weather", {"city": "London"}), ("call1", "get_news_headlines", {})]
+    assert records[0].output == "Weather in London: 15°C"
+    assert records[0].latency >= 0.05 and records[1].finished
+
+
+def test_other_tools_go_back_to_the_model():
+    """A turn with a summarized tool runs the model again, and the call is still recorded"""
+    result, records, model = run([[("search_internet", '{"query": "Italy"}')], "Italy has great universities."],
+                                 "Universities in Italy")
+    assert result.final_output == "Italy has great universities."
+    assert not model.turns
+    assert [(r.tool, r.arguments, r.output) for r in records] == [
+        ("search_internet", {"query": "Italy"}, "Search results for 'Italy': lots")]
+
+
+if __name__ == "__main__":
+    for test in (test_direct_tools_answer_without_another_turn, test_other_tools_go_back_to_the_model):
+        test()
+        print(f"✓ {test.__name__}")
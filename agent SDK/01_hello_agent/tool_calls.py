@@ -0,0 +1,90 @@
+"""
+Tool-call capture for the support agent
+Records every tool call of a run (name, arguments, output, latency) through the Agents SDK hooks
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from agents import RunHooks, ToolsToFinalOutputResult
+
+
+@dataclass
+class ToolCallRecord:
+    """One tool call made during a run"""
+    call_id: str
+    tool: str
+    arguments: Optional[Dict[str, Any]] = None  # Parsed JSON arguments, filled in by complete()
+    output: Any = None
+    started: float = 0.0  # time.perf_counter() when the tool started
+    latency: Optional[float] = None  # Seconds, None while still running
+
+    @property
+    def finished(self) -> bool:
+        return self.latency is not None
+
+
+class ToolCallRecorder(RunHooks):
+    """Run hooks that keep a typed record of each tool call
+
+    Pass a fresh recorder as `hooks=` to `Runner.run` or `Runner.run_streamed`.
+    Tool start and end are matched by the tool call id, so parallel calls to
+    the same tool stay apart. The hooks do not see the arguments; call
+    `complete(result.new_items)` after the run to fill them in from the
+    run's tool call items.
+    """
+
+    def __init__(self):
+        self.calls: Dict[str, ToolCallRecord] = {}  # call_id -> record, in start order
+
+    async def on_tool_start(self, context, agent, tool) -> None:
+        call_id = getattr(context, "tool_call_id", None) or f"{tool.name}-{len(self.calls)}"
+        self.calls[call_id] = ToolCallRecord(call_id=call_id, tool=tool.name, started=time.perf_counter())
+
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        record = self.calls.get(getattr(context, "tool_call_id", None))
+        if record is None:
+            # No call id (hosted or computer tools): the oldest unfinished call of this tool
+            record = next((r for r in self.calls.values() if r.tool == tool.name and not r.finished), None)
+        if record is not None:
+            record.output = result
+            record.latency = time.perf_counter() - record.started
+
+    def complete(self, items: Iterable[Any] = ()) -> List[ToolCallRecord]:
+        """All records, with arguments taken from the run's tool call items"""
+        for item in items:
+            if getattr(item, "type", None) != "tool_call_item":
+                continue
+            record = self.calls.get(getattr(item.raw_item, "call_id", None))
+            if record is not None and record.arguments is None:
+                try:
+                    record.arguments = json.loads(getattr(item.raw_item, "arguments", "") or "{}")
+                except json.JSONDecodeError:
+                    record.arguments = {"raw": item.raw_item.arguments}
+        return list(self.calls.values())
+
+    @property
+    def records(self) -> List[ToolCallRecord]:
+        return list(self.calls.values())
+
+
+def answer_with_tool_output(tool_names: Iterable[str], separator: str = "\n\n"):
+    """A `tool_use_behavior` that returns tool output as the answer, without another model turn
+
+    When every tool called in a turn is one of `tool_names`, their outputs,
+    joined in call order, become the final output. That is exactly what the
+    support agent is told to answer with. Any other tool in the turn sends
+    the results back to the model as usual. Unlike `StopAtTools`, parallel
+    calls (e.g. weather and news in one question) all reach the answer.
+    """
+    direct = frozenset(tool_names)
+
+    def behavior(context, tool_results) -> ToolsToFinalOutputResult:
+        if tool_results and all(result.tool.name in direct for result in tool_results):
+            return ToolsToFinalOutputResult(
+                is_final_output=True,
+                final_output=separator.join(str(result.output) for result in tool_results))
+        return ToolsToFinalOutputResult(is_final_output=False)
+    return behavior